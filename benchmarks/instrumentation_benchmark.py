@@ -0,0 +1,102 @@
+"""Measure the overhead of query instrumentation on repository reads.
+
+Seeds synthetic studies inside a transaction that is rolled back at the end, so it can be pointed at any
+migrated RSSA database:
+
+    python benchmarks/instrumentation_benchmark.py --rounds 200
+
+Each workload runs with instrumentation off and on, recording every repository method and statement
+into one `MetricsRegistry`, so the cost of folding measurements into histograms is included. The
+modes are interleaved in small batches so drift in the database's response time affects them
+equally. The connection is configured from the RSSA_DB_* environment variables (see
+`create_db_url`), or from `--url`.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, create_async_engine
+
+from rssa_storage.rssadb.models.study_components import Study
+from rssa_storage.rssadb.repositories.study_components import StudyRepository
+from rssa_storage.shared import MetricsRegistry, RepoQueryOptions, disable_instrumentation, enable_instrumentation
+from rssa_storage.shared.db_base import create_db_url
+
+MODES = ('off', 'on')
+
+WORKLOADS: dict[str, Callable[[StudyRepository], Awaitable[Any]]] = {
+    'small select': lambda repo: repo.find_many(RepoQueryOptions(limit=5)),
+    'full details': lambda repo: repo.find_many(RepoQueryOptions(load_options=repo.LOAD_FULL_DETAILS, limit=10)),
+    'count': lambda repo: repo.count(RepoQueryOptions(search_text='study', search_columns=['name'])),
+}
+
+
+async def seed_studies(conn: AsyncConnection, rows: int) -> None:
+    async with AsyncSession(bind=conn, join_transaction_mode='create_savepoint') as session:
+        studies = [{'name': f'Benchmark study {i}', 'description': 'A synthetic study.'} for i in range(rows)]
+        await StudyRepository(session, Study).bulk_create(studies, return_ids=True)
+        # Releases the savepoint only; the outer transaction is rolled back once the benchmark is done.
+        await session.commit()
+
+
+def set_mode(engine: AsyncEngine, mode: str, registry: MetricsRegistry) -> None:
+    if mode == 'on':
+        enable_instrumentation(engine, registry)
+    else:
+        disable_instrumentation(engine)
+
+
+async def measure(
+    engine: AsyncEngine,
+    conn: AsyncConnection,
+    run: Callable[[StudyRepository], Awaitable[Any]],
+    rounds: int,
+    batch: int,
+) -> dict[str, float]:
+    """Return the median time per call, in seconds, of each mode over `rounds` interleaved batches."""
+    samples: dict[str, list[float]] = {mode: [] for mode in MODES}
+    registry = MetricsRegistry()
+    async with AsyncSession(bind=conn, join_transaction_mode='create_savepoint') as session:
+        repo = StudyRepository(session, Study)
+        for _ in range(batch):
+            await run(repo)
+        for attempt in range(rounds):
+            # Rotate the order so no mode always runs right after another.
+            for mode in MODES[attempt % len(MODES) :] + MODES[: attempt % len(MODES)]:
+                set_mode(engine, mode, registry)
+                start = time.perf_counter()
+                for _ in range(batch):
+                    await run(repo)
+                samples[mode].append((time.perf_counter() - start) / batch)
+    set_mode(engine, 'off', registry)
+    return {mode: statistics.median(values) for mode, values in samples.items()}
+
+
+async def main(url: str, rows: int, rounds: int, batch: int) -> None:
+    engine = create_async_engine(url)
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            await seed_studies(conn, rows)
+            print(f'{"workload":<14} {"off us":>8} {"on us":>8} {"overhead %":>11}')
+            for name, run in WORKLOADS.items():
+                times = await measure(engine, conn, run, rounds, batch)
+                overhead = (times['on'] / times['off'] - 1) * 100
+                print(f'{name:<14} {times["off"] * 1e6:>8.1f} {times["on"] * 1e6:>8.1f} {overhead:>11.2f}')
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='async SQLAlchemy URL; defaults to the RSSA_DB_* environment variables')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.url or create_db_url('RSSA_DB', is_async=True), args.rows, args.rounds, args.batch))
@@ -0,0 +1,116 @@
+"""Compare per-row CPU and memory of full ORM reads against projection reads.
+
+Seeds synthetic movies inside a transaction that is rolled back at the end, so it can be pointed at any
+migrated movie database:
+
+    python benchmarks/projection_benchmark.py --rows 5000
+
+The connection is configured from the MOVIE_DB_* environment variables (see `create_db_url`), or
+from `--url`.
+"""
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+
+from rssa_storage.moviedb.models.movies import Movie
+from rssa_storage.moviedb.repositories.movies import MovieRepository
+from rssa_storage.shared import RepoQueryOptions
+from rssa_storage.shared.db_base import create_db_url
+
+CARD_COLUMNS = ['id', 'title', 'year', 'genre', 'poster', 'ave_rating']
+
+MODES: dict[str, RepoQueryOptions] = {
+    'orm': RepoQueryOptions(),
+    'orm load_columns': RepoQueryOptions(load_columns=CARD_COLUMNS),
+    'projection record': RepoQueryOptions(projection=CARD_COLUMNS),
+    'projection tuple': RepoQueryOptions(projection=CARD_COLUMNS, projection_format='tuple'),
+    'projection dict': RepoQueryOptions(projection=CARD_COLUMNS, projection_format='dict'),
+}
+
+
+async def seed_movies(conn: AsyncConnection, rows: int) -> None:
+    async with AsyncSession(bind=conn, join_transaction_mode='create_savepoint') as session:
+        run = uuid.uuid4().hex[:8]
+        movies = [
+            {
+                'movielens_id': f'bench-{run}-{i}',
+                'imdb_id': f'tt-bench-{run}-{i}',
+                'title': f'Benchmark movie {i}',
+                'year': 1950 + i % 70,
+                'genre': 'Drama|Comedy',
+                'cast': 'Someone, Someone Else',
+                'description': 'A synthetic movie used for benchmarking. ' * 4,
+            }
+            for i in range(rows)
+        ]
+        await MovieRepository(session, Movie).bulk_create(movies, return_ids=True)
+        # Releases the savepoint only; the outer transaction is rolled back once the benchmark is done.
+        await session.commit()
+
+
+async def measure(
+    conn: AsyncConnection, run: Callable[[MovieRepository], Awaitable[Any]], repeat: int
+) -> tuple[float, int, int]:
+    """Return the best wall time of `repeat` runs, the peak traced memory of one more run and the row count.
+
+    Memory is traced in a separate run because tracemalloc slows allocation down considerably.
+    """
+    best = float('inf')
+    peak = 0
+    count = 0
+    for attempt in range(repeat + 1):
+        trace = attempt == repeat
+        async with AsyncSession(bind=conn, join_transaction_mode='create_savepoint') as session:
+            repo = MovieRepository(session, Movie)
+            gc.collect()
+            if trace:
+                tracemalloc.start()
+            start = time.perf_counter()
+            result = await run(repo)
+            elapsed = time.perf_counter() - start
+            if trace:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            else:
+                best = min(best, elapsed)
+            count = len(result)
+            del result
+    return best, peak, count
+
+
+async def main(url: str, rows: int, repeat: int) -> None:
+    engine = create_async_engine(url)
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            await seed_movies(conn, rows)
+            print(f'{"mode":<20} {"rows":>7} {"us/row":>9} {"peak B/row":>11}')
+            for name, options in MODES.items():
+                options.limit = rows
+
+                async def run(repo: MovieRepository, options: RepoQueryOptions = options) -> Any:
+                    return await repo.find_many(options)
+
+                elapsed, peak, count = await measure(conn, run, repeat)
+                count = max(count, 1)
+                print(f'{name:<20} {count:>7} {elapsed / count * 1e6:>9.2f} {peak / count:>11.0f}')
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='async SQLAlchemy URL; defaults to the MOVIE_DB_* environment variables')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.url or create_db_url('MOVIE_DB', is_async=True), args.rows, args.repeat))
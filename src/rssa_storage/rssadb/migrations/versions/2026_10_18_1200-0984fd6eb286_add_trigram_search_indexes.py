@@ -0,0 +1,53 @@
+"""add trigram search indexes for searchable columns
+
+Revision ID: 0984fd6eb286
+Revises: 45b299da3dcc
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = '0984fd6eb286'
+down_revision: str | None = '45b299da3dcc'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+SEARCHABLE_COLUMNS = {
+    'studies': ('name', 'description'),
+    'study_step_pages': ('name', 'description'),
+    'survey_constructs': ('name', 'description'),
+    'survey_scales': ('name', 'description'),
+    'users': ('email', 'auth0_sub', 'desc'),
+}
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # CONCURRENTLY builds without blocking writes, but cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for table, columns in SEARCHABLE_COLUMNS.items():
+            for column in columns:
+                op.create_index(
+                    f'ix_{table}_{column}_trgm',
+                    table,
+                    [column],
+                    unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True,
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, columns in SEARCHABLE_COLUMNS.items():
+            for column in columns:
+                op.drop_index(
+                    f'ix_{table}_{column}_trgm',
+                    table_name=table,
+                    postgresql_concurrently=True,
+                )
@@ -0,0 +1,36 @@
+"""make order position unique constraints deferrable
+
+Revision ID: 5c1e7d2a9b40
+Revises: 0984fd6eb286
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = '5c1e7d2a9b40'
+down_revision: str | None = '0984fd6eb286'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+ORDER_POSITION_CONSTRAINTS = {
+    'study_steps': ('uq_study_steps_study_id_order_position', ['study_id', 'order_position']),
+    'study_step_pages': (
+        'uq_study_step_pages_study_step_id_order_position',
+        ['study_step_id', 'order_position'],
+    ),
+}
+
+
+def upgrade() -> None:
+    for table, (name, columns) in ORDER_POSITION_CONSTRAINTS.items():
+        op.drop_constraint(op.f(name), table, type_='unique')
+        op.create_unique_constraint(op.f(name), table, columns, deferrable=True, initially='IMMEDIATE')
+
+
+def downgrade() -> None:
+    for table, (name, columns) in ORDER_POSITION_CONSTRAINTS.items():
+        op.drop_constraint(op.f(name), table, type_='unique')
+        op.create_unique_constraint(op.f(name), table, columns)
@@ -11,6 +11,7 @@ from rssa_storage.rssadb.models.rssa_base_models import RssaBase, RssaOrderedBas
 from rssa_storage.rssadb.models.survey_constructs import SurveyConstruct, SurveyScale
 from rssa_storage.shared import DateAuditMixin, SoftDeleteMixin
 from rssa_storage.shared.generators import generate_ref_code
+from rssa_storage.shared.search import trigram_indexes
 
 if TYPE_CHECKING:
     from rssa_storage.rssadb.models.study_participants import StudyParticipant
@@ -65,6 +66,8 @@ class Study(RssaBase, DateAuditMixin, SoftDeleteMixin):
     )
     api_keys: Mapped[list['ApiKey']] = relationship('ApiKey', back_populates='study', cascade='all, delete-orphan')
 
+    __table_args__ = trigram_indexes('studies', 'name', 'description')
+
 
 class StudyCondition(RssaBase, DateAuditMixin, SoftDeleteMixin):
     """SQLAlchemy model for the 'study_conditions' table.
@@ -156,7 +159,7 @@ class StudyStep(RssaOrderedBase, DateAuditMixin, SoftDeleteMixin):
     )
 
     __table_args__ = (
-        sa.UniqueConstraint('study_id', 'order_position'),
+        sa.UniqueConstraint('study_id', 'order_position', deferrable=True, initially='immediate'),
         sa.UniqueConstraint(
             'study_id',
             'path',
@@ -272,7 +275,10 @@ class StudyStepPage(RssaOrderedBase, DateAuditMixin, SoftDeleteMixin):
         'StudyStepPageContent', back_populates='study_step_page', uselist=True, cascade='all, delete-orphan'
     )
 
-    __table_args__ = (sa.UniqueConstraint('study_step_id', 'order_position'),)
+    __table_args__ = (
+        sa.UniqueConstraint('study_step_id', 'order_position', deferrable=True, initially='immediate'),
+        *trigram_indexes('study_step_pages', 'name', 'description'),
+    )
 
 
 class ApiKey(RssaBase, DateAuditMixin):
@@ -360,3 +366,5 @@ class User(RssaBase, DateAuditMixin):
     study_authorizations: Mapped[list['StudyAuthorization']] = relationship(
         'StudyAuthorization', back_populates='user', cascade='all, delete-orphan'
     )
+
+    __table_args__ = trigram_indexes('users', 'email', 'auth0_sub', 'desc')
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from rssa_storage.rssadb.models.rssa_base_models import RssaBase, RssaOrderedBase
 from rssa_storage.shared import DateAuditMixin, EnabledMixin, SoftDeleteMixin
+from rssa_storage.shared.search import trigram_indexes
 
 
 class SurveyItem(RssaOrderedBase, DateAuditMixin, SoftDeleteMixin, EnabledMixin):
@@ -60,6 +61,8 @@ class SurveyConstruct(RssaBase, DateAuditMixin, SoftDeleteMixin):
         'StudyStepPageContent', back_populates='survey_construct', uselist=True
     )
 
+    __table_args__ = trigram_indexes('survey_constructs', 'name', 'description')
+
 
 class SurveyScale(RssaBase, DateAuditMixin, SoftDeleteMixin, EnabledMixin):
     """SQLAlchemy model for the 'construct_scales' table.
@@ -89,6 +92,8 @@ class SurveyScale(RssaBase, DateAuditMixin, SoftDeleteMixin, EnabledMixin):
         'StudyStepPageContent', back_populates='survey_scale', uselist=True
     )
 
+    __table_args__ = trigram_indexes('survey_scales', 'name', 'description')
+
 
 class SurveyScaleLevel(RssaOrderedBase, DateAuditMixin, SoftDeleteMixin, EnabledMixin):
     """SQLAlchemy model for the 'survey_scale_levels' table.
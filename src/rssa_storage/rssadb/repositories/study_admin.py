@@ -1,22 +1,122 @@
 """Repository for user operations."""
 
+import asyncio
+import logging
+import threading
+import time
 import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from itertools import product
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from rssa_storage.rssadb.models.participant_movie_sequence import PreShuffledMovieList
 from rssa_storage.rssadb.models.study_components import ApiKey, User
 from rssa_storage.shared import BaseRepository, RepoQueryOptions
+from rssa_storage.shared.cache_invalidation import SKIP_CACHE_INVALIDATION, attribute_values, invalidate_on_write
+from rssa_storage.shared.search import TrigramSearch
+from rssa_storage.shared.ttl_cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
 
 
 class UserRepository(BaseRepository[User]):
     """Repository for User model."""
 
     SEARCHABLE_COLUMNS = ['email', 'auth0_sub', 'desc']
+    search_backend = TrigramSearch()
+
+
+@dataclass(frozen=True)
+class VerifiedApiKey:
+    """An active API key, as cached by `ApiKeyRepository.verify_api_key`.
+
+    Attributes:
+        id: The ID of the API key.
+        study_id: The study the key grants access to.
+        user_id: The user the key belongs to, if any.
+    """
+
+    id: uuid.UUID
+    study_id: uuid.UUID
+    user_id: uuid.UUID | None
+
+
+class ApiKeyUsageBuffer:
+    """The latest use of each API key, collected in memory and written in batches.
+
+    Attributes:
+        flush_interval: The number of seconds after which buffered uses are due to be written.
+    """
+
+    def __init__(self, flush_interval: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._last_used: dict[uuid.UUID, datetime] = {}
+        self._last_flush = clock()
+        self._lock = threading.Lock()
+
+    def record(self, api_key_id: uuid.UUID, used_at: datetime | None = None) -> None:
+        """Record a use of an API key, keeping only the latest time per key."""
+        used_at = used_at or datetime.now(UTC)
+        with self._lock:
+            previous = self._last_used.get(api_key_id)
+            if previous is None or previous < used_at:
+                self._last_used[api_key_id] = used_at
+
+    def due(self) -> bool:
+        """Whether buffered uses are waiting and `flush_interval` has passed since the last drain."""
+        with self._lock:
+            return bool(self._last_used) and self._clock() - self._last_flush >= self.flush_interval
+
+    def drain(self) -> dict[uuid.UUID, datetime]:
+        """Remove and return the buffered uses."""
+        with self._lock:
+            last_used, self._last_used = self._last_used, {}
+            self._last_flush = self._clock()
+            return last_used
+
+    def restore(self, last_used: dict[uuid.UUID, datetime]) -> None:
+        """Put back uses that could not be written, so the next flush retries them."""
+        for api_key_id, used_at in last_used.items():
+            self.record(api_key_id, used_at)
+
+    def __len__(self) -> int:
+        return len(self._last_used)
+
+
+api_key_cache = TTLCache(maxsize=10_000, ttl=300.0)
+api_key_usage = ApiKeyUsageBuffer()
 
 
 class ApiKeyRepository(BaseRepository[ApiKey]):
-    """Repository for ApiKey model."""
+    """Repository for ApiKey model.
+
+    Verified keys are cached in-process by `(key_hash, study_id)`, and writes to API keys made through
+    a session this repository was created with (such as `deactivate`) invalidate them. Other processes
+    notice a deactivation once their entry expires after `key_cache.ttl` seconds.
+
+    Attributes:
+        key_cache: The cache of verified keys.
+        usage_buffer: Collects the uses recorded by `verify_api_key` until `flush_key_usage` writes them,
+            usually from the task started by `start_key_usage_flusher`.
+    """
+
+    key_cache: TTLCache = api_key_cache
+    usage_buffer: ApiKeyUsageBuffer = api_key_usage
+
+    def __init__(self, db: AsyncSession, model: type[ApiKey] | None = None):
+        super().__init__(db, model)
+        invalidate_on_write(
+            db,
+            self.key_cache,
+            ApiKey,
+            lambda api_key: product(attribute_values(api_key, 'key_hash'), attribute_values(api_key, 'study_id')),
+        )
 
     async def get_active_api_key_with_study(self, key_hash: str, study_id: uuid.UUID) -> ApiKey | None:
         """Get an active API key by its hash and associated study ID.
@@ -28,12 +128,149 @@ class ApiKeyRepository(BaseRepository[ApiKey]):
         Returns:
             The ApiKey instance if found, else None.
         """
-        query = select(ApiKey).join(ApiKey.study).where(ApiKey.is_active, ApiKey.study_id == study_id)
+        query = select(ApiKey).where(ApiKey.key_hash == key_hash, ApiKey.study_id == study_id, ApiKey.is_active)
 
         result = await self.db.execute(query)
 
         return result.scalar_one_or_none()
 
+    async def verify_api_key(self, key_hash: str, study_id: uuid.UUID) -> VerifiedApiKey | None:
+        """Verify an API key for a study, usually without a round trip.
+
+        Active keys are served from `key_cache` once verified, and each successful verification is
+        recorded in `usage_buffer` rather than written to `last_used_at` immediately. Unknown or
+        inactive keys are not cached, so a newly created key is accepted straight away.
+
+        Args:
+            key_hash: The hash of the API key.
+            study_id: The UUID of the study the key is presented for.
+
+        Returns:
+            The verified key, or None if no active key with this hash belongs to the study.
+        """
+        cache_key = (key_hash, study_id)
+        verified = self.key_cache.get(cache_key)
+        if verified is MISSING:
+            generation = self.key_cache.generation
+            query = select(ApiKey.id, ApiKey.study_id, ApiKey.user_id).where(
+                ApiKey.key_hash == key_hash, ApiKey.study_id == study_id, ApiKey.is_active
+            )
+            row = (await self.db.execute(query)).first()
+            if row is None:
+                return None
+            verified = VerifiedApiKey(*row)
+            self.key_cache.set(cache_key, verified, generation=generation)
+
+        self.usage_buffer.record(verified.id)
+        return verified
+
+    async def deactivate(self, api_key_id: uuid.UUID) -> bool:
+        """Deactivate an API key and drop it from the verification cache.
+
+        Args:
+            api_key_id: The ID of the API key.
+
+        Returns:
+            True if the key exists, else False.
+        """
+        api_key = await self.get_by_id(api_key_id)
+        if api_key is None:
+            return False
+
+        api_key.is_active = False
+        await self.db.flush()
+        self.key_cache.invalidate((api_key.key_hash, api_key.study_id))
+        return True
+
+    async def flush_key_usage(self, force: bool = False, commit: bool = False) -> int:
+        """Write the buffered `last_used_at` times in one UPDATE.
+
+        Meant to be called periodically with a session of its own, as `start_key_usage_flusher` does.
+        Nothing is written unless the buffer is due (see `ApiKeyUsageBuffer.due`) or `force` is set. A
+        stored `last_used_at` that is already later is left unchanged. The uses are put back in the
+        buffer if the UPDATE fails, or the commit when `commit` is set; when the caller commits instead,
+        a failed commit loses them.
+
+        Args:
+            force: Write whatever is buffered, regardless of the flush interval.
+            commit: Commit the session after the UPDATE.
+
+        Returns:
+            The number of API keys updated.
+        """
+        if not (force or self.usage_buffer.due()):
+            return 0
+        last_used = self.usage_buffer.drain()
+        if not last_used:
+            return 0
+
+        usage = (
+            func.unnest(
+                bindparam('api_key_ids', type_=ARRAY(ApiKey.id.type)),
+                bindparam('used_at', type_=ARRAY(ApiKey.last_used_at.type)),
+            )
+            .table_valued('id', 'used_at')
+            .render_derived(name='usage')
+        )
+        stmt = (
+            update(ApiKey)
+            .where(
+                ApiKey.id == usage.c.id,
+                or_(ApiKey.last_used_at.is_(None), ApiKey.last_used_at < usage.c.used_at),
+            )
+            .values(last_used_at=usage.c.used_at)
+            .execution_options(synchronize_session=False, **{SKIP_CACHE_INVALIDATION: True})
+        )
+        params = {'api_key_ids': list(last_used), 'used_at': list(last_used.values())}
+        try:
+            result = await self.db.execute(stmt, params)
+            if commit:
+                await self.db.commit()
+        except Exception:
+            self.usage_buffer.restore(last_used)
+            raise
+        return result.rowcount
+
+
+def start_key_usage_flusher(
+    session_factory: async_sessionmaker[AsyncSession], interval: float | None = None
+) -> asyncio.Task[None]:
+    """Start a task that writes the uses buffered by `ApiKeyRepository.verify_api_key` every `interval` seconds.
+
+    Each flush runs in a new session from `session_factory` and commits; a flush that fails is logged
+    and retried with the next one. Cancelling the task writes the uses still buffered one last time.
+
+    Args:
+        session_factory: Creates the sessions flushes run in, e.g. the one returned by `create_db_components`.
+        interval: The number of seconds between flushes; `ApiKeyRepository.usage_buffer.flush_interval`
+            if None.
+
+    Returns:
+        The task, to cancel on shutdown.
+    """
+    if interval is None:
+        interval = ApiKeyRepository.usage_buffer.flush_interval
+    return asyncio.get_running_loop().create_task(_flush_key_usage_every(session_factory, interval))
+
+
+async def _flush_key_usage_every(session_factory: async_sessionmaker[AsyncSession], interval: float) -> None:
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            await _flush_key_usage(session_factory)
+    finally:
+        await _flush_key_usage(session_factory)
+
+
+async def _flush_key_usage(session_factory: async_sessionmaker[AsyncSession]) -> None:
+    if not ApiKeyRepository.usage_buffer:
+        return
+    try:
+        async with session_factory() as session:
+            await ApiKeyRepository(session).flush_key_usage(force=True, commit=True)
+    except Exception:
+        logger.exception('Could not write API key usage; it is kept for the next flush')
+
 
 class PreShuffledMovieRepository(BaseRepository[PreShuffledMovieList]):
     """Repository for PreShuffledMovieList model."""
@@ -0,0 +1,398 @@
+"""Immutable, ORM-free snapshots of everything needed to render a study or a page, loaded in a single query."""
+
+import uuid
+from collections.abc import Callable, Hashable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Select, func, literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from rssa_storage.rssadb.models.study_components import (
+    Study,
+    StudyAttentionCheck,
+    StudyStep,
+    StudyStepPage,
+    StudyStepPageContent,
+)
+from rssa_storage.rssadb.models.survey_constructs import SurveyConstruct, SurveyItem, SurveyScale, SurveyScaleLevel
+from rssa_storage.shared.cache_invalidation import WriteInvalidator, invalidate_on_write
+from rssa_storage.shared.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class SurveyItemBlueprint:
+    """A survey item of a construct."""
+
+    id: uuid.UUID
+    order_position: int
+    enabled: bool
+    text: str
+    notes: str | None
+
+
+@dataclass(frozen=True)
+class SurveyConstructBlueprint:
+    """A survey construct with its live items, in order."""
+
+    id: uuid.UUID
+    name: str
+    description: str
+    survey_items: tuple[SurveyItemBlueprint, ...]
+
+
+@dataclass(frozen=True)
+class SurveyScaleLevelBlueprint:
+    """A level of a survey scale."""
+
+    id: uuid.UUID
+    order_position: int
+    enabled: bool
+    label: str
+    notes: str | None
+    value: int
+
+
+@dataclass(frozen=True)
+class SurveyScaleBlueprint:
+    """A survey scale with its live levels, in order."""
+
+    id: uuid.UUID
+    enabled: bool
+    name: str
+    description: str | None
+    survey_scale_levels: tuple[SurveyScaleLevelBlueprint, ...]
+
+
+@dataclass(frozen=True)
+class StudyAttentionCheckBlueprint:
+    """An attention check injected into a page content."""
+
+    id: uuid.UUID
+    text: str
+    assigned_position: int
+    survey_scale_id: uuid.UUID | None
+    expected_survey_scale_level_id: uuid.UUID | None
+
+
+@dataclass(frozen=True)
+class StudyStepPageContentBlueprint:
+    """A page content with its construct, scale and attention check."""
+
+    id: uuid.UUID
+    order_position: int
+    enabled: bool
+    preamble: str | None
+    survey_construct: SurveyConstructBlueprint | None
+    survey_scale: SurveyScaleBlueprint | None
+    study_attention_check: StudyAttentionCheckBlueprint | None
+
+
+@dataclass(frozen=True)
+class StudyStepPageBlueprint:
+    """A step page with its live contents, in order."""
+
+    id: uuid.UUID
+    order_position: int
+    enabled: bool
+    page_type: str | None
+    name: str
+    description: str | None
+    title: str | None
+    instructions: str | None
+    study_step_page_contents: tuple[StudyStepPageContentBlueprint, ...]
+
+
+@dataclass(frozen=True)
+class StudyStepBlueprint:
+    """A study step with its live pages, in order."""
+
+    id: uuid.UUID
+    order_position: int
+    enabled: bool
+    step_type: str | None
+    name: str
+    description: str | None
+    title: str | None
+    instructions: str | None
+    path: str
+    survey_api_root: str | None
+    study_step_pages: tuple[StudyStepPageBlueprint, ...]
+
+
+@dataclass(frozen=True)
+class StudyBlueprint:
+    """A study with its live steps, in order, down to survey items and scale levels.
+
+    Every level is a frozen dataclass holding plain values and tuples, so a blueprint can be shared
+    between requests and serialized with `dataclasses.asdict`. Soft-deleted rows are left out;
+    disabled ones are kept with `enabled` set to False.
+    """
+
+    id: uuid.UUID
+    enabled: bool
+    name: str
+    description: str | None
+    completion_code: str | None
+    redirect_url: str | None
+    dataset_subset: str | None
+    study_steps: tuple[StudyStepBlueprint, ...]
+
+
+_EMPTY_ARRAY = literal_column("'[]'::jsonb")
+
+
+def _json_object(model: type, names: tuple[str, ...], **children: Any) -> ColumnElement[Any]:
+    """Build `jsonb_build_object` over a model's columns and nested child expressions."""
+    pairs = [(name, getattr(model, name)) for name in names] + list(children.items())
+    # Literal keys: jsonb_build_object takes "any" arguments, so untyped bind parameters would not resolve.
+    args = (arg for key, value in pairs for arg in (literal_column(f"'{key}'"), value))
+    return func.jsonb_build_object(*args, type_=JSONB)
+
+
+def _json_array(model: type, names: tuple[str, ...], parent: ColumnElement[bool], **children: Any) -> Any:
+    """Aggregate a model's live rows under a parent into a JSON array ordered by position."""
+    element = _json_object(model, names, **children)
+    return (
+        select(func.coalesce(func.jsonb_agg(aggregate_order_by(element, model.order_position, model.id)), _EMPTY_ARRAY))
+        .where(parent, model.deleted_at.is_(None))
+        .scalar_subquery()
+    )
+
+
+def _page_contents(parent: ColumnElement[bool]) -> Any:
+    """Aggregate the live contents matching `parent`, each with its construct, scale and attention check."""
+    items = _json_array(
+        SurveyItem,
+        ('id', 'order_position', 'enabled', 'text', 'notes'),
+        SurveyItem.survey_construct_id == SurveyConstruct.id,
+    )
+    construct = (
+        select(_json_object(SurveyConstruct, ('id', 'name', 'description'), survey_items=items))
+        .where(SurveyConstruct.id == StudyStepPageContent.survey_construct_id, SurveyConstruct.deleted_at.is_(None))
+        .scalar_subquery()
+    )
+    levels = _json_array(
+        SurveyScaleLevel,
+        ('id', 'order_position', 'enabled', 'label', 'notes', 'value'),
+        SurveyScaleLevel.survey_scale_id == SurveyScale.id,
+    )
+    scale = (
+        select(_json_object(SurveyScale, ('id', 'enabled', 'name', 'description'), survey_scale_levels=levels))
+        .where(SurveyScale.id == StudyStepPageContent.survey_scale_id, SurveyScale.deleted_at.is_(None))
+        .scalar_subquery()
+    )
+    attention_check = (
+        select(
+            _json_object(
+                StudyAttentionCheck,
+                ('id', 'text', 'assigned_position', 'survey_scale_id', 'expected_survey_scale_level_id'),
+            )
+        )
+        .where(StudyAttentionCheck.study_step_page_content_id == StudyStepPageContent.id)
+        .order_by(StudyAttentionCheck.created_at)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return _json_array(
+        StudyStepPageContent,
+        ('id', 'order_position', 'enabled', 'preamble'),
+        parent,
+        survey_construct=construct,
+        survey_scale=scale,
+        study_attention_check=attention_check,
+    )
+
+
+def build_blueprint_statement(study_id: Any) -> Select:
+    """Build the query returning a study's whole blueprint as one JSONB value.
+
+    Args:
+        study_id: The study ID, usually a bind parameter.
+
+    Returns:
+        A select of a single JSONB column; no row if the study does not exist or is soft-deleted.
+    """
+    contents = _page_contents(StudyStepPageContent.study_step_page_id == StudyStepPage.id)
+    pages = _json_array(
+        StudyStepPage,
+        ('id', 'order_position', 'enabled', 'page_type', 'name', 'description', 'title', 'instructions'),
+        StudyStepPage.study_step_id == StudyStep.id,
+        study_step_page_contents=contents,
+    )
+    steps = _json_array(
+        StudyStep,
+        (
+            'id',
+            'order_position',
+            'enabled',
+            'step_type',
+            'name',
+            'description',
+            'title',
+            'instructions',
+            'path',
+            'survey_api_root',
+        ),
+        StudyStep.study_id == Study.id,
+        study_step_pages=pages,
+    )
+    blueprint = _json_object(
+        Study,
+        ('id', 'enabled', 'name', 'description', 'completion_code', 'redirect_url', 'dataset_subset'),
+        study_steps=steps,
+    )
+    return select(blueprint).where(Study.id == study_id, Study.deleted_at.is_(None))
+
+
+def build_page_contents_statement(page_id: Any) -> Select:
+    """Build the query returning the assembled contents of one page as a JSONB array.
+
+    Args:
+        page_id: The page ID, usually a bind parameter.
+
+    Returns:
+        A select of a single JSONB array, empty if the page has no live contents.
+    """
+    return select(_page_contents(StudyStepPageContent.study_step_page_id == page_id))
+
+
+def build_page_version_statement(page_id: Any) -> Select:
+    """Build the query returning the version of a page's contents: the latest `updated_at` and row count.
+
+    Every row a page payload is assembled from counts, soft-deleted ones included, so edits, soft
+    deletes and inserts move the latest timestamp and hard deletes change the count.
+
+    Args:
+        page_id: The page ID, usually a bind parameter.
+
+    Returns:
+        A select of one `(max_updated_at, row_count)` row.
+    """
+    contents = (
+        select(
+            StudyStepPageContent.id,
+            StudyStepPageContent.survey_construct_id,
+            StudyStepPageContent.survey_scale_id,
+            StudyStepPageContent.updated_at,
+        )
+        .where(StudyStepPageContent.study_step_page_id == page_id)
+        .cte('page_contents')
+    )
+    stamps = union_all(
+        select(contents.c.updated_at),
+        select(SurveyConstruct.updated_at).join(contents, contents.c.survey_construct_id == SurveyConstruct.id),
+        select(SurveyItem.updated_at).join(contents, contents.c.survey_construct_id == SurveyItem.survey_construct_id),
+        select(SurveyScale.updated_at).join(contents, contents.c.survey_scale_id == SurveyScale.id),
+        select(SurveyScaleLevel.updated_at).join(
+            contents, contents.c.survey_scale_id == SurveyScaleLevel.survey_scale_id
+        ),
+        select(StudyAttentionCheck.updated_at).join(
+            contents, contents.c.id == StudyAttentionCheck.study_step_page_content_id
+        ),
+    ).subquery('stamps')
+    return select(func.max(stamps.c.updated_at), func.count())
+
+
+# Page versions are re-read at most once per ttl per page; payloads are keyed by (page ID, version),
+# so a stale version can only ever serve the payload that was current for it.
+page_version_cache = TTLCache(maxsize=10_000, ttl=30.0)
+page_payload_cache = TTLCache(maxsize=2_048, ttl=3600.0)
+
+
+def invalidate_page_versions_on_write(
+    db: AsyncSession, model: type, page_ids: Callable[[Any], Iterable[Hashable]] | None = None
+) -> WriteInvalidator | None:
+    """Drop cached page versions when a session writes rows that page payloads are assembled from.
+
+    Args:
+        db: The session writes are made through.
+        model: The mapped class whose writes are watched.
+        page_ids: Returns the IDs of the pages an instance belongs to; None drops every cached version,
+            for rows shared between pages such as constructs and scales.
+
+    Returns:
+        The invalidator, or None if `db` is not backed by a real `Session`.
+    """
+    return invalidate_on_write(db, page_version_cache, model, page_ids)
+
+
+def _uuid(value: str | None) -> uuid.UUID | None:
+    return uuid.UUID(value) if value is not None else None
+
+
+def _construct(data: Mapping[str, Any] | None) -> SurveyConstructBlueprint | None:
+    if data is None:
+        return None
+    return SurveyConstructBlueprint(
+        id=uuid.UUID(data['id']),
+        name=data['name'],
+        description=data['description'],
+        survey_items=tuple(
+            SurveyItemBlueprint(**{**item, 'id': uuid.UUID(item['id'])}) for item in data['survey_items']
+        ),
+    )
+
+
+def _scale(data: Mapping[str, Any] | None) -> SurveyScaleBlueprint | None:
+    if data is None:
+        return None
+    return SurveyScaleBlueprint(
+        id=uuid.UUID(data['id']),
+        enabled=data['enabled'],
+        name=data['name'],
+        description=data['description'],
+        survey_scale_levels=tuple(
+            SurveyScaleLevelBlueprint(**{**level, 'id': uuid.UUID(level['id'])})
+            for level in data['survey_scale_levels']
+        ),
+    )
+
+
+def _attention_check(data: Mapping[str, Any] | None) -> StudyAttentionCheckBlueprint | None:
+    if data is None:
+        return None
+    return StudyAttentionCheckBlueprint(
+        id=uuid.UUID(data['id']),
+        text=data['text'],
+        assigned_position=data['assigned_position'],
+        survey_scale_id=_uuid(data['survey_scale_id']),
+        expected_survey_scale_level_id=_uuid(data['expected_survey_scale_level_id']),
+    )
+
+
+def _content(data: Mapping[str, Any]) -> StudyStepPageContentBlueprint:
+    return StudyStepPageContentBlueprint(
+        id=uuid.UUID(data['id']),
+        order_position=data['order_position'],
+        enabled=data['enabled'],
+        preamble=data['preamble'],
+        survey_construct=_construct(data['survey_construct']),
+        survey_scale=_scale(data['survey_scale']),
+        study_attention_check=_attention_check(data['study_attention_check']),
+    )
+
+
+def _page(data: Mapping[str, Any]) -> StudyStepPageBlueprint:
+    contents = page_contents_from_json(data['study_step_page_contents'])
+    return StudyStepPageBlueprint(
+        **{**data, 'id': uuid.UUID(data['id']), 'study_step_page_contents': contents},
+    )
+
+
+def _step(data: Mapping[str, Any]) -> StudyStepBlueprint:
+    pages = tuple(_page(page) for page in data['study_step_pages'])
+    return StudyStepBlueprint(**{**data, 'id': uuid.UUID(data['id']), 'study_step_pages': pages})
+
+
+def page_contents_from_json(data: Iterable[Mapping[str, Any]]) -> tuple[StudyStepPageContentBlueprint, ...]:
+    """Convert the JSON array returned by `build_page_contents_statement` into content blueprints."""
+    return tuple(_content(content) for content in data)
+
+
+def blueprint_from_json(data: Mapping[str, Any]) -> StudyBlueprint:
+    """Convert the JSON document returned by `build_blueprint_statement` into a `StudyBlueprint`."""
+    steps = tuple(_step(step) for step in data['study_steps'])
+    return StudyBlueprint(**{**data, 'id': uuid.UUID(data['id']), 'study_steps': steps})
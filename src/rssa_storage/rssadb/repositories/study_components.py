@@ -1,8 +1,11 @@
 import uuid
-from collections.abc import Sequence
+from collections.abc import Collection, Hashable, Mapping, Sequence
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from typing import Any
 
-from sqlalchemy import Row, and_, func, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, Select, and_, bindparam, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from rssa_storage.rssadb.models.participant_responses import Feedback
 from rssa_storage.rssadb.models.study_components import (
@@ -15,59 +18,183 @@ from rssa_storage.rssadb.models.study_components import (
     StudyStepPageContent,
 )
 from rssa_storage.rssadb.models.study_participants import StudyParticipant
-from rssa_storage.rssadb.models.survey_constructs import SurveyConstruct, SurveyScale
-from rssa_storage.shared import BaseOrderedRepository, BaseRepository, OrderedRepoQueryOptions, RepoQueryOptions
+from rssa_storage.rssadb.repositories.study_blueprint import (
+    StudyBlueprint,
+    StudyStepPageContentBlueprint,
+    blueprint_from_json,
+    build_blueprint_statement,
+    build_page_contents_statement,
+    build_page_version_statement,
+    invalidate_page_versions_on_write,
+    page_contents_from_json,
+    page_payload_cache,
+    page_version_cache,
+)
+from rssa_storage.shared import (
+    BaseOrderedRepository,
+    BaseRepository,
+    LoaderPlan,
+    OrderedRepoQueryOptions,
+    Page,
+    RepoQueryOptions,
+)
+from rssa_storage.shared.cache_invalidation import attribute_values, invalidate_on_write
+from rssa_storage.shared.search import TrigramSearch
+from rssa_storage.shared.ttl_cache import MISSING, TTLCache
+
+
+@dataclass
+class StudyQueryOptions(RepoQueryOptions):
+    """Query options for studies.
+
+    Attributes:
+        authorized_user_id: Only match studies this user holds a `StudyAuthorization` for.
+    """
+
+    authorized_user_id: uuid.UUID | None = None
 
 
 class StudyRepository(BaseRepository[Study]):
     """Repository for Study model."""
 
     SEARCHABLE_COLUMNS = ['name', 'description']
-    LOAD_FULL_DETAILS = (selectinload(Study.study_steps), selectinload(Study.study_conditions))
-
-    async def _get_authorized_study_ids(self, user_id: uuid.UUID) -> list[uuid.UUID]:
-        """Helper to fetch study IDs authorized for a user."""
-        query = select(StudyAuthorization.study_id).where(StudyAuthorization.user_id == user_id)
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+    search_backend = TrigramSearch()
+    LOAD_FULL_DETAILS = LoaderPlan.from_paths(Study, 'study_steps', 'study_conditions')
+
+    def _apply_filtering_to_query(self, query: Select, options: RepoQueryOptions) -> Select:
+        query = super()._apply_filtering_to_query(query, options)
+        if isinstance(options, StudyQueryOptions) and options.authorized_user_id is not None:
+            user_id = bindparam('authorized_user_id', type_=StudyAuthorization.user_id.type)
+            query = query.where(
+                select(StudyAuthorization.id)
+                .where(StudyAuthorization.study_id == Study.id, StudyAuthorization.user_id == user_id)
+                .exists()
+            )
+        return query
+
+    def _query_shape(self, options: RepoQueryOptions) -> Hashable | None:
+        shape = super()._query_shape(options)
+        if shape is None or not isinstance(options, StudyQueryOptions):
+            return shape
+        return (shape, options.authorized_user_id is not None)
+
+    def _filter_params(self, options: RepoQueryOptions) -> dict[str, Any]:
+        params = super()._filter_params(options)
+        if isinstance(options, StudyQueryOptions) and options.authorized_user_id is not None:
+            params['authorized_user_id'] = options.authorized_user_id
+        return params
+
+    @staticmethod
+    def _authorized_options(user_id: uuid.UUID, options: RepoQueryOptions | None) -> StudyQueryOptions:
+        options = options or RepoQueryOptions()
+        values = {f.name: getattr(options, f.name) for f in fields(RepoQueryOptions)}
+        return StudyQueryOptions(**values, authorized_user_id=user_id)
 
     async def get_authorized_for_user(
         self, user_id: uuid.UUID, options: RepoQueryOptions | None = None
     ) -> Sequence[Study]:
-        """Get studies authorized for a specific user."""
-        study_ids = await self._get_authorized_study_ids(user_id)
-
-        if not study_ids:
-            return []
+        """Get studies authorized for a specific user.
 
-        options = options or RepoQueryOptions()
-        if options.ids:
-            options.ids = list(set(options.ids) & set(study_ids))
-            if not options.ids:
-                return []
-        else:
-            options.ids = study_ids
+        The authorization check is an EXISTS subquery on `study_authorizations`, so the studies are
+        listed in a single round trip. `options.ids`, if set, narrows the result further.
+        """
+        return await self.find_many(self._authorized_options(user_id, options))
 
-        return await self.find_many(options)
+    async def get_authorized_page_for_user(
+        self, user_id: uuid.UUID, options: RepoQueryOptions | None = None
+    ) -> Page[Study]:
+        """Get a page of studies authorized for a specific user together with their total count."""
+        return await self.find_page(self._authorized_options(user_id, options))
 
     async def count_authorized_for_user(self, user_id: uuid.UUID, search: str | None = None) -> int:
         """Count studies authorized for a specific user."""
-        study_ids = await self._get_authorized_study_ids(user_id)
-
-        if not study_ids:
-            return 0
-        options = RepoQueryOptions(
-            filters={'id': study_ids},
-            search_text=search,
-            search_columns=self.SEARCHABLE_COLUMNS,
+        options = RepoQueryOptions(search_text=search, search_columns=self.SEARCHABLE_COLUMNS)
+        return await self.count(self._authorized_options(user_id, options))
+
+    async def load_blueprint(self, study_id: uuid.UUID) -> StudyBlueprint | None:
+        """Load everything needed to render a study in one round trip.
+
+        The steps, pages, contents, constructs with their items, scales with their levels and attention
+        checks are nested into a single JSONB document by Postgres, replacing the chains of `selectinload`
+        queries, and returned as an immutable `StudyBlueprint` with no ORM objects attached.
+
+        Args:
+            study_id: The UUID of the study.
+
+        Returns:
+            The study blueprint, or None if the study does not exist or is soft-deleted.
+        """
+        key = (type(self), self.model, 'blueprint')
+        stmt = self.statement_cache.get_or_build(
+            key, lambda: build_blueprint_statement(bindparam('study_id', type_=Study.id.type))
         )
-        return await self.count(options)
+        document = (await self.db.execute(stmt, {'study_id': study_id})).scalar_one_or_none()
+        return blueprint_from_json(document) if document is not None else None
+
+
+study_acl_cache = TTLCache(maxsize=10_000, ttl=60.0)
 
 
 class StudyAuthorizationRepository(BaseRepository[StudyAuthorization]):
-    """Repository for StudyAuthorization model."""
+    """Repository for StudyAuthorization model.
 
-    pass
+    Each user's authorizations are cached in-process as a read-only `{study_id: role}` mapping (see
+    `get_acl`). Any write made through a session this repository was created with invalidates the
+    affected users' entries.
+
+    Attributes:
+        acl_cache: The cache of authorizations by user ID.
+    """
+
+    acl_cache: TTLCache = study_acl_cache
+
+    def __init__(self, db: AsyncSession, model: type[StudyAuthorization] | None = None):
+        super().__init__(db, model)
+        invalidate_on_write(
+            db, self.acl_cache, StudyAuthorization, lambda authorization: attribute_values(authorization, 'user_id')
+        )
+
+    async def get_acl(self, user_id: uuid.UUID) -> Mapping[uuid.UUID, str]:
+        """Get the roles a user holds, by study ID, from the cache or in one query.
+
+        Args:
+            user_id: The UUID of the user.
+
+        Returns:
+            A read-only mapping of study ID to role.
+        """
+        acl = self.acl_cache.get(user_id)
+        if acl is not MISSING:
+            return acl
+
+        generation = self.acl_cache.generation
+        query = select(StudyAuthorization.study_id, StudyAuthorization.role).where(
+            StudyAuthorization.user_id == user_id
+        )
+        result = await self.db.execute(query)
+        acl = MappingProxyType(dict(result.tuples().all()))
+        self.acl_cache.set(user_id, acl, generation=generation)
+        return acl
+
+    async def is_authorized(
+        self, user_id: uuid.UUID, study_id: uuid.UUID, role: str | Collection[str] | None = None
+    ) -> bool:
+        """Check whether a user is authorized for a study, usually without a round trip.
+
+        Args:
+            user_id: The UUID of the user.
+            study_id: The UUID of the study.
+            role: If given, the role (or any of the roles) the user must hold.
+
+        Returns:
+            True if the user holds an authorization for the study, with a matching role if one was given.
+        """
+        held = (await self.get_acl(user_id)).get(study_id)
+        if held is None:
+            return False
+        if role is None:
+            return True
+        return held == role if isinstance(role, str) else held in role
 
 
 class StudyStepRepository(BaseOrderedRepository[StudyStep]):
@@ -114,14 +241,11 @@ class StudyStepPageRepository(BaseOrderedRepository[StudyStepPage]):
     parent_id_column_name: str = 'study_step_id'
 
     SEARCHABLE_COLUMNS = ['name', 'description']
-    LOAD_FULL_DETAILS = (
-        selectinload(StudyStepPage.study_step_page_contents)
-        .selectinload(StudyStepPageContent.survey_construct)
-        .selectinload(SurveyConstruct.survey_items),
-        selectinload(StudyStepPage.study_step_page_contents).selectinload(StudyStepPageContent.survey_construct),
-        selectinload(StudyStepPage.study_step_page_contents)
-        .selectinload(StudyStepPageContent.survey_scale)
-        .selectinload(SurveyScale.survey_scale_levels),
+    search_backend = TrigramSearch()
+    LOAD_FULL_DETAILS = LoaderPlan.from_paths(
+        StudyStepPage,
+        'study_step_page_contents.survey_construct.survey_items',
+        'study_step_page_contents.survey_scale.survey_scale_levels',
     )
 
 
@@ -165,17 +289,73 @@ class StudyConditionRepository(BaseRepository[StudyCondition]):
 class StudyStepPageContentRepository(BaseOrderedRepository[StudyStepPageContent]):
     """Repository for PageContent model.
 
+    Assembled page payloads (see `get_page_payload`) are cached in-process by page ID and version. The
+    version of a page is itself cached briefly and dropped whenever the contents, constructs, items,
+    scales, levels or attention checks it depends on are written through a repository's session.
+
     Attributes:
         parent_id_column_name: Configured the BaseOrderedRepository to use 'study_step_page_id' as the parent ID column.
+        version_cache: The cache of page versions by page ID.
+        payload_cache: The LRU cache of page payloads by page ID and version.
     """
 
     parent_id_column_name: str = 'study_step_page_id'
+    version_cache: TTLCache = page_version_cache
+    payload_cache: TTLCache = page_payload_cache
 
-    DETAILED_LOAD_OPTIONS = (
-        selectinload(StudyStepPageContent.survey_construct).selectinload(SurveyConstruct.survey_items),
-        selectinload(StudyStepPageContent.survey_scale).selectinload(SurveyScale.survey_scale_levels),
+    DETAILED_LOAD_OPTIONS = LoaderPlan.from_paths(
+        StudyStepPageContent,
+        'survey_construct.survey_items',
+        'survey_scale.survey_scale_levels',
     )
 
+    def __init__(
+        self,
+        db: AsyncSession,
+        model: type[StudyStepPageContent] | None = None,
+        parent_id_column_name: str | None = None,
+    ):
+        super().__init__(db, model, parent_id_column_name)
+        invalidate_page_versions_on_write(
+            db, StudyStepPageContent, lambda content: attribute_values(content, 'study_step_page_id')
+        )
+
+    async def get_page_payload(self, page_id: uuid.UUID) -> tuple[StudyStepPageContentBlueprint, ...]:
+        """Get the live contents of a page with their constructs, items, scales, levels and attention checks.
+
+        A read-through cache: while the page's version is cached no query is made at all; otherwise one
+        small query reads the version, and the payload is only assembled (in a single query) if no
+        payload is cached for that version yet.
+
+        Args:
+            page_id: The UUID of the page.
+
+        Returns:
+            The page contents in order, as immutable blueprints with no ORM objects attached.
+        """
+        params = {'study_step_page_id': page_id}
+        version = self.version_cache.get(page_id)
+        if version is MISSING:
+            generation = self.version_cache.generation
+            stmt = self.statement_cache.get_or_build(
+                (type(self), self.model, 'page_version'), lambda: build_page_version_statement(self._page_id_param())
+            )
+            version = tuple((await self.db.execute(stmt, params)).one())
+            self.version_cache.set(page_id, version, generation=generation)
+
+        key = (page_id, version)
+        payload = self.payload_cache.get(key)
+        if payload is MISSING:
+            stmt = self.statement_cache.get_or_build(
+                (type(self), self.model, 'page_payload'), lambda: build_page_contents_statement(self._page_id_param())
+            )
+            payload = page_contents_from_json((await self.db.execute(stmt, params)).scalar_one())
+            self.payload_cache.set(key, payload)
+        return payload
+
+    def _page_id_param(self) -> Any:
+        return bindparam('study_step_page_id', type_=StudyStepPageContent.study_step_page_id.type)
+
     async def get_all_ordered_instances(
         self,
         parent_id: uuid.UUID,
@@ -215,4 +395,8 @@ class FeedbackRepository(BaseRepository[Feedback]):
 class StudyAttentionCheckRepository(BaseRepository[StudyAttentionCheck]):
     """Repository for managing StudyAttentionCheck entitied in the database."""
 
-    pass
+    def __init__(self, db: AsyncSession, model: type[StudyAttentionCheck] | None = None):
+        super().__init__(db, model)
+        invalidate_page_versions_on_write(
+            db, StudyAttentionCheck, lambda check: attribute_values(check, 'study_step_page_id')
+        )
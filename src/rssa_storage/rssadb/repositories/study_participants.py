@@ -2,8 +2,6 @@
 
 import uuid
 
-from sqlalchemy.orm import selectinload
-
 from rssa_storage.rssadb.models.participant_movie_sequence import StudyParticipantMovieSession
 from rssa_storage.rssadb.models.study_participants import (
     Demographic,
@@ -12,18 +10,15 @@ from rssa_storage.rssadb.models.study_participants import (
     StudyParticipant,
     StudyParticipantType,
 )
-from rssa_storage.shared import BaseRepository, RepoQueryOptions
+from rssa_storage.shared import BaseRepository, LoaderPlan, RepoQueryOptions
 from rssa_storage.shared.mixins import VersionedRepositoryMixin
 
 
 class StudyParticipantRepository(BaseRepository[StudyParticipant]):
     """Repository for StudyParticipant model."""
 
-    LOAD_ASSIGNED_CONDITION = (selectinload(StudyParticipant.study_condition),)
-    LOAD_CONDITION_AND_TYPE = (
-        selectinload(StudyParticipant.study_condition),
-        selectinload(StudyParticipant.study_participant_type),
-    )
+    LOAD_ASSIGNED_CONDITION = LoaderPlan.from_paths(StudyParticipant, 'study_condition')
+    LOAD_CONDITION_AND_TYPE = LoaderPlan.from_paths(StudyParticipant, 'study_condition', 'study_participant_type')
 
 
 class StudyParticipantTypeRepository(BaseRepository[StudyParticipantType]):
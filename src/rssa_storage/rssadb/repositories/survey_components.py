@@ -1,23 +1,37 @@
 """Repository for SurveyConstruct and related models."""
 
-from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from rssa_storage.rssadb.models.survey_constructs import SurveyConstruct, SurveyItem, SurveyScale, SurveyScaleLevel
-from rssa_storage.shared import BaseOrderedRepository, BaseRepository
+from rssa_storage.rssadb.repositories.study_blueprint import invalidate_page_versions_on_write
+from rssa_storage.shared import BaseOrderedRepository, BaseRepository, LoaderPlan
+from rssa_storage.shared.search import TrigramSearch
 
 
 class SurveyConstructRepository(BaseRepository[SurveyConstruct]):
     """Repository for SurveyConstruct model."""
 
     SEARCHABLE_COLUMNS = ['name', 'description']
-    LOAD_FULL_DETAILS = (selectinload(SurveyConstruct.survey_items),)
+    search_backend = TrigramSearch()
+    LOAD_FULL_DETAILS = LoaderPlan.from_paths(SurveyConstruct, 'survey_items')
+
+    def __init__(self, db: AsyncSession, model: type[SurveyConstruct] | None = None):
+        super().__init__(db, model)
+        # Constructs and scales are shared between pages, so any write drops every cached page version.
+        invalidate_page_versions_on_write(db, SurveyConstruct)
 
 
 class SurveyScaleRepository(BaseRepository[SurveyScale]):
     """Repository for SurveyScale model."""
 
-    LOAD_FULL_DETAILS = (selectinload(SurveyScale.survey_scale_levels),)
+    LOAD_FULL_DETAILS = LoaderPlan.from_paths(SurveyScale, 'survey_scale_levels')
     SEARCHABLE_COLUMNS = ['name', 'description']
+    search_backend = TrigramSearch()
+
+    def __init__(self, db: AsyncSession, model: type[SurveyScale] | None = None):
+        super().__init__(db, model)
+        # Constructs and scales are shared between pages, so any write drops every cached page version.
+        invalidate_page_versions_on_write(db, SurveyScale)
 
 
 class SurveyItemRepository(BaseOrderedRepository[SurveyItem]):
@@ -30,6 +44,12 @@ class SurveyItemRepository(BaseOrderedRepository[SurveyItem]):
 
     parent_id_column_name: str = 'survey_construct_id'
 
+    def __init__(
+        self, db: AsyncSession, model: type[SurveyItem] | None = None, parent_id_column_name: str | None = None
+    ):
+        super().__init__(db, model, parent_id_column_name)
+        invalidate_page_versions_on_write(db, SurveyItem)
+
 
 class SurveyScaleLevelRepository(BaseOrderedRepository[SurveyScaleLevel]):
     """Repository for SurveyScaleLevel model.
@@ -39,3 +59,9 @@ class SurveyScaleLevelRepository(BaseOrderedRepository[SurveyScaleLevel]):
     """
 
     parent_id_column_name: str = 'survey_scale_id'
+
+    def __init__(
+        self, db: AsyncSession, model: type[SurveyScaleLevel] | None = None, parent_id_column_name: str | None = None
+    ):
+        super().__init__(db, model, parent_id_column_name)
+        invalidate_page_versions_on_write(db, SurveyScaleLevel)
@@ -1,15 +1,64 @@
-from .base_repo import BaseRepository, RepoQueryOptions
+from .base_repo import BaseRepository, IdLookupResult, RepoQueryOptions, WriteResult
 from .repo_utils import merge_repo_query_options
-from .base_ordered_repo import BaseOrderedRepository, OrderedRepoQueryOptions
+from .base_ordered_repo import BaseOrderedRepository, NavigationMap, OrderedRepoQueryOptions
 from .db_utils import SoftDeleteMixin, DateAuditMixin, EnabledMixin
+from .instrumentation import MetricsRegistry, MetricsSink, disable_instrumentation, enable_instrumentation
+from .loader_plan import LoaderPlan
+from .pagination import CountEstimate, CursorPage, InvalidCursorError, Page
+from .projection import ProjectionRecord
+from .search import FullTextSearch, IlikeSearch, SearchBackend, TrigramSearch
+from .session_memo import SessionMemo, enable_session_memo
+from .slow_query import SlowQuery, SlowQueryCapture, SlowQueryLog, capture_slow_queries, stop_capturing_slow_queries
+from .statement_cache import StatementCache, StatementCacheStats
+from .strict_loading import (
+	LazyLoadError,
+	LazyLoadStats,
+	disable_strict_loading,
+	enable_strict_loading,
+	get_lazy_load_stats,
+)
+from .ttl_cache import TTLCache, TTLCacheStats
 
 __all__ = [
 	'BaseRepository',
 	'BaseOrderedRepository',
+	'CountEstimate',
+	'CursorPage',
+	'IdLookupResult',
+	'InvalidCursorError',
+	'LazyLoadError',
+	'LazyLoadStats',
+	'LoaderPlan',
+	'MetricsRegistry',
+	'MetricsSink',
+	'NavigationMap',
 	'OrderedRepoQueryOptions',
+	'Page',
+	'ProjectionRecord',
 	'RepoQueryOptions',
+	'SessionMemo',
+	'SlowQuery',
+	'SlowQueryCapture',
+	'SlowQueryLog',
 	'SoftDeleteMixin',
+	'StatementCache',
+	'StatementCacheStats',
 	'DateAuditMixin',
 	'EnabledMixin',
+	'FullTextSearch',
+	'IlikeSearch',
+	'SearchBackend',
+	'TrigramSearch',
+	'TTLCache',
+	'TTLCacheStats',
+	'WriteResult',
+	'disable_instrumentation',
+	'disable_strict_loading',
+	'enable_instrumentation',
+	'enable_session_memo',
+	'enable_strict_loading',
+	'capture_slow_queries',
+	'stop_capturing_slow_queries',
+	'get_lazy_load_stats',
 	'merge_repo_query_options',
 ]
\ No newline at end of file
@@ -1,15 +1,37 @@
 """Base repository for ordered models."""
 
 import uuid
-from collections.abc import Sequence
-from dataclasses import dataclass
+from collections.abc import Hashable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
 from typing import Any, TypeVar
 
-from sqlalchemy import Select, case, func, select, update
+from sqlalchemy import (
+    Integer,
+    Select,
+    and_,
+    any_,
+    bindparam,
+    case,
+    delete,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    true,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from .base_repo import BaseRepository, RepoQueryOptions
+from .cache_invalidation import attribute_values, invalidate_on_write
 from .db_utils import SharedOrderedModel
+from .pagination import Page
+from .ttl_cache import MISSING, TTLCache
 
 ModelType = TypeVar('ModelType', bound=SharedOrderedModel)
 
@@ -21,10 +43,83 @@ class OrderedRepoQueryOptions(RepoQueryOptions):
     min_order_position: int | None = None
 
 
+@dataclass(frozen=True)
+class NavigationMap:
+    """The live siblings under one parent, in order, for stepping forwards and backwards without queries.
+
+    Attributes:
+        parent_id: The parent ID.
+        ids: The sibling IDs in order.
+        positions: The siblings' order positions, aligned with `ids`.
+    """
+
+    parent_id: uuid.UUID
+    ids: tuple[uuid.UUID, ...]
+    positions: tuple[int, ...]
+    _index: Mapping[uuid.UUID, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, '_index', {instance_id: i for i, instance_id in enumerate(self.ids)})
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, instance_id: object) -> bool:
+        return instance_id in self._index
+
+    @property
+    def first_id(self) -> uuid.UUID | None:
+        """The first sibling's ID, or None if there are no siblings."""
+        return self.ids[0] if self.ids else None
+
+    @property
+    def last_id(self) -> uuid.UUID | None:
+        """The last sibling's ID, or None if there are no siblings."""
+        return self.ids[-1] if self.ids else None
+
+    def index_of(self, instance_id: uuid.UUID) -> int | None:
+        """The zero-based index of a sibling, or None if it is not a live sibling."""
+        return self._index.get(instance_id)
+
+    def next_id(self, instance_id: uuid.UUID) -> uuid.UUID | None:
+        """The ID of the sibling after `instance_id`, or None at the end or for an unknown ID."""
+        index = self._index.get(instance_id)
+        if index is None or index + 1 >= len(self.ids):
+            return None
+        return self.ids[index + 1]
+
+    def previous_id(self, instance_id: uuid.UUID) -> uuid.UUID | None:
+        """The ID of the sibling before `instance_id`, or None at the start or for an unknown ID."""
+        index = self._index.get(instance_id)
+        if index is None or index == 0:
+            return None
+        return self.ids[index - 1]
+
+
+navigation_cache = TTLCache(maxsize=4096, ttl=300.0)
+
+
 class BaseOrderedRepository(BaseRepository[ModelType]):
-    """Base repository for ordered models."""
+    """Base repository for ordered models.
+
+    By default sibling positions are dense (1, 2, 3, ...) and deleting an instance shifts every
+    following sibling down. Setting `ORDER_GAP` above 1 switches a repository to gap mode: new positions
+    are allocated between neighbours (see `allocate_position`), deletes leave a hole instead of shifting,
+    and the siblings are respaced by a single `rebalance_positions` UPDATE whenever two neighbours have
+    no free position left between them. Positions then only express relative order.
+
+    Navigation maps (see `get_navigation_map`) are cached in-process per parent; any write to the model
+    made through a session this repository was created with invalidates the affected parents' entries.
+
+    Attributes:
+        parent_id_column_name: The name of the column holding the parent ID.
+        ORDER_GAP: The spacing between positions after a rebalance; 1 keeps positions dense.
+        navigation_cache: The cache of navigation maps by model and parent ID.
+    """
 
     parent_id_column_name: str
+    ORDER_GAP: int = 1
+    navigation_cache: TTLCache = navigation_cache
 
     def __init__(
         self,
@@ -56,6 +151,14 @@ class BaseOrderedRepository(BaseRepository[ModelType]):
                 f"Model '{self.model.__name__}' does not have a column named '{self.parent_id_column_name}'."
             )
 
+        model, parent_name = self.model, self.parent_id_column_name
+        self._navigation_invalidator = invalidate_on_write(
+            db,
+            self.navigation_cache,
+            model,
+            lambda instance: {(model, parent_id) for parent_id in attribute_values(instance, parent_name)},
+        )
+
     def _apply_query_options(self, query: Select, options: RepoQueryOptions) -> Select:
         """Apply query options to the query.
 
@@ -70,10 +173,23 @@ class BaseOrderedRepository(BaseRepository[ModelType]):
 
         if isinstance(options, OrderedRepoQueryOptions):
             if options.min_order_position is not None:
-                query = query.where(self.model.order_position > options.min_order_position)
+                min_position = bindparam('min_order_position', options.min_order_position, type_=Integer)
+                query = query.where(self.model.order_position > min_position)
 
         return query
 
+    def _query_shape(self, options: RepoQueryOptions) -> Hashable | None:
+        shape = super()._query_shape(options)
+        if shape is None or not isinstance(options, OrderedRepoQueryOptions):
+            return shape
+        return (shape, options.min_order_position is not None)
+
+    def _query_params(self, options: RepoQueryOptions) -> dict[str, Any]:
+        params = super()._query_params(options)
+        if isinstance(options, OrderedRepoQueryOptions) and options.min_order_position is not None:
+            params['min_order_position'] = options.min_order_position
+        return params
+
     async def find_many(self, options: RepoQueryOptions | None = None) -> Sequence[ModelType]:
         """Find many ordered instances based on query options."""
         if options is None:
@@ -84,6 +200,15 @@ class BaseOrderedRepository(BaseRepository[ModelType]):
 
         return await super().find_many(options)
 
+    async def find_page(self, options: RepoQueryOptions | None = None) -> Page[ModelType]:
+        """Find a page of ordered instances together with the total count."""
+        if options is None:
+            options = OrderedRepoQueryOptions()
+
+        options.sort_by = options.sort_by or 'order_position'
+
+        return await super().find_page(options)
+
     async def get_first_ordered_instance(
         self,
         parent_id: uuid.UUID,
@@ -145,6 +270,331 @@ class BaseOrderedRepository(BaseRepository[ModelType]):
         )
         return await self.find_one(options)
 
+    async def get_ordered_window(
+        self,
+        parent_id: uuid.UUID,
+        after_position: int | None = None,
+        k: int = 10,
+        load_options: Sequence[Any] | None = None,
+    ) -> Sequence[ModelType]:
+        """Get the next `k` live siblings after a position in one query.
+
+        Fetching a window ahead lets a caller step through several siblings with a single lookup instead
+        of one `get_next_ordered_instance` call per step.
+
+        Args:
+            parent_id: The parent ID.
+            after_position: The order position to start after; None starts at the first sibling.
+            k: The maximum number of siblings to return.
+            load_options: Optional list of loading options.
+
+        Returns:
+            Up to `k` instances, ordered by position.
+        """
+        options = OrderedRepoQueryOptions(
+            filters={self.parent_id_column_name: parent_id},
+            min_order_position=after_position,
+            sort_by='order_position',
+            limit=k,
+            load_options=load_options,
+        )
+        return await self.find_many(options)
+
+    async def get_navigation_map(self, parent_id: uuid.UUID) -> NavigationMap:
+        """Get the order of the live siblings under a parent, from the cache or in one query.
+
+        Args:
+            parent_id: The parent ID.
+
+        Returns:
+            The navigation map, giving the next and previous sibling of every sibling.
+        """
+        key = (self.model, parent_id)
+        navigation = self.navigation_cache.get(key)
+        if navigation is not MISSING:
+            return navigation
+
+        generation = self.navigation_cache.generation
+        options = OrderedRepoQueryOptions(
+            filters={self.parent_id_column_name: parent_id},
+            projection=['id', 'order_position'],
+            projection_format='tuple',
+        )
+        rows = await self.find_many(options)
+        navigation = NavigationMap(parent_id, tuple(row[0] for row in rows), tuple(row[1] for row in rows))
+        self.navigation_cache.set(key, navigation, generation=generation)
+        return navigation
+
+    @property
+    def uses_gaps(self) -> bool:
+        """Whether positions are spaced by `ORDER_GAP` rather than kept dense."""
+        return self.ORDER_GAP > 1
+
+    async def allocate_position(
+        self, parent_id: uuid.UUID, index: int | None = None, exclude_id: uuid.UUID | None = None
+    ) -> int:
+        """Return a free position for a new sibling without moving any existing row.
+
+        In gap mode the position is the midpoint between the neighbours of `index`; if they are adjacent,
+        the siblings are rebalanced first. Soft-deleted siblings keep their positions, so the midpoint
+        is taken below the next position in use, live or not.
+
+        Args:
+            parent_id: The parent ID.
+            index: The zero-based index among the live siblings the new instance will have; None (or an
+                index past the end) appends.
+            exclude_id: An instance being moved, which is ignored when looking for its new neighbours.
+
+        Returns:
+            An unused order position.
+
+        Raises:
+            ValueError: In dense mode, when inserting before an existing sibling, which requires shifting
+                the following siblings.
+        """
+        for _ in range(2):
+            lower, upper = await self._position_bounds(parent_id, index, exclude_id)
+            if upper is None:
+                return lower + self.ORDER_GAP
+            if upper - lower > 1:
+                return lower + (upper - lower) // 2
+            if not self.uses_gaps:
+                raise ValueError(
+                    f'{type(self).__name__} keeps dense positions; there is no free position at index {index}.'
+                )
+            await self.rebalance_positions(parent_id)
+        raise RuntimeError(f'No free position at index {index} after rebalancing.')
+
+    async def _position_bounds(
+        self, parent_id: uuid.UUID, index: int | None, exclude_id: uuid.UUID | None = None
+    ) -> tuple[int, int | None]:
+        """The positions a new sibling at `index` must lie strictly between; the upper bound is None at the end."""
+        in_parent = self.parent_id_column == parent_id
+        if exclude_id is not None:
+            in_parent = and_(in_parent, self.model.id != exclude_id)
+        last = select(func.max(self.model.order_position)).where(in_parent).scalar_subquery()
+        if index is None:
+            return (await self.db.execute(select(func.coalesce(last, 0)))).scalar_one(), None
+
+        index = max(index, 0)
+        live = select(self.model.order_position).where(in_parent)
+        if self.meta.soft_delete_column is not None:
+            live = live.where(self.meta.soft_delete_column.is_(None))
+        previous = live.order_by(self.model.order_position).offset(index - 1).limit(1).scalar_subquery()
+        lower = func.coalesce(previous, 0) if index > 0 else literal(0)
+        upper = select(func.min(self.model.order_position)).where(in_parent, self.model.order_position > lower)
+
+        row = (await self.db.execute(select(previous if index > 0 else null(), upper.scalar_subquery(), last))).one()
+        previous_position, upper_position, last_position = row
+        if index > 0 and previous_position is None:
+            return last_position or 0, None
+        return previous_position or 0, upper_position
+
+    async def rebalance_positions(self, parent_id: uuid.UUID) -> int:
+        """Respace all siblings, soft-deleted ones included, to multiples of `ORDER_GAP` in one UPDATE.
+
+        Relative order is preserved; rows already at their target position are not rewritten. Runs
+        automatically from `allocate_position` and may also be scheduled for lists that see many inserts.
+
+        Args:
+            parent_id: The parent ID.
+
+        Returns:
+            The number of rows moved.
+        """
+        key = (type(self), self.model, 'rebalance')
+        stmt = self.statement_cache.get_or_build(key, self._build_rebalance_statement)
+        params = {'parent_id': parent_id, 'order_gap': self.ORDER_GAP}
+        moved = (await self.db.scalars(stmt, params, execution_options={'populate_existing': True})).all()
+        await self.db.flush()
+        return len(moved)
+
+    def _build_rebalance_statement(self) -> Any:
+        parent_id = bindparam('parent_id', type_=self.parent_id_column.type)
+        rank = func.row_number().over(order_by=(self.model.order_position, self.model.id))
+        ranked = (
+            select(self.model.id, (rank * bindparam('order_gap', type_=Integer)).label('order_position'))
+            .where(self.parent_id_column == parent_id)
+            .subquery('ranked')
+        )
+        return (
+            update(self.model)
+            .where(self.model.id == ranked.c.id, self.model.order_position != ranked.c.order_position)
+            .values(order_position=ranked.c.order_position)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _close_gap(self, parent_id: uuid.UUID, deleted_position: int) -> None:
+        """Shift the siblings after a removed position down by one; a no-op in gap mode."""
+        if self.uses_gaps:
+            return
+
+        update_stmt = (
+            update(self.model)
+            .where(self.parent_id_column == parent_id, self.model.order_position > deleted_position)
+            .values(order_position=self.model.order_position - 1)
+        )
+        await self.db.execute(update_stmt)
+
+    async def insert_at(self, parent_id: uuid.UUID, position: int, instance: ModelType) -> ModelType:
+        """Add a new instance at a position among its siblings.
+
+        In dense mode the instance is inserted after the last sibling and then moved into place by the
+        same single UPDATE as `move_to`, which renumbers every sibling with a window function; in gap
+        mode it is given a free position between its neighbours (see `allocate_position`).
+
+        Args:
+            parent_id: The parent ID.
+            position: The 1-based position among the live siblings; values past the end append.
+            instance: The new instance; its parent ID and order position are set here.
+
+        Returns:
+            The created instance.
+        """
+        setattr(instance, self.parent_id_column_name, parent_id)
+        if self.uses_gaps:
+            instance.order_position = await self.allocate_position(parent_id, position - 1)
+            return await self.create(instance)
+
+        last = select(func.coalesce(func.max(self.model.order_position), 0) + 1).where(
+            self.parent_id_column == parent_id
+        )
+        instance.order_position = last.scalar_subquery()  # type: ignore[assignment]
+        await self.create(instance)
+        await self._place(instance.id, position)
+        return instance
+
+    async def move_to(self, instance_id: uuid.UUID, new_position: int) -> ModelType | None:
+        """Move an instance to a new position among its siblings.
+
+        In dense mode every sibling is renumbered by a single UPDATE; in gap mode only the moved row is
+        written, unless its new neighbours need rebalancing first.
+
+        Args:
+            instance_id: The ID of the instance to move.
+            new_position: The 1-based position among the live siblings; values past the end move it last.
+
+        Returns:
+            The moved instance, or None if it does not exist.
+        """
+        instance = await self.get_by_id(instance_id)
+        if instance is None:
+            return None
+
+        if self.uses_gaps:
+            parent_id = getattr(instance, self.parent_id_column_name)
+            instance.order_position = await self.allocate_position(parent_id, new_position - 1, exclude_id=instance_id)
+            await self.db.flush()
+        else:
+            await self._place(instance_id, new_position)
+        return instance
+
+    async def delete_many_ordered(self, ids: Sequence[uuid.UUID]) -> int:
+        """Delete many ordered instances, possibly under different parents, and close the gaps they leave.
+
+        Soft-deletable models are soft-deleted. The rows are deleted by one statement; in dense mode the
+        remaining siblings of every affected parent are then renumbered by one window-function UPDATE.
+
+        Args:
+            ids: The IDs of the instances to delete.
+
+        Returns:
+            The number of instances deleted.
+        """
+        if not ids:
+            return 0
+
+        in_ids = self._any_of(self.model.id, 'ids', ids)
+        deleted_attr = self.meta.soft_delete_column
+        if deleted_attr is not None:
+            stmt: Any = update(self.model).where(in_ids, deleted_attr.is_(None)).values(deleted_at=datetime.now(UTC))
+        else:
+            stmt = delete(self.model).where(in_ids)
+        result = await self.db.execute(
+            stmt.returning(self.parent_id_column).execution_options(synchronize_session='fetch')
+        )
+        parent_ids = list(result.scalars().all())
+
+        if parent_ids and not self.uses_gaps:
+            key = (type(self), self.model, 'recompact')
+            recompact = self.statement_cache.get_or_build(key, self._build_recompact_statement)
+            await self.db.scalars(
+                recompact, {'parent_ids': list(set(parent_ids))}, execution_options={'populate_existing': True}
+            )
+        await self.db.flush()
+        return len(parent_ids)
+
+    def _sibling_order(self) -> tuple[Any, ...]:
+        """Order siblings are numbered in: live ones first, then soft-deleted ones, each by position."""
+        order = (self.model.order_position, self.model.id)
+        deleted_attr = self.meta.soft_delete_column
+        return order if deleted_attr is None else (deleted_attr.is_not(None), *order)
+
+    async def _place(self, instance_id: uuid.UUID, position: int) -> None:
+        """Renumber an instance's siblings 1..N with the instance at `position`, in one UPDATE."""
+        key = (type(self), self.model, 'place')
+        stmt = self.statement_cache.get_or_build(key, self._build_place_statement)
+        params = {'moved_id': instance_id, 'position': position}
+        await self.db.scalars(stmt, params, execution_options={'populate_existing': True})
+        await self.db.flush()
+
+    def _build_place_statement(self) -> Any:
+        moved_id = bindparam('moved_id', type_=self.model.id.type)
+        parent_id = select(self.parent_id_column).where(self.model.id == moved_id).scalar_subquery()
+        deleted_attr = self.meta.soft_delete_column
+        live = func.count() if deleted_attr is None else func.count().filter(deleted_attr.is_(None))
+
+        others = (
+            select(
+                self.model.id,
+                func.row_number().over(order_by=self._sibling_order()).label('rank'),
+                live.over().label('live'),
+            )
+            .where(self.parent_id_column == parent_id, self.model.id != moved_id)
+            .cte('others')
+        )
+        position = bindparam('position', type_=Integer)
+        slot = select(
+            func.least(func.greatest(position, 1), func.coalesce(func.max(others.c.live), 0) + 1).label('position')
+        ).cte('slot')
+        shifted = select(
+            others.c.id,
+            (others.c.rank + case((others.c.rank >= slot.c.position, 1), else_=0)).label('order_position'),
+        ).join_from(others, slot, true())
+        moves = union_all(shifted, select(moved_id.label('id'), slot.c.position)).cte('moves')
+
+        return (
+            update(self.model)
+            .where(
+                self.model.id == moves.c.id,
+                or_(self.model.order_position != moves.c.order_position, self.model.id == moved_id),
+            )
+            .values(order_position=moves.c.order_position)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _build_recompact_statement(self) -> Any:
+        parent_ids = bindparam('parent_ids', type_=ARRAY(self.parent_id_column.type))
+        ranked = (
+            select(
+                self.model.id,
+                func.row_number()
+                .over(partition_by=self.parent_id_column, order_by=self._sibling_order())
+                .label('order_position'),
+            )
+            .where(self.parent_id_column == any_(parent_ids))
+            .subquery('ranked')
+        )
+        return (
+            update(self.model)
+            .where(self.model.id == ranked.c.id, self.model.order_position != ranked.c.order_position)
+            .values(order_position=ranked.c.order_position)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+
     async def delete_ordered_instance(self, instance_id: uuid.UUID) -> None:
         """Delete ordered instance and update order positions of subsequent instances.
 
@@ -154,21 +604,14 @@ class BaseOrderedRepository(BaseRepository[ModelType]):
         Returns:
             None
         """
-        instance = await self.find_one(RepoQueryOptions(filters={'id': instance_id}))
+        instance = await self.get_by_id(instance_id)
 
         if instance:
             deleted_position = instance.order_position
             parent_id = getattr(instance, self.parent_id_column_name)
 
             await self.delete(instance_id)
-
-            update_stmt = (
-                update(self.model)
-                .where(self.parent_id_column == parent_id, self.model.order_position > deleted_position)
-                .values(order_position=self.model.order_position - 1)
-            )
-
-            await self.db.execute(update_stmt)
+            await self._close_gap(parent_id, deleted_position)
             await self.db.flush()
 
     async def purge_ordered_instance(self, instance_id: uuid.UUID) -> None:
@@ -180,25 +623,25 @@ class BaseOrderedRepository(BaseRepository[ModelType]):
         Returns:
             None
         """
-        instance = await self.find_one(RepoQueryOptions(filters={'id': instance_id}, include_delted=True))
+        instance = await self.get_by_id(instance_id, include_deleted=True)
 
         if instance:
             deleted_position = instance.order_position
             parent_id = getattr(instance, self.parent_id_column_name)
 
             await self.db.delete(instance)
-
-            update_stmt = (
-                update(self.model)
-                .where(self.parent_id_column == parent_id, self.model.order_position > deleted_position)
-                .values(order_position=self.model.order_position - 1)
-            )
-
-            await self.db.execute(update_stmt)
+            await self._close_gap(parent_id, deleted_position)
             await self.db.flush()
 
     async def reorder_ordered_instances(self, parent_id: uuid.UUID, instances_map: dict[uuid.UUID, int]) -> None:
-        """Reorder ordered instances based on the provided mapping.
+        """Reorder ordered instances based on the provided mapping, in a single UPDATE statement.
+
+        The mapping is bound as two arrays and joined against the table (`UPDATE ... FROM unnest(...)`),
+        so the statement text does not grow with the number of instances. Moved rows are returned to
+        refresh instances already loaded by the session. Soft-deleted siblings that
+        still hold one of the target positions are moved past the current last position by the same
+        statement. The swap is only valid because unique `(parent, order_position)` constraints are
+        declared `DEFERRABLE`, which makes Postgres check them at the end of the statement.
 
         Args:
             parent_id: The parent ID.
@@ -210,44 +653,61 @@ class BaseOrderedRepository(BaseRepository[ModelType]):
         if not instances_map:
             return
 
-        target_positions = list(instances_map.values())
+        key = (type(self), self.model, 'reorder')
+        stmt = self.statement_cache.get_or_build(key, self._build_reorder_statement)
+        params = {
+            'parent_id': parent_id,
+            'reorder_ids': list(instances_map),
+            'reorder_positions': list(instances_map.values()),
+        }
+        await self.db.scalars(stmt, params, execution_options={'populate_existing': True})
+        await self.db.flush()
 
-        if hasattr(self.model, 'deleted_at'):
-            ghost_query = select(self.model.id, self.model.order_position).where(
-                getattr(self.model, self.parent_id_column_name) == parent_id,
-                self.model.deleted_at.is_not(None),  # type: ignore
-                self.model.order_position.in_(target_positions),
+    def _build_reorder_statement(self) -> Any:
+        parent_id = bindparam('parent_id', type_=self.parent_id_column.type)
+        target = select(
+            func.unnest(
+                bindparam('reorder_ids', type_=ARRAY(self.model.id.type)),
+                bindparam('reorder_positions', type_=ARRAY(Integer)),
             )
-            ghosts = await self.db.execute(ghost_query)
-            ghost_ids = [row.id for row in ghosts]
-
-            if ghost_ids:
-                evict_stmt = (
-                    update(self.model)
-                    .where(self.model.id.in_(ghost_ids))
-                    .values(order_position=self.model.order_position + 1000000)
+            .table_valued('id', 'order_position')
+            .render_derived(name='target')
+        ).cte('target')
+        moves: Any = select(target.c.id, target.c.order_position)
+
+        deleted_attr = self.meta.soft_delete_column
+        if deleted_attr is not None:
+            sibling = aliased(self.model)
+            last_position = (
+                select(
+                    func.greatest(
+                        func.max(sibling.order_position),
+                        select(func.max(target.c.order_position)).scalar_subquery(),
+                    )
                 )
-                await self.db.execute(evict_stmt)
-
-        whens = [(self.model.id == uid, -1 * pos) for uid, pos in instances_map.items()]
-
-        stmt_neg = (
-            update(self.model)
-            .where(
-                getattr(self.model, self.parent_id_column_name) == parent_id, self.model.id.in_(instances_map.keys())
+                .where(getattr(sibling, self.parent_id_column_name) == parent_id)
+                .scalar_subquery()
             )
-            .values(order_position=case(*whens))
-        )
-
-        await self.db.execute(stmt_neg)
+            ghosts = select(
+                self.model.id,
+                (last_position + func.row_number().over(order_by=self.model.order_position)).label('order_position'),
+            ).where(
+                self.parent_id_column == parent_id,
+                deleted_attr.is_not(None),
+                self.model.id.not_in(select(target.c.id)),
+                self.model.order_position.in_(select(target.c.order_position)),
+            )
+            moves = union_all(moves, ghosts)
 
-        stmt_pos = (
+        moves = moves.cte('moves')
+        return (
             update(self.model)
             .where(
-                getattr(self.model, self.parent_id_column_name) == parent_id, self.model.id.in_(instances_map.keys())
+                self.model.id == moves.c.id,
+                self.parent_id_column == parent_id,
+                self.model.order_position != moves.c.order_position,
             )
-            .values(order_position=func.abs(self.model.order_position))
+            .values(order_position=moves.c.order_position)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
         )
-
-        await self.db.execute(stmt_pos)
-        await self.db.flush()
@@ -1,20 +1,69 @@
 """Base repository providing generic CRUD operations for SQLAlchemy models."""
 
+import json
 import uuid
-from collections.abc import Sequence
-from dataclasses import dataclass, field
+from collections.abc import AsyncIterator, Hashable, Sequence
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime
 from typing import Any, Generic, Protocol, TypeGuard, TypeVar, get_args
 
-from sqlalchemy import Select, UniqueConstraint, and_, func, inspect, or_, select, update
+from sqlalchemy import (
+    JSON,
+    Integer,
+    Select,
+    String,
+    and_,
+    any_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    inspect,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import InstrumentedAttribute, load_only, selectinload, with_loader_criteria
-from sqlalchemy.sql.base import ExecutableOption
+from sqlalchemy.orm import load_only, with_loader_criteria
+from sqlalchemy.sql.base import Executable, ExecutableOption
+from sqlalchemy.sql.elements import ColumnElement
 
+from rssa_storage.shared.cache_invalidation import invalidate_model_caches
 from rssa_storage.shared.db_utils import SharedModel, SoftDeleteMixin
+from rssa_storage.shared.explain import Explain, estimated_rows
+from rssa_storage.shared.instrumentation import instrument_methods
+from rssa_storage.shared.loader_plan import LoaderPlan
+from rssa_storage.shared.model_registry import ModelMetadata, get_model_metadata
+from rssa_storage.shared.pagination import (
+    CountEstimate,
+    CursorPage,
+    InvalidCursorError,
+    KeysetCursor,
+    Page,
+    decode_cursor,
+    encode_cursor,
+)
+from rssa_storage.shared.projection import PROJECTION_FORMATS, ProjectionFormat, project_rows
+from rssa_storage.shared.search import IlikeSearch, SearchBackend
+from rssa_storage.shared.session_memo import MISSING, get_session_memo
+from rssa_storage.shared.statement_cache import StatementCache, statement_cache
 
 T = TypeVar('T', bound=SharedModel)
 
+_inferred_models: dict[type, type | None] = {}
+
+# Built once so cached statements share the same loader criteria option instead of a new lambda per query.
+_SOFT_DELETE_CRITERIA = with_loader_criteria(
+    SoftDeleteMixin,
+    lambda cls: cls.deleted_at.is_(None),
+    include_aliases=True,
+)
+
 
 @dataclass
 class RepoQueryOptions:
@@ -35,6 +84,41 @@ class RepoQueryOptions:
     load_options: Sequence[ExecutableOption] | None = field(default_factory=list)
     load_columns: list[str] | None = None
     load_relationships: dict[str, Any] | None = field(default_factory=dict)
+    keyset: bool = False
+    after_cursor: str | None = None
+    projection: list[str] | None = None
+    projection_format: ProjectionFormat = 'record'
+
+    @property
+    def uses_keyset(self) -> bool:
+        """Whether these options request keyset (cursor) pagination instead of limit/offset."""
+        return self.keyset or self.after_cursor is not None
+
+
+@dataclass
+class WriteResult(Generic[T]):
+    """Outcome of a set-based write.
+
+    Attributes:
+        rowcount: The number of rows affected.
+        items: The affected instances, populated only when the write was asked to return them.
+    """
+
+    rowcount: int = 0
+    items: list[T] = field(default_factory=list)
+
+
+@dataclass
+class IdLookupResult(Generic[T]):
+    """Outcome of a batched lookup by primary key.
+
+    Attributes:
+        items: The instances (or projected rows) found, in the order their IDs were requested.
+        missing: The requested IDs with no matching row, in request order.
+    """
+
+    items: list[T] = field(default_factory=list)
+    missing: list[uuid.UUID] = field(default_factory=list)
 
 
 class SoftDeletable(Protocol):
@@ -51,11 +135,37 @@ def is_soft_deletable(instance: Any) -> TypeGuard[SoftDeletable]:
 class BaseRepository(Generic[T]):
     """Base repository providing generic CRUD operations for SQLAlchemy models.
 
+    Public coroutine methods, including those defined by subclasses, report their calls, rows and
+    latency once `enable_instrumentation` is called for the engine the session is bound to.
+
     Attributes:
         db (AsyncSession): The asynchronous database session.
         model (Type[T]): The SQLAlchemy model class.
+        EXACT_COUNT_THRESHOLD: Estimated counts below this value are replaced by an exact count.
+        COPY_THRESHOLD: `bulk_create` switches to COPY when asked for ids and given at least this many rows.
+        ID_CHUNK_SIZE: The number of IDs `find_by_ids` binds per statement.
+        statement_cache: Cache of the statements built by `find_many`, `find_one`, `find_page`,
+            `stream_many` and `count`, keyed by the shape of their `RepoQueryOptions`.
+        cache_statements: Set to False on subclasses whose query building depends on more than the
+            shape reported by `_query_shape`.
+        search_backend: How `search_text` is matched against `search_columns`. Repositories whose
+            searchable columns carry trigram indexes use `TrigramSearch`.
+        SEARCHABLE_COLUMNS: The columns searched when `search_text` is given without `search_columns`;
+            when empty, every string column of the model (`ModelMetadata.searchable_columns`).
     """
 
+    EXACT_COUNT_THRESHOLD: int = 100_000
+    COPY_THRESHOLD: int = 10_000
+    ID_CHUNK_SIZE: int = 10_000
+    statement_cache: StatementCache = statement_cache
+    cache_statements: bool = True
+    search_backend: SearchBackend = IlikeSearch()
+    SEARCHABLE_COLUMNS: Sequence[str] = ()
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        instrument_methods(cls)
+
     def __init__(self, db: AsyncSession, model: type[T] | None = None):
         """Initialize the BaseRepository.
 
@@ -76,9 +186,21 @@ class BaseRepository(Generic[T]):
                 )
             self.model = inferred_model
 
+    @property
+    def meta(self) -> ModelMetadata:
+        """Cached introspection results (columns, relationships, unique constraints) for the model."""
+        return get_model_metadata(self.model)
+
     def _infer_model_type(self) -> type[T] | None:
-        """Inspects the class hierarchy to find the generic type argument for T."""
+        """Inspects the class hierarchy to find the generic type argument for T.
+
+        The result is cached per repository class, since repositories are constructed per request.
+        """
         cls = self.__class__
+        if cls in _inferred_models:
+            return _inferred_models[cls]
+
+        inferred = None
         for base in cls.__orig_bases__:  # type: ignore[attr-defined]
             origin = getattr(base, '__origin__', None)
 
@@ -86,14 +208,165 @@ class BaseRepository(Generic[T]):
                 args = get_args(base)
 
                 if args and len(args) > 0:
-                    return args[0]
-        return None
+                    inferred = args[0]
+                    break
+
+        _inferred_models[cls] = inferred
+        return inferred
+
+    def _build_statement(self, kind: str, options: RepoQueryOptions) -> tuple[Executable, dict[str, Any]]:
+        """Return the statement for a read and the parameters to execute it with.
+
+        The statement is looked up in the statement cache by its structural key, so the `Select` and its
+        loader options are only built the first time a given combination of filters, sorting, loaders
+        and soft-delete setting is used. Values are bound at execution time from the returned parameters.
+
+        Args:
+            kind: Which read the statement is for: 'many', 'one', 'page' or 'count'.
+            options: The query options to apply.
+
+        Returns:
+            The statement and its bound parameter values.
+        """
+        if options.projection and options.projection_format not in PROJECTION_FORMATS:
+            raise ValueError(f'Unknown projection format {options.projection_format!r}.')
+
+        params = self._query_params(options)
+        shape = self._query_shape(options) if self.cache_statements else None
+        if shape is None:
+            return self._construct_statement(kind, options), params
+
+        key = (type(self), self.model, kind, shape)
+        return self.statement_cache.get_or_build(key, lambda: self._construct_statement(kind, options)), params
+
+    def _construct_statement(self, kind: str, options: RepoQueryOptions) -> Select:
+        if kind == 'count':
+            query = select(func.count()).select_from(self.model)
+            if not options.include_deleted:
+                query = self._apply_soft_delete_criteria(query)
+            return self._apply_filtering_to_query(query, options)
+
+        entities = self._projection_columns(options) if options.projection else [self.model]
+        if kind == 'page':
+            query = select(*entities, func.count().over().label('total_count'))
+        else:
+            query = select(*entities)
+        query = self._apply_query_options(query, options)
+
+        if kind == 'one':
+            query = query.limit(1)
+        return query
+
+    def _query_shape(self, options: RepoQueryOptions) -> Hashable | None:
+        """Structural cache key for the statement built from the options.
+
+        The key records which filters, sort, pagination clauses and loaders are used, but not their
+        values. Options carrying arbitrary `load_options` cannot be keyed and return None; a `LoaderPlan`
+        can.
+        """
+        if options.load_options and not isinstance(options.load_options, LoaderPlan):
+            return None
+
+        cursor = self._decode_options_cursor(options)
+        return (
+            bool(options.ids),
+            tuple((name, _value_shape(value)) for name, value in options.filters.items()),
+            tuple((name, op) for name, op, _ in options.filter_ranges),
+            tuple(options.filter_ilike),
+            tuple(options.filter_not_null),
+            (self._search_columns(options), self.search_backend) if options.search_text else (),
+            options.sort_by,
+            options.sort_desc,
+            bool(options.limit),
+            bool(options.offset) and not options.uses_keyset,
+            options.uses_keyset,
+            None if cursor is None else cursor.value is None,
+            options.include_deleted,
+            tuple(options.load_columns) if options.load_columns else (),
+            _freeze_relationships(options.load_relationships),
+            options.load_options or (),
+            tuple(options.projection) if options.projection else (),
+        )
+
+    def _query_params(self, options: RepoQueryOptions) -> dict[str, Any]:
+        """Bound parameter values for the statement built from the options, keyed by bind name."""
+        params = self._filter_params(options)
+
+        if options.uses_keyset:
+            cursor = self._decode_options_cursor(options)
+            if cursor is not None:
+                params['cursor_id'] = cursor.last_id
+                if cursor.value is not None:
+                    params['cursor_value'] = cursor.value
+            if options.limit:
+                params['limit'] = options.limit + 1
+        else:
+            if options.limit:
+                params['limit'] = options.limit
+            if options.offset:
+                params['offset'] = options.offset
+
+        return params
+
+    def _filter_params(self, options: RepoQueryOptions) -> dict[str, Any]:
+        """Bound parameter values for the clauses added by `_apply_filtering_to_query`."""
+        params: dict[str, Any] = {}
+
+        if options.ids:
+            params['ids'] = list(options.ids)
+        for name, value in options.filters.items():
+            if value is not None:
+                params[f'filter_{name}'] = list(value) if isinstance(value, (list, tuple)) else value
+        for index, (_, _, value) in enumerate(options.filter_ranges):
+            params[f'range_{index}'] = value
+        for name, value in options.filter_ilike.items():
+            params[f'ilike_{name}'] = f'%{value}%'
+        if self._search_columns(options):
+            params.update(self.search_backend.bind_params(options.search_text))
+        return params
+
+    @staticmethod
+    def _decode_options_cursor(options: RepoQueryOptions) -> KeysetCursor | None:
+        """Decode the options' cursor and check that it belongs to the requested sort order."""
+        if options.after_cursor is None:
+            return None
+
+        cursor = decode_cursor(options.after_cursor)
+        if cursor.sort_by != options.sort_by or cursor.sort_desc != options.sort_desc:
+            raise InvalidCursorError('Pagination cursor does not match the requested sort order.')
+        return cursor
+
+    def _projection_fields(self, options: RepoQueryOptions) -> list[str]:
+        """The column names selected in projection mode.
+
+        Keyset pagination needs `id` and the sort column to build the next cursor, so they are appended
+        when missing.
+        """
+        fields = list(options.projection or [])
+        if options.uses_keyset:
+            for name in ('id', options.sort_by):
+                if name and name not in fields:
+                    fields.append(name)
+        return fields
+
+    def _projection_columns(self, options: RepoQueryOptions) -> list[Any]:
+        columns = []
+        for name in self._projection_fields(options):
+            attr = self.meta.column(name)
+            if attr is None:
+                raise AttributeError(f'Model "{self.model.__name__}" has no column "{name}".')
+            columns.append(attr.label(name))
+        return columns
+
+    def _project(self, rows: Any, options: RepoQueryOptions) -> list[Any]:
+        return project_rows(rows, self.model, self._projection_fields(options), options.projection_format)
 
     def _apply_query_options(self, query: Select, options: RepoQueryOptions) -> Select:
         """Centralized method to apply common query options to a SQLAlchemy Select query."""
         query = self._apply_filtering_to_query(query, options)
         query = self._apply_sorting_and_pagination(query, options)
-        query = self._apply_load_options(query, options)
+        if not options.projection:
+            query = self._apply_load_options(query, options)
 
         if not options.include_deleted:
             query = self._apply_soft_delete_criteria(query)
@@ -102,58 +375,107 @@ class BaseRepository(Generic[T]):
 
     def _apply_sorting_and_pagination(self, query: Select, options: RepoQueryOptions) -> Select:
         """Apply sorting, limit, and offset mutations to the query."""
+        if options.uses_keyset:
+            return self._apply_keyset_pagination(query, options)
+
         if options.sort_by:
             query = self._sort(query, options.sort_by, options.sort_desc)
+        elif search_columns := self._search_columns(options):
+            query = self._order_by_relevance(query, options.search_text, search_columns)
 
         if options.limit:
-            query = query.limit(options.limit)
+            query = query.limit(bindparam('limit', options.limit, type_=Integer))
 
         if options.offset:
-            query = query.offset(options.offset)
+            query = query.offset(bindparam('offset', options.offset, type_=Integer))
 
         return query
 
-    def _build_column_loaders(self, load_columns: list[str]) -> list[ExecutableOption]:
-        """Build deferred loading options (load_only) for top-level columns."""
-        column_attrs = []
-        for col_name in load_columns:
-            attr = getattr(self.model, col_name, None)
-            if isinstance(attr, InstrumentedAttribute) and hasattr(attr.property, 'columns'):
-                column_attrs.append(attr)
+    def _apply_keyset_pagination(self, query: Select, options: RepoQueryOptions) -> Select:
+        """Apply cursor based sorting and pagination to the query.
 
-        return [load_only(*column_attrs)] if column_attrs else []
+        Rows are ordered by the sort column with `id` as a tie-breaker, and the cursor is turned into a
+        `WHERE (sort_col, id) > (:value, :id)` predicate so Postgres can seek straight to the next page
+        through an index instead of scanning and discarding every skipped row. One extra row is fetched
+        so `find_many` can tell whether another page exists.
+        """
+        sort_attr = self._get_sort_attribute(options.sort_by)
+        id_attr = self.model.id
+
+        cursor = self._decode_options_cursor(options)
+        if cursor is not None:
+            query = query.where(self._keyset_predicate(sort_attr, options.sort_desc, cursor))
+
+        order_cols = [sort_attr, id_attr] if sort_attr is not None else [id_attr]
+        query = query.order_by(*(col.desc() if options.sort_desc else col.asc() for col in order_cols))
+
+        if options.limit:
+            query = query.limit(bindparam('limit', options.limit + 1, type_=Integer))
+
+        return query
 
-    def _build_relationship_loaders(
-        self, model_class: type, rel_dict: dict[str, Any], current_path: Any = None
-    ) -> list[ExecutableOption]:
-        """Recursively build eager load strategies (selectinload) for relationships."""
-        loaders = []
+    def _keyset_predicate(self, sort_attr: Any, desc: bool, cursor: KeysetCursor) -> Any:
+        """Build the predicate selecting rows that come after the cursor.
 
-        for rel_name, rel_data in rel_dict.items():
-            rel_attr = getattr(model_class, rel_name, None)
+        Postgres sorts NULLs last in ascending order and first in descending order, so NULL sort values
+        are handled explicitly rather than through the row comparison.
+        """
+        id_attr = self.model.id
+        last_id = bindparam('cursor_id', cursor.last_id, type_=id_attr.type)
+
+        if sort_attr is None:
+            return id_attr < last_id if desc else id_attr > last_id
 
-            if isinstance(rel_attr, InstrumentedAttribute) and hasattr(rel_attr.property, 'mapper'):
-                loader = selectinload(rel_attr) if current_path is None else current_path.selectinload(rel_attr)
+        if cursor.value is None:
+            in_null_block = and_(sort_attr.is_(None), id_attr < last_id if desc else id_attr > last_id)
+            return or_(in_null_block, sort_attr.is_not(None)) if desc else in_null_block
 
-                rel_columns = rel_data.get('columns', [])
-                nested_rels = rel_data.get('relationships', {})
-                nested_model = rel_attr.property.mapper.class_
+        row = tuple_(sort_attr, id_attr)
+        bound = tuple_(bindparam('cursor_value', cursor.value, type_=sort_attr.type), last_id)
+        predicate = row < bound if desc else row > bound
 
-                if rel_columns:
-                    nested_attrs = []
-                    for col_name in rel_columns:
-                        child_attr = getattr(nested_model, col_name, None)
-                        if isinstance(child_attr, InstrumentedAttribute) and hasattr(child_attr.property, 'columns'):
-                            nested_attrs.append(child_attr)
-                    if nested_attrs:
-                        loader = loader.load_only(*nested_attrs)
+        if not desc and sort_attr.key in self.meta.nullable_columns:
+            predicate = or_(predicate, sort_attr.is_(None))
+        return predicate
 
-                loaders.append(loader)
+    def _get_sort_attribute(self, sort_by: str | None) -> Any:
+        """Resolve a sortable column attribute by name, or None when it is not a column."""
+        if not sort_by:
+            return None
+        return self.meta.column(sort_by)
+
+    def _build_cursor_page(self, items: Sequence[T], options: RepoQueryOptions) -> CursorPage[T]:
+        """Trim the look-ahead row from a keyset query result and compute the next cursor."""
+        if not options.limit or len(items) <= options.limit:
+            return CursorPage(items)
+
+        page = list(items[: options.limit])
+        last = page[-1]
+        sort_attr = self._get_sort_attribute(options.sort_by)
+        next_cursor = encode_cursor(
+            KeysetCursor(
+                sort_by=options.sort_by,
+                sort_desc=options.sort_desc,
+                value=getattr(last, sort_attr.key) if sort_attr is not None else None,
+                last_id=last.id,
+            )
+        )
+        return CursorPage(page, next_cursor=next_cursor)
 
-                if nested_rels:
-                    loaders.extend(self._build_relationship_loaders(nested_model, nested_rels, loader))
+    def _build_column_loaders(self, load_columns: list[str]) -> list[ExecutableOption]:
+        """Build deferred loading options (load_only) for top-level columns."""
+        meta = self.meta
+        column_attrs = [attr for attr in (meta.column(col_name) for col_name in load_columns) if attr is not None]
+
+        return [load_only(*column_attrs)] if column_attrs else []
 
-        return loaders
+    def _build_relationship_loaders(self, model_class: type, rel_dict: dict[str, Any]) -> list[ExecutableOption]:
+        """Build eager load strategies for relationships, planned once per `load_relationships` shape.
+
+        See `LoaderPlan`: shared path prefixes are merged, many-to-one relationships are joined and
+        collections are loaded with `selectinload`.
+        """
+        return list(LoaderPlan.from_relationships(model_class, rel_dict))
 
     def _apply_load_options(self, query: Select, options: RepoQueryOptions) -> Select:
         """Apply deferred column loading and relationship eager loading strategies."""
@@ -161,7 +483,10 @@ class BaseRepository(Generic[T]):
             query = query.options(*options.load_options)
 
         if options.load_columns:
-            col_loaders = self._build_column_loaders(options.load_columns)
+            load_columns = list(options.load_columns)
+            if options.uses_keyset and options.sort_by and options.sort_by not in load_columns:
+                load_columns.append(options.sort_by)
+            col_loaders = self._build_column_loaders(load_columns)
             if col_loaders:
                 query = query.options(*col_loaders)
 
@@ -172,10 +497,19 @@ class BaseRepository(Generic[T]):
 
         return query
 
+    @staticmethod
+    def _any_of(attr: Any, name: str, values: Sequence[Any]) -> ColumnElement[bool]:
+        """`attr = ANY(:name)`, binding the whole collection as one array parameter.
+
+        Unlike an expanding `IN`, the SQL text does not depend on the number of values, so the statement
+        stays cacheable and is not limited by the driver's maximum number of bind parameters.
+        """
+        return attr == any_(bindparam(name, list(values), type_=ARRAY(attr.type)))
+
     def _apply_filtering_to_query(self, query: Select, options: RepoQueryOptions) -> Select:
         """Apply filtering options (filters, ranges, search, etc.) to the query."""
         if options.ids:
-            query = query.where(self.model.id.in_(options.ids))
+            query = query.where(self._any_of(self.model.id, 'ids', options.ids))
 
         if options.filters:
             query = self._filter(query, options.filters)
@@ -189,8 +523,8 @@ class BaseRepository(Generic[T]):
         if options.filter_not_null:
             query = self._apply_not_null_filters(query, options.filter_not_null)
 
-        if options.search_text and options.search_columns:
-            query = self._filter_similar(query, options.search_text, options.search_columns)
+        if search_columns := self._search_columns(options):
+            query = self._filter_similar(query, options.search_text, search_columns)
 
         return query
 
@@ -202,17 +536,18 @@ class BaseRepository(Generic[T]):
             ranges: List of tuples (column_name, operator, value).
                     Operator can be '>=', '<=', '>', '<'.
         """
-        for col_name, op, value in ranges:
-            col_attr = getattr(self.model, col_name, None)
+        for index, (col_name, op, value) in enumerate(ranges):
+            col_attr = self.meta.column(col_name)
             if col_attr is not None:
+                bound = bindparam(f'range_{index}', value, type_=col_attr.type)
                 if op == '>=':
-                    query = query.where(col_attr >= value)
+                    query = query.where(col_attr >= bound)
                 elif op == '<=':
-                    query = query.where(col_attr <= value)
+                    query = query.where(col_attr <= bound)
                 elif op == '>':
-                    query = query.where(col_attr > value)
+                    query = query.where(col_attr > bound)
                 elif op == '<':
-                    query = query.where(col_attr < value)
+                    query = query.where(col_attr < bound)
         return query
 
     def _apply_not_null_filters(self, query: Select, columns: list[str]) -> Select:
@@ -222,13 +557,13 @@ class BaseRepository(Generic[T]):
             query: The SQLAlchemy Select query.
             columns: List of column/relationship names to check for existence (NOT NULL).
         """
-        mapper = inspect(self.model)
+        meta = self.meta
 
         for col_name in columns:
-            col_attr = getattr(self.model, col_name, None)
+            col_attr = meta.attribute(col_name)
             if col_attr is not None:
-                if col_name in mapper.relationships:
-                    relationship = mapper.relationships[col_name]
+                relationship = meta.relationship(col_name)
+                if relationship is not None:
                     if relationship.uselist:
                         query = query.where(col_attr.any())
                     else:
@@ -245,9 +580,9 @@ class BaseRepository(Generic[T]):
             filters: Dictionary of {column_name: search_string}.
         """
         for col_name, value in filters.items():
-            col_attr = getattr(self.model, col_name, None)
+            col_attr = self.meta.column(col_name)
             if col_attr is not None:
-                query = query.where(col_attr.ilike(f'%{value}%'))
+                query = query.where(col_attr.ilike(bindparam(f'ilike_{col_name}', f'%{value}%', type_=String)))
         return query
 
     def _apply_soft_delete_filter(self, query: Select) -> Select:
@@ -259,7 +594,7 @@ class BaseRepository(Generic[T]):
         Returns:
             The modified Select query excluding soft-deleted records.
         """
-        deleted_attr = getattr(self.model, 'deleted_at', None)
+        deleted_attr = self.meta.soft_delete_column
         if deleted_attr is not None:
             query = query.where(deleted_attr.is_(None))
         return query
@@ -267,35 +602,133 @@ class BaseRepository(Generic[T]):
     def _apply_soft_delete_criteria(self, query: Select) -> Select:
         """Apply soft delete filters to the main model and all loaded relationships."""
         query = self._apply_soft_delete_filter(query)
-
-        query = query.options(
-            with_loader_criteria(
-                SoftDeleteMixin,
-                lambda cls: cls.deleted_at.is_(None),
-                include_aliases=True,
-            )
-        )
-        return query
+        return query.options(_SOFT_DELETE_CRITERIA)
 
     async def find_many(self, options: RepoQueryOptions | None = None) -> Sequence[T]:
         """Find multiple instances based on the provided query options.
 
+        When keyset pagination is requested (`options.keyset` or `options.after_cursor`), the result is a
+        `CursorPage` whose `next_cursor` resumes after the last returned row. When `options.projection` is
+        set, only those columns are selected and rows are returned as records, tuples or dicts (see
+        `options.projection_format`) without ORM hydration or session tracking.
+
         Args:
             options: The query options to apply.
 
         Returns:
-            A list of instances matching the query options.
+            A list of instances (or projected rows) matching the query options.
         """
         options = options or RepoQueryOptions()
-        query = select(self.model)
-        query = self._apply_query_options(query, options)
-        result = await self.db.execute(query)
+        query, params = self._build_statement('many', options)
+        result = await self.db.execute(query, params)
+
+        if options.projection:
+            rows = result.all()
+            if options.uses_keyset:
+                page = self._build_cursor_page(rows, options)
+                return CursorPage(self._project(page, options), next_cursor=page.next_cursor)
+            return self._project(rows, options)
+
+        items = result.scalars().all()
+
+        if options.uses_keyset:
+            return self._build_cursor_page(items, options)
+        return items
+
+    async def find_page(self, options: RepoQueryOptions | None = None) -> Page[T]:
+        """Find a page of instances together with the total count in a single round trip.
+
+        The total is computed with a `count(*) OVER ()` window over the same filtered, soft-delete aware
+        query, so list views no longer need a separate `count` call. When paginating by cursor, the
+        total counts the rows remaining from the cursor onward.
+
+        Args:
+            options: The query options to apply.
+
+        Returns:
+            The page of instances and the total number of matching rows.
+        """
+        options = options or RepoQueryOptions()
+        query, params = self._build_statement('page', options)
+        result = await self.db.execute(query, params)
+        rows = result.all()
+
+        if rows:
+            total = rows[0].total_count
+        elif options.offset and not options.after_cursor:
+            # The page is past the end, so the window had no rows to report the total on.
+            total = await self.count(options)
+        else:
+            # Nothing remains from the cursor onward, and nothing matched without one.
+            total = 0
+
+        if options.projection:
+            page = self._build_cursor_page(rows, options) if options.uses_keyset else CursorPage(rows)
+            items = self._project((row[:-1] for row in page), options)
+            return Page(items=items, total=total, next_cursor=page.next_cursor)
+
+        items = [row[0] for row in rows]
+        if options.uses_keyset:
+            cursor_page = self._build_cursor_page(items, options)
+            return Page(items=list(cursor_page), total=total, next_cursor=cursor_page.next_cursor)
+        return Page(items=items, total=total)
+
+    async def stream_many(
+        self,
+        options: RepoQueryOptions | None = None,
+        batch_size: int = 1000,
+        expunge: bool = False,
+    ) -> AsyncIterator[T]:
+        """Stream instances matching the query options through a server-side cursor.
+
+        Rows are fetched `batch_size` at a time, so exporting millions of rows does not materialize the
+        whole result set in memory the way `find_many` does.
 
-        return result.scalars().all()
+        Args:
+            options: The query options to apply.
+            batch_size: The number of rows fetched from the server per round trip.
+            expunge: If True, each batch is expunged from the session once it has been consumed, so the
+                identity map does not grow with the size of the result.
+
+        Yields:
+            Instances matching the query options.
+        """
+        options = options or RepoQueryOptions()
+        query, params = self._build_statement('many', options)
+        query = query.execution_options(yield_per=batch_size)
+
+        remaining = options.limit if options.uses_keyset and options.limit else None
+        result = await self.db.stream(query, params)
+        partitions = result.partitions() if options.projection else result.scalars().partitions()
+        try:
+            async for partition in partitions:
+                if remaining is not None:
+                    partition = partition[:remaining]
+                    remaining -= len(partition)
+
+                if options.projection:
+                    for record in self._project(partition, options):
+                        yield record
+                else:
+                    for instance in partition:
+                        yield instance
+
+                    if expunge:
+                        for instance in partition:
+                            if instance in self.db:
+                                self.db.expunge(instance)
+
+                if remaining == 0:
+                    break
+        finally:
+            await result.close()
 
     async def find_one(self, options: RepoQueryOptions | None = None) -> T | None:
         """Find a single instance based on the provided query options.
 
+        When memoization is enabled on the session (see `enable_session_memo`), repeating an identical
+        lookup within the same unit of work returns the earlier result without a round trip.
+
         Args:
             options: The query options to apply.
 
@@ -303,36 +736,132 @@ class BaseRepository(Generic[T]):
             An instance matching the query options, or None if not found.
         """
         options = options or RepoQueryOptions()
-        query = select(self.model)
-        query = self._apply_query_options(query, options)
-        query = query.limit(1)
-        result = await self.db.execute(query)
-        return result.scalars().first()
+        query, params = self._build_statement('one', options)
+
+        memo = get_session_memo(self.db)
+        memo_key = self._memo_key(options, params) if memo is not None and not self._has_pending_changes() else None
+        if memo_key is not None:
+            memoized = memo.get(memo_key)
+            if memoized is not MISSING and (memoized is None or memoized in self.db):
+                return memoized
+
+        result = await self.db.execute(query, params)
+        if options.projection:
+            row = result.first()
+            return self._project([row], options)[0] if row is not None else None
+
+        instance = result.scalars().first()
+
+        if memo_key is not None:
+            memo.set(memo_key, instance)
+        return instance
+
+    async def get_by_id(self, instance_id: uuid.UUID, include_deleted: bool = False) -> T | None:
+        """Get an instance by primary key, checking the session identity map before querying.
+
+        An instance already loaded by this session (through any repository) is returned without a round
+        trip, following `AsyncSession.get` semantics.
+
+        Args:
+            instance_id: The ID of the instance.
+            include_deleted: If True, soft-deleted instances are returned as well.
+
+        Returns:
+            The instance, or None if it does not exist or is soft-deleted.
+        """
+        instance = await self.db.get(self.model, instance_id)
+        if instance is None:
+            return None
+        if not include_deleted and self.meta.soft_delete_column is not None and instance.deleted_at is not None:
+            return None
+        return instance
+
+    async def find_by_ids(
+        self, ids: Sequence[uuid.UUID], options: RepoQueryOptions | None = None, chunk_size: int | None = None
+    ) -> IdLookupResult[T]:
+        """Find many instances by primary key, returned in the order of `ids`.
+
+        The IDs are bound as a single array parameter (`id = ANY(:ids)`), so the statement text and its
+        cached plan are the same for any number of IDs and no per-element parameters are generated.
+        Duplicate IDs are looked up once; very large inputs are split into chunks of `ID_CHUNK_SIZE`.
+
+        Args:
+            ids: The IDs to look up.
+            options: Further filters, loader options or a projection to apply. Sorting and pagination
+                options are ignored. A projection must include `id`.
+            chunk_size: Overrides `ID_CHUNK_SIZE` for this call.
+
+        Returns:
+            The instances found, in request order, and the IDs that matched no row.
+        """
+        options = options or RepoQueryOptions()
+        if options.projection and 'id' not in options.projection:
+            raise ValueError('find_by_ids needs "id" in the projection to match rows to the requested IDs.')
+
+        unique_ids = list(dict.fromkeys(ids))
+        size = chunk_size or self.ID_CHUNK_SIZE
+        found: dict[uuid.UUID, Any] = {}
+        for start in range(0, len(unique_ids), size):
+            chunk_options = replace(
+                options,
+                ids=unique_ids[start : start + size],
+                sort_by=None,
+                limit=None,
+                offset=None,
+                keyset=False,
+                after_cursor=None,
+            )
+            for item in await self.find_many(chunk_options):
+                found[self._row_id(item, options)] = item
+
+        result: IdLookupResult[T] = IdLookupResult()
+        for instance_id in unique_ids:
+            item = found.get(instance_id)
+            if item is None:
+                result.missing.append(instance_id)
+            else:
+                result.items.append(item)
+        return result
+
+    @staticmethod
+    def _row_id(item: Any, options: RepoQueryOptions) -> uuid.UUID:
+        if not options.projection or options.projection_format == 'record':
+            return item.id
+        if options.projection_format == 'dict':
+            return item['id']
+        return item[options.projection.index('id')]
+
+    def _memo_key(self, options: RepoQueryOptions, params: dict[str, Any]) -> Hashable | None:
+        """Key identifying a `find_one` lookup in the session memo, or None if it cannot be memoized."""
+        shape = self._query_shape(options) if self.cache_statements and not options.projection else None
+        if shape is None:
+            return None
+
+        frozen = tuple(
+            (name, tuple(value) if isinstance(value, list) else value) for name, value in sorted(params.items())
+        )
+        key = (type(self), self.model, shape, frozen)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _has_pending_changes(self) -> bool:
+        """Whether the next query would autoflush, in which case memoized results may be stale."""
+        return bool(self.db.autoflush and (self.db.new or self.db.dirty or self.db.deleted))
 
     async def find_existing_by_unique_fields(self, instance: T) -> T | None:
         """Dynamically find an existing record that matches the unique constraints of the instance."""
-        mapper = inspect(self.model)
+        meta = self.meta
         unique_conditions = []
 
-        for column in mapper.attrs:
-            if hasattr(column, 'columns') and column.columns[0].unique:
-                val = getattr(instance, column.key)
-                if val is not None:
-                    unique_conditions.append(getattr(self.model, column.key) == val)
-
-        for constraint in getattr(self.model.__table__, 'constraints', []):
-            if isinstance(constraint, UniqueConstraint):
-                col_conditions = []
-                has_null = False
-
-                for col in constraint.columns:
-                    val = getattr(instance, col.name)
-                    if val is None:
-                        has_null = True
-                        break
-                    col_conditions.append(getattr(self.model, col.name) == val)
-                if not has_null and col_conditions:
-                    unique_conditions.append(and_(*col_conditions))
+        for column_keys in meta.unique_column_sets:
+            values = [getattr(instance, key) for key in column_keys]
+            if values and all(val is not None for val in values):
+                unique_conditions.append(
+                    and_(*(meta.columns[key] == val for key, val in zip(column_keys, values, strict=True)))
+                )
 
         if not unique_conditions:
             return None
@@ -376,6 +905,236 @@ class BaseRepository(Generic[T]):
         await self.db.flush()
         return instances
 
+    async def bulk_create(
+        self,
+        instances: Sequence[T | dict[str, Any]],
+        chunk_size: int = 1000,
+        return_ids: bool = False,
+        copy_threshold: int | None = None,
+    ) -> list[T] | list[uuid.UUID]:
+        """Insert many rows without going through the unit of work.
+
+        Unlike `create_all`, rows are written in chunks with `INSERT ... RETURNING` (batched by
+        insertmanyvalues) instead of being tracked in the identity map first. When only ids are requested
+        and the batch is at least `copy_threshold` rows, the rows are streamed with `COPY` through the
+        raw asyncpg connection, inside the session's transaction.
+
+        Args:
+            instances: ORM instances or dicts of column values. Instances are not added to the session.
+            chunk_size: The number of rows sent per statement.
+            return_ids: If True, return the ids of the inserted rows instead of hydrated instances.
+            copy_threshold: Overrides `COPY_THRESHOLD` for this call.
+
+        Returns:
+            The inserted instances, or their ids in input order when `return_ids` is True.
+        """
+        rows = [self._to_row(instance) for instance in instances]
+        if not rows:
+            return []
+
+        for row in rows:
+            if row.get('id') is None:
+                row['id'] = uuid.uuid4()
+
+        threshold = self.COPY_THRESHOLD if copy_threshold is None else copy_threshold
+        if return_ids and len(rows) >= threshold and await self._copy_rows(rows):
+            invalidate_model_caches(self.db, self.model)
+            return [row['id'] for row in rows]
+
+        created: list[Any] = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start : start + chunk_size]
+            if return_ids:
+                # An ORM bulk INSERT without RETURNING is still an executemany, and it goes through
+                # do_orm_execute, so caches invalidated on writes to the model see it.
+                await self.db.execute(insert(self.model), chunk)
+                created.extend(row['id'] for row in chunk)
+            else:
+                result = await self.db.scalars(insert(self.model).returning(self.model), chunk)
+                created.extend(result.all())
+
+        return created
+
+    @staticmethod
+    def _group_by_keys(rows: Sequence[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+        groups: dict[frozenset[str], list[dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(frozenset(row), []).append(row)
+        return list(groups.values())
+
+    async def _copy_rows(self, rows: list[dict[str, Any]]) -> bool:
+        """Write rows with COPY on the session's connection. Returns False if the driver is not asyncpg."""
+        conn = await self.db.connection()
+        if conn.dialect.driver != 'asyncpg':
+            return False
+
+        table = self.model.__table__
+        for row in rows:
+            for column in table.columns:
+                if column.key not in row and column.default is not None:
+                    default = column.default
+                    if default.is_scalar:
+                        row[column.key] = default.arg
+                    elif default.is_callable:
+                        row[column.key] = default.arg(None)
+
+        raw_conn = (await conn.get_raw_connection()).driver_connection
+        for group in self._group_by_keys(rows):
+            columns = [table.c[key] for key in group[0]]
+            records = [tuple(self._copy_value(col, row[col.key]) for col in columns) for row in group]
+            await raw_conn.copy_records_to_table(
+                table.name,
+                schema_name=table.schema,
+                columns=[col.name for col in columns],
+                records=records,
+            )
+        return True
+
+    @staticmethod
+    def _copy_value(column: Any, value: Any) -> Any:
+        """Adapt a Python value for asyncpg's binary COPY, which expects JSON as text."""
+        if value is not None and isinstance(column.type, JSON):
+            return json.dumps(value)
+        return value
+
+    def _resolve_conflict_columns(self, rows: Sequence[dict[str, Any]]) -> tuple[str, ...]:
+        """Pick the first ON CONFLICT target for which every row provides non-null values.
+
+        Deferrable unique constraints and partial unique indexes cannot act as arbiters and are never
+        candidates; composite constraints are tried first so the most specific target is preferred.
+        """
+        for target in self.meta.conflict_targets:
+            if all(all(row.get(col) is not None for col in target) for row in rows):
+                return target
+
+        raise ValueError(
+            f'Could not derive an ON CONFLICT target for {self.model.__name__}: no unique constraint is fully '
+            "populated by the given rows. Pass 'conflict_columns' explicitly."
+        )
+
+    def _column(self, key: str) -> Any:
+        """Return the table column mapped to an attribute name."""
+        attr = self.meta.column(key)
+        if attr is None:
+            raise ValueError(f'Model "{self.model.__name__}" has no column attribute "{key}".')
+        return attr.property.columns[0]
+
+    @staticmethod
+    def _last_row_per_target(rows: list[dict[str, Any]], target: Sequence[str]) -> list[dict[str, Any]]:
+        """Keep the last of the rows sharing conflict target values.
+
+        Postgres refuses to let one `INSERT ... ON CONFLICT DO UPDATE` affect a row twice. Rows with a
+        null target value never conflict and are all kept.
+        """
+        by_target: dict[Any, dict[str, Any]] = {}
+        for index, row in enumerate(rows):
+            values = tuple(row.get(key) for key in target)
+            by_target[index if None in values else values] = row
+        return list(by_target.values())
+
+    def _to_row(self, instance: T | dict[str, Any]) -> dict[str, Any]:
+        """Convert an ORM instance into a dict of the column values that have been set on it."""
+        if isinstance(instance, dict):
+            return dict(instance)
+
+        state = inspect(instance)
+        return {key: state.dict[key] for key in self.meta.columns if key in state.dict}
+
+    async def upsert(
+        self,
+        instance: T | dict[str, Any],
+        conflict_columns: Sequence[str] | None = None,
+        update_fields: Sequence[str] | None = None,
+        do_nothing: bool = False,
+    ) -> T | None:
+        """Insert an instance, or update the existing row it conflicts with, in a single statement.
+
+        Unlike `create`, a duplicate does not roll back the session: the statement is an
+        `INSERT ... ON CONFLICT ... RETURNING`, and the conflict target is derived from the model's unique
+        constraints unless given.
+
+        Args:
+            instance: The ORM instance or a dict of column values to insert.
+            conflict_columns: Attribute names of the unique constraint to resolve conflicts on.
+            update_fields: Fields to overwrite on conflict. Defaults to every provided field except the
+                conflict columns, `id` and `created_at`.
+            do_nothing: If True, keep the existing row untouched (`ON CONFLICT DO NOTHING`).
+
+        Returns:
+            The inserted or updated instance. With `do_nothing`, the existing row is fetched on conflict.
+        """
+        row = self._to_row(instance)
+        target = tuple(conflict_columns) if conflict_columns else self._resolve_conflict_columns([row])
+
+        upserted = await self.upsert_all(
+            [row], conflict_columns=target, update_fields=update_fields, do_nothing=do_nothing
+        )
+        if upserted:
+            return upserted[0]
+
+        conditions = [self._column(key) == row.get(key) for key in target]
+        result = await self.db.execute(select(self.model).where(*conditions))
+        return result.scalars().first()
+
+    async def upsert_all(
+        self,
+        instances: Sequence[T | dict[str, Any]],
+        conflict_columns: Sequence[str] | None = None,
+        update_fields: Sequence[str] | None = None,
+        do_nothing: bool = False,
+    ) -> list[T]:
+        """Insert or update many instances with `INSERT ... ON CONFLICT ... RETURNING`.
+
+        Rows are sent through SQLAlchemy's insertmanyvalues batching, so thousands of rows cost a handful
+        of round trips rather than one per row. Rows that provide different sets of fields are upserted
+        in separate statements so a missing field never overwrites an existing value. When several rows
+        of a statement share conflict target values, only the last one is upserted.
+
+        Args:
+            instances: The ORM instances or dicts of column values to upsert.
+            conflict_columns: Attribute names of the unique constraint to resolve conflicts on.
+            update_fields: Fields to overwrite on conflict. Defaults to every provided field except the
+                conflict columns, `id` and `created_at`.
+            do_nothing: If True, conflicting rows are skipped and not returned.
+
+        Returns:
+            The inserted and updated instances, as loaded from the RETURNING clause.
+        """
+        rows = [self._to_row(instance) for instance in instances]
+        if not rows:
+            return []
+
+        target = tuple(conflict_columns) if conflict_columns else self._resolve_conflict_columns(rows)
+
+        index_elements = [self._column(key) for key in target]
+
+        upserted: list[T] = []
+        for group in self._group_by_keys(rows):
+            group = self._last_row_per_target(group, target)
+            keys = group[0].keys()
+            stmt = pg_insert(self.model)
+            set_fields = (
+                [name for name in update_fields if name in keys]
+                if update_fields is not None
+                else [name for name in keys if name not in target and name not in ('id', 'created_at')]
+            )
+
+            if do_nothing or not set_fields:
+                stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+            else:
+                columns = [self._column(name).key for name in set_fields]
+                set_ = {column: stmt.excluded[column] for column in columns}
+                if 'updated_at' in self.model.__table__.c and 'updated_at' not in set_:
+                    set_['updated_at'] = func.now()
+                stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
+
+            result = await self.db.scalars(
+                stmt.returning(self.model), group, execution_options={'populate_existing': True}
+            )
+            upserted.extend(result.all())
+
+        return upserted
+
     async def update(self, instance_id: uuid.UUID, updated_fields: dict[str, Any]) -> T | None:
         """Update an instance in the database.
 
@@ -386,7 +1145,7 @@ class BaseRepository(Generic[T]):
         Returns:
             The updated instance or None if not found.
         """
-        instance = await self.find_one(RepoQueryOptions(ids=[instance_id]))
+        instance = await self.get_by_id(instance_id)
         if instance:
             for field_name, value in updated_fields.items():
                 setattr(instance, field_name, value)
@@ -403,11 +1162,9 @@ class BaseRepository(Generic[T]):
         Returns:
             True if the instance was deleted, False otherwise.
         """
-        instance = await self.find_one(RepoQueryOptions(ids=[instance_id]))
+        instance = await self.get_by_id(instance_id)
         if instance:
             if is_soft_deletable(instance):
-                from datetime import UTC, datetime
-
                 instance.deleted_at = datetime.now(UTC)
             else:
                 await self.db.delete(instance)
@@ -415,6 +1172,103 @@ class BaseRepository(Generic[T]):
             return True
         return False
 
+    async def update_by_id(
+        self, instance_id: uuid.UUID, values: dict[str, Any], include_deleted: bool = False
+    ) -> T | None:
+        """Update a single row with `UPDATE ... WHERE id = :id RETURNING ...`, without loading it first.
+
+        Args:
+            instance_id: The ID of the instance to update.
+            values: The fields to set.
+            include_deleted: Whether soft-deleted rows may be updated.
+
+        Returns:
+            The updated instance, or None if no (live) row has that ID.
+        """
+        stmt = update(self.model).where(self.model.id == instance_id).values(**values)
+        if not include_deleted:
+            stmt = self._apply_soft_delete_filter(stmt)
+
+        result = await self.db.scalars(stmt.returning(self.model), execution_options={'populate_existing': True})
+        return result.first()
+
+    async def delete_by_id(self, instance_id: uuid.UUID) -> bool:
+        """Delete a single row without loading it first.
+
+        Soft-deletable models get `deleted_at` set by an UPDATE; other models are removed with a DELETE.
+
+        Args:
+            instance_id: The ID of the instance to delete.
+
+        Returns:
+            True if a row was deleted, False otherwise.
+        """
+        if self.meta.soft_delete_column is not None:
+            result = await self.soft_delete_many([instance_id])
+            return result.rowcount > 0
+
+        result = await self.db.execute(delete(self.model).where(self.model.id == instance_id))
+        return result.rowcount > 0
+
+    async def update_many(
+        self,
+        filters: dict[str, Any] | RepoQueryOptions,
+        values: dict[str, Any],
+        returning: bool = False,
+    ) -> WriteResult[T]:
+        """Apply the same values to every row matching the filters in one UPDATE statement.
+
+        Args:
+            filters: Exact-match filters, or full query options (only their filtering fields are used).
+            values: The fields to set.
+            returning: If True, return the updated instances.
+
+        Returns:
+            The number of affected rows and, if requested, the updated instances.
+        """
+        options = filters if isinstance(filters, RepoQueryOptions) else RepoQueryOptions(filters=filters)
+
+        stmt = update(self.model).values(**values)
+        stmt = self._apply_filtering_to_query(stmt, options)
+        if not options.include_deleted:
+            stmt = self._apply_soft_delete_filter(stmt)
+
+        return await self._execute_write(stmt, returning)
+
+    async def soft_delete_many(self, ids: Sequence[uuid.UUID], returning: bool = False) -> WriteResult[T]:
+        """Soft delete many rows by ID in one UPDATE statement.
+
+        Rows that are already soft-deleted keep their original `deleted_at` and are not counted.
+
+        Args:
+            ids: The IDs of the instances to delete.
+            returning: If True, return the deleted instances.
+
+        Returns:
+            The number of affected rows and, if requested, the deleted instances.
+        """
+        deleted_attr = self.meta.soft_delete_column
+        if deleted_attr is None:
+            raise ValueError(f'{self.model.__name__} does not support soft deletes.')
+        if not ids:
+            return WriteResult()
+
+        stmt = (
+            update(self.model)
+            .where(self._any_of(self.model.id, 'ids', ids), deleted_attr.is_(None))
+            .values(deleted_at=datetime.now(UTC))
+        )
+        return await self._execute_write(stmt, returning)
+
+    async def _execute_write(self, stmt: Any, returning: bool) -> WriteResult[T]:
+        if returning:
+            result = await self.db.scalars(stmt.returning(self.model), execution_options={'populate_existing': True})
+            items = list(result.all())
+            return WriteResult(rowcount=len(items), items=items)
+
+        result = await self.db.execute(stmt)
+        return WriteResult(rowcount=result.rowcount)
+
     async def batch_update(self, update_data: Sequence[dict[str, Any]]) -> bool:
         """Update multiple instances in a single batch operation.
 
@@ -438,10 +1292,34 @@ class BaseRepository(Generic[T]):
             await self.db.rollback()
             raise e
 
+    def _require_attribute(self, name: str) -> Any:
+        """Resolve a column or relationship attribute by name, raising AttributeError if it does not exist."""
+        attr = self.meta.attribute(name)
+        if attr is None:
+            raise AttributeError(f'Model "{self.model.__name__}" has no attribute "{name}".')
+        return attr
+
+    def _search_columns(self, options: RepoQueryOptions) -> tuple[str, ...]:
+        """The columns `options.search_text` is matched against, or () when there is nothing to search."""
+        if not options.search_text:
+            return ()
+        return tuple(options.search_columns or self.SEARCHABLE_COLUMNS or self.meta.searchable_columns)
+
+    def _search_attributes(self, names: Sequence[str]) -> list[Any]:
+        """Resolve search column names, raising ValueError for columns that are not string-typed."""
+        searchable = self.meta.searchable_columns
+        for name in names:
+            if name not in searchable:
+                self._require_attribute(name)
+                raise ValueError(
+                    f'Column "{name}" of {self.model.__name__} is not a string column and cannot be searched.'
+                )
+        return [self.meta.columns[name] for name in names]
+
     def _filter_similar(
         self, query: Select, filter_str: str | None = None, filter_cols: list[str] | None = None
     ) -> Select:
-        """Add search filters to the query based on specified columns.
+        """Add search filters to the query based on specified columns, using the repository's search backend.
 
         Args:
             query: The SQLAlchemy Select query to modify.
@@ -452,15 +1330,19 @@ class BaseRepository(Generic[T]):
             The modified Select query with search filters applied.
         """
         if filter_str and filter_cols:
-            search_pattern = f'%{filter_str}%'
-            conditions = []
-            for col_name in filter_cols:
-                column_attribute = getattr(self.model, col_name)
-                conditions.append(column_attribute.ilike(search_pattern))
-            return query.where(or_(*conditions))
+            columns = self._search_attributes(filter_cols)
+            return query.where(self.search_backend.condition(columns, filter_str))
 
         return query
 
+    def _order_by_relevance(self, query: Select, filter_str: str, filter_cols: list[str]) -> Select:
+        """Order search results by the backend's relevance rank, most relevant first, if it ranks."""
+        columns = self._search_attributes(filter_cols)
+        rank = self.search_backend.rank(columns, filter_str)
+        if rank is None:
+            return query
+        return query.order_by(rank.desc(), self.model.id)
+
     def _filter(self, query: Select, filters: dict[str, Any]) -> Select:
         """Add exact match filters to the query based on specified columns.
 
@@ -472,12 +1354,13 @@ class BaseRepository(Generic[T]):
             The modified Select query with exact match filters applied.
         """
         for col_name, col_val in filters.items():
-            col_attr = getattr(self.model, col_name)
-            if col_attr is not None:
-                if isinstance(col_val, (list, tuple)):
-                    query = query.where(col_attr.in_(col_val))
-                else:
-                    query = query.where(col_attr == col_val)
+            col_attr = self._require_attribute(col_name)
+            if col_val is None:
+                query = query.where(col_attr.is_(None))
+            elif isinstance(col_val, (list, tuple)):
+                query = query.where(self._any_of(col_attr, f'filter_{col_name}', col_val))
+            else:
+                query = query.where(col_attr == bindparam(f'filter_{col_name}', col_val))
 
         return query
 
@@ -492,7 +1375,7 @@ class BaseRepository(Generic[T]):
         Returns:
             The modified Select query with sorting applied.
         """
-        col_to_sort = getattr(self.model, sort_by, None)
+        col_to_sort = self.meta.column(sort_by)
         if col_to_sort is not None:
             if desc:
                 query = query.order_by(col_to_sort.desc())
@@ -500,16 +1383,104 @@ class BaseRepository(Generic[T]):
                 query = query.order_by(col_to_sort.asc())
         return query
 
-    async def count(self, options: RepoQueryOptions) -> int:
+    async def count(self, options: RepoQueryOptions, estimate: bool = False) -> int:
         """Count the total number of instances of the model.
 
+        Args:
+            options: The query options to filter by.
+            estimate: If True, use planner estimates for large tables (see `estimate_count`).
+
         Returns:
             The total number of instances.
         """
-        query = select(func.count()).select_from(self.model)
+        if estimate:
+            return (await self.estimate_count(options)).value
+
+        query, params = self._build_statement('count', options)
+        result = await self.db.execute(query, params)
+        return result.scalar_one()
+
+    async def estimate_count(
+        self, options: RepoQueryOptions | None = None, exact_threshold: int | None = None
+    ) -> CountEstimate:
+        """Estimate the number of matching instances without scanning the table.
+
+        Without any filtering the estimate comes from the planner statistics in `pg_class.reltuples`;
+        with filters (including the implicit soft-delete filter) it is the row estimate from `EXPLAIN`.
+        Estimates below the threshold, or tables that have never been analyzed, fall back to an exact
+        `count`, since those are cheap to count and small numbers are where estimates are least accurate.
+
+        Args:
+            options: The query options to filter by.
+            exact_threshold: Overrides `EXACT_COUNT_THRESHOLD` for this call.
+
+        Returns:
+            The count and whether it is an estimate.
+        """
+        options = options or RepoQueryOptions()
+        threshold = self.EXACT_COUNT_THRESHOLD if exact_threshold is None else exact_threshold
+
+        if self._has_filter_criteria(options):
+            estimate = await self._explain_row_estimate(options)
+        else:
+            estimate = await self._table_row_estimate()
+
+        if estimate is None or estimate < threshold:
+            return CountEstimate(value=await self.count(options), is_estimate=False)
+        return CountEstimate(value=estimate, is_estimate=True)
+
+    def _has_filter_criteria(self, options: RepoQueryOptions) -> bool:
+        """Whether the options add any WHERE criteria, including the implicit soft-delete filter."""
+        if not options.include_deleted and self.meta.soft_delete_column is not None:
+            return True
+        return bool(
+            options.ids
+            or options.filters
+            or options.filter_ranges
+            or options.filter_ilike
+            or options.filter_not_null
+            or self._search_columns(options)
+        )
+
+    async def _table_row_estimate(self) -> int | None:
+        """Read the planner's row estimate for the model's table from `pg_class`."""
+        query = text('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)').bindparams(
+            bindparam('table_name', self.model.__table__.fullname)
+        )
+        result = await self.db.execute(query)
+        reltuples = result.scalar_one_or_none()
+
+        # reltuples is -1 for tables that have never been vacuumed or analyzed.
+        if reltuples is None or reltuples < 0:
+            return None
+        return int(reltuples)
+
+    async def _explain_row_estimate(self, options: RepoQueryOptions) -> int | None:
+        """Read the planner's row estimate for the filtered query from `EXPLAIN`."""
+        query = select(self.model.id)
         if not options.include_deleted:
-            query = self._apply_soft_delete_criteria(query)
+            query = self._apply_soft_delete_filter(query)
         query = self._apply_filtering_to_query(query, options)
 
-        result = await self.db.execute(query)
-        return result.scalar_one()
+        result = await self.db.execute(Explain(query))
+        return estimated_rows(result.scalar_one())
+
+
+instrument_methods(BaseRepository)
+
+
+def _value_shape(value: Any) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, (list, tuple)):
+        return 'many'
+    return 'one'
+
+
+def _freeze_relationships(relationships: dict[str, Any] | None) -> tuple:
+    if not relationships:
+        return ()
+    return tuple(
+        (name, tuple(data.get('columns', [])), _freeze_relationships(data.get('relationships')))
+        for name, data in relationships.items()
+    )
@@ -0,0 +1,127 @@
+"""Invalidation of process-wide caches when a session writes the rows they were loaded from."""
+
+from collections.abc import Callable, Hashable, Iterable
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from rssa_storage.shared.ttl_cache import TTLCache
+
+_INVALIDATORS_KEY = 'rssa_storage.cache_invalidators'
+
+# Execution option that marks a bulk statement as not affecting cached values, e.g. a bookkeeping UPDATE.
+SKIP_CACHE_INVALIDATION = 'rssa_storage.skip_cache_invalidation'
+
+
+def attribute_values(instance: Any, name: str) -> set[Any]:
+    """Return an instance's current value of an attribute and, if it was changed, the previous one."""
+    history = inspect(instance).attrs[name].history
+    return {getattr(instance, name), *(history.deleted or ())}
+
+
+class WriteInvalidator:
+    """Invalidates the cache entries derived from instances of one model written through a session.
+
+    Entries are invalidated as soon as a write is flushed or executed, and again when the transaction
+    commits or rolls back, so a value cached from the session's own uncommitted state, or by another
+    session before the commit, does not outlive the transaction. Bulk statements against the model's
+    table clear the whole cache, since the rows they touch are not known.
+
+    Attributes:
+        cache: The cache to invalidate.
+        model: The mapped class whose writes are watched.
+        keys: Returns the cache keys that depend on an instance; None clears the whole cache on any write.
+    """
+
+    def __init__(self, cache: TTLCache, model: type, keys: Callable[[Any], Iterable[Hashable]] | None):
+        self.cache = cache
+        self.model = model
+        self.keys = keys
+        self._pending: set[Hashable] = set()
+        self._pending_all = False
+
+    def mark(self, keys: Iterable[Hashable]) -> None:
+        """Invalidate keys now and again at the end of the transaction."""
+        for key in keys:
+            self._pending.add(key)
+            self.cache.invalidate(key)
+
+    def mark_all(self) -> None:
+        """Clear the cache now and again at the end of the transaction."""
+        self._pending_all = True
+        self.cache.clear()
+
+    def _after_flush(self, session: Session, _flush_context: Any) -> None:
+        for instance in chain(session.new, session.dirty, session.deleted):
+            if not isinstance(instance, self.model):
+                continue
+            if self.keys is None:
+                self.mark_all()
+                return
+            self.mark(self.keys(instance))
+
+    def _on_execute(self, orm_execute_state: ORMExecuteState) -> None:
+        if orm_execute_state.is_select or orm_execute_state.execution_options.get(SKIP_CACHE_INVALIDATION):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, self.model):
+            self.mark_all()
+
+    def _end_transaction(self, _session: Session) -> None:
+        if self._pending_all:
+            self.cache.clear()
+        else:
+            for key in self._pending:
+                self.cache.invalidate(key)
+        self._pending.clear()
+        self._pending_all = False
+
+
+def invalidate_on_write(
+    session: AsyncSession, cache: TTLCache, model: type, keys: Callable[[Any], Iterable[Hashable]] | None
+) -> WriteInvalidator | None:
+    """Watch a session for writes to `model` and invalidate the dependent entries of `cache`.
+
+    Calling it again for the same session, cache and model returns the existing invalidator.
+
+    Args:
+        session: The session writes are made through.
+        cache: The cache holding values loaded from `model` rows.
+        model: The mapped class whose writes are watched.
+        keys: Returns the cache keys that depend on an instance; use `attribute_values` to include
+            the keys an instance had before it was changed. None clears the whole cache on any write,
+            for caches whose keys cannot be derived from the written instance.
+
+    Returns:
+        The invalidator, or None if `session` is not backed by a real `Session`.
+    """
+    sync_session = getattr(session, 'sync_session', None)
+    if not isinstance(sync_session, Session):
+        return None
+
+    invalidators = sync_session.info.setdefault(_INVALIDATORS_KEY, {})
+    invalidator = invalidators.get((model, cache))
+    if invalidator is None:
+        invalidator = WriteInvalidator(cache, model, keys)
+        invalidators[(model, cache)] = invalidator
+        event.listen(sync_session, 'after_flush', invalidator._after_flush)
+        event.listen(sync_session, 'do_orm_execute', invalidator._on_execute)
+        event.listen(sync_session, 'after_commit', invalidator._end_transaction)
+        event.listen(sync_session, 'after_rollback', invalidator._end_transaction)
+    return invalidator
+
+
+def invalidate_model_caches(session: AsyncSession, model: type) -> None:
+    """Clear every cache watching a session for writes to `model`, after a write that bypasses the ORM.
+
+    Writes made on the raw connection, such as COPY, reach neither `after_flush` nor `do_orm_execute`.
+    """
+    sync_session = getattr(session, 'sync_session', None)
+    if not isinstance(sync_session, Session):
+        return
+    for invalidator in sync_session.info.get(_INVALIDATORS_KEY, {}).values():
+        if issubclass(model, invalidator.model):
+            invalidator.mark_all()
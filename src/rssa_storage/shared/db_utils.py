@@ -103,6 +103,7 @@ class DateAuditMixin:
         nullable=False,
         server_default=sa.func.now(),
         default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
     )
 
 
@@ -0,0 +1,63 @@
+"""An executable EXPLAIN construct for SQLAlchemy statements."""
+
+import json
+from typing import Any
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+
+class Explain(Executable, ClauseElement):
+    """Wrap a statement in `EXPLAIN (...)` while keeping its bound parameters.
+
+    Attributes:
+        statement: The statement to explain.
+        analyze: Whether to execute the statement and report actual timings (EXPLAIN ANALYZE).
+        buffers: Whether to report buffer usage. Only meaningful together with `analyze`.
+        format: The output format, JSON by default so the plan can be parsed.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Any, analyze: bool = False, buffers: bool = False, format: str = 'JSON'):
+        self.statement = statement
+        self.analyze = analyze
+        self.buffers = buffers
+        self.format = format
+
+    @property
+    def explain_options(self) -> str:
+        opts = []
+        if self.analyze:
+            opts.append('ANALYZE')
+        if self.buffers:
+            opts.append('BUFFERS')
+        opts.append(f'FORMAT {self.format}')
+        return ', '.join(opts)
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return f'EXPLAIN ({element.explain_options}) {compiler.process(element.statement, **kw)}'
+
+
+def parse_json_plan(raw: Any) -> dict[str, Any]:
+    """Return the top-level plan node from the output of `EXPLAIN (FORMAT JSON)`.
+
+    Args:
+        raw: The single value returned by the EXPLAIN query, either already decoded or as JSON text.
+
+    Returns:
+        The root plan entry, containing the `Plan` node and, for ANALYZE, timing information.
+    """
+    if isinstance(raw, (str, bytes)):
+        raw = json.loads(raw)
+    if isinstance(raw, list):
+        raw = raw[0]
+    return raw
+
+
+def estimated_rows(raw: Any) -> int:
+    """Return the planner's row estimate from the output of `EXPLAIN (FORMAT JSON)`."""
+    return int(parse_json_plan(raw)['Plan']['Plan Rows'])
@@ -0,0 +1,415 @@
+"""Query instrumentation: call counts, rows and latency histograms per repository method and per statement."""
+
+import functools
+import hashlib
+import inspect
+import json
+import re
+import threading
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Callable, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, Protocol
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Upper bounds, in seconds, of the latency buckets; Prometheus' defaults extended down to 0.5 ms.
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_COUNTER_HELP = {'rows': 'Rows returned or affected.', 'errors': 'Calls that raised.'}
+
+
+class Histogram:
+    """A latency histogram with fixed bucket bounds, in the shape Prometheus expects.
+
+    Attributes:
+        bounds: The inclusive upper bound of each bucket, in seconds, in increasing order.
+        counts: The number of observations per bucket, not cumulative; the last entry counts values
+            above every bound.
+        sum: The total of all observations.
+        count: The number of observations.
+    """
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Add one observation."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return (upper bound, observations at or below it) pairs, ending with (inf, count)."""
+        pairs, total = [], 0
+        for bound, count in zip((*self.bounds, float('inf')), self.counts, strict=True):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket containing it."""
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank and total:
+                return bound
+        return 0.0
+
+
+@dataclass
+class OperationStats:
+    """Counters and latency of one repository method or statement fingerprint.
+
+    Attributes:
+        calls: The number of calls or executions.
+        rows: The number of rows returned or affected, as reported by the driver.
+        errors: The number of calls that raised.
+        latency: The latency histogram, in seconds.
+        statement: For statement fingerprints, the normalized SQL.
+    """
+
+    calls: int = 0
+    rows: int = 0
+    errors: int = 0
+    latency: Histogram = field(default_factory=Histogram)
+    statement: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            'calls': self.calls,
+            'rows': self.rows,
+            'errors': self.errors,
+            'seconds_total': self.latency.sum,
+            'p50_seconds': self.latency.quantile(0.5),
+            'p99_seconds': self.latency.quantile(0.99),
+            'buckets': {_format_bound(bound): count for bound, count in self.latency.cumulative()},
+        }
+        if self.statement is not None:
+            data['statement'] = self.statement
+        return data
+
+
+class MetricsSink(Protocol):
+    """What instrumentation reports to; implement it to forward measurements elsewhere."""
+
+    def record_method(self, name: str, seconds: float, rows: int, error: bool) -> None: ...
+
+    def record_statement(self, statement: str, seconds: float, rows: int) -> None: ...
+
+
+class MetricsRegistry:
+    """The in-process `MetricsSink`, which aggregates measurements for export as JSON or Prometheus text.
+
+    Recording only appends to a queue, which is thread-safe without a lock; measurements are folded
+    into the histograms, and statements fingerprinted, when they are read or once `fold_every` of them
+    are pending.
+
+    Attributes:
+        buckets: The latency bucket bounds, in seconds, of every histogram.
+        fold_every: The number of pending measurements that triggers folding on the recording thread.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, fold_every: int = 4096):
+        self.buckets = tuple(buckets)
+        self.fold_every = fold_every
+        self._methods: dict[str, OperationStats] = {}
+        self._statements: dict[str, OperationStats] = {}
+        self._pending: deque[tuple[Any, ...]] = deque()
+        self._lock = threading.Lock()
+
+    def record_method(self, name: str, seconds: float, rows: int, error: bool) -> None:
+        """Record one call of a repository method, e.g. 'MovieRepository.get_by_similarity'."""
+        self._pending.append((name, seconds, rows, error))
+        if len(self._pending) >= self.fold_every:
+            self._fold()
+
+    def record_statement(self, statement: str, seconds: float, rows: int) -> None:
+        """Record one execution of a statement, as sent to the driver; it is kept by fingerprint."""
+        self._pending.append((statement, seconds, rows, None))
+        if len(self._pending) >= self.fold_every:
+            self._fold()
+
+    def _fold(self) -> None:
+        with self._lock:
+            pending = self._pending
+            for _ in range(len(pending)):
+                key, seconds, rows, error = pending.popleft()
+                if error is None:
+                    key, normalized = fingerprint_statement(key)
+                    stats = self._statements.get(key)
+                    if stats is None:
+                        stats = self._statements[key] = self._new_stats(normalized)
+                else:
+                    stats = self._methods.get(key)
+                    if stats is None:
+                        stats = self._methods[key] = self._new_stats()
+                    stats.errors += error
+                stats.calls += 1
+                stats.rows += rows
+                stats.latency.observe(seconds)
+
+    def _new_stats(self, statement: str | None = None) -> OperationStats:
+        return OperationStats(latency=Histogram(self.buckets), statement=statement)
+
+    def methods(self) -> dict[str, OperationStats]:
+        """The stats of each repository method, by 'Repository.method' name."""
+        self._fold()
+        with self._lock:
+            return dict(self._methods)
+
+    def statements(self) -> dict[str, OperationStats]:
+        """The stats of each statement, by fingerprint."""
+        self._fold()
+        with self._lock:
+            return dict(self._statements)
+
+    def reset(self) -> None:
+        """Forget every measurement."""
+        with self._lock:
+            self._pending.clear()
+            self._methods.clear()
+            self._statements.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return every measurement as plain data, the slowest operations (by total time) first."""
+
+        def by_time(items: dict[str, OperationStats]) -> dict[str, Any]:
+            ordered = sorted(items.items(), key=lambda item: item[1].latency.sum, reverse=True)
+            return {name: stats.to_dict() for name, stats in ordered}
+
+        return {'methods': by_time(self.methods()), 'statements': by_time(self.statements())}
+
+    def to_json(self, **kwargs: Any) -> str:
+        """Return `to_dict()` as JSON; keyword arguments are passed to `json.dumps`."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, prefix: str = 'rssa_storage') -> str:
+        """Return every measurement in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for kind, label, items, counters in (
+            ('repository_method', 'method', self.methods(), ('rows', 'errors')),
+            ('statement', 'fingerprint', self.statements(), ('rows',)),
+        ):
+            name = f'{prefix}_{kind}'
+            lines += [f'# HELP {name}_seconds Latency of each {kind.replace("_", " ")}.']
+            lines += [f'# TYPE {name}_seconds histogram']
+            for key, stats in items.items():
+                labels = f'{label}="{_escape_label(key)}"'
+                for bound, count in stats.latency.cumulative():
+                    lines.append(f'{name}_seconds_bucket{{{labels},le="{_format_bound(bound)}"}} {count}')
+                lines.append(f'{name}_seconds_sum{{{labels}}} {stats.latency.sum!r}')
+                lines.append(f'{name}_seconds_count{{{labels}}} {stats.latency.count}')
+            for counter in counters:
+                lines += [f'# HELP {name}_{counter}_total {_COUNTER_HELP[counter]}']
+                lines += [f'# TYPE {name}_{counter}_total counter']
+                for key, stats in items.items():
+                    lines.append(f'{name}_{counter}_total{{{label}="{_escape_label(key)}"}} {getattr(stats, counter)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_PLACEHOLDER = re.compile(r'\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+|\?')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def fingerprint_statement(statement: str) -> tuple[str, str]:
+    """Return a short fingerprint and the normalized SQL of a statement.
+
+    Placeholders are replaced by `?` and lists of them, such as an expanded IN, collapse to `(?, ...)`,
+    so statements that differ only in their parameters share a fingerprint.
+    """
+    normalized = _WHITESPACE.sub(' ', statement).strip()
+    normalized = _PLACEHOLDER_LIST.sub('(?, ...)', _PLACEHOLDER.sub('?', normalized))
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest(), normalized
+
+
+class _MethodCall:
+    __slots__ = ('name', 'rows')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+
+
+_current_call: ContextVar[_MethodCall | None] = ContextVar('rssa_storage_current_call', default=None)
+
+# The attribute holding the `_EngineListener` of an instrumented `Engine`, found from a session's bind
+# with a few attribute lookups on every repository call.
+_LISTENER_ATTRIBUTE = '_rssa_storage_listener'
+
+
+class _EngineListener:
+    """The cursor execution hooks of one instrumented engine, and the sink its repositories report to.
+
+    The start time is kept on the execution context; fingerprinting is left to the sink.
+    """
+
+    def __init__(self, sink: MetricsSink):
+        self.sink = sink
+
+    def before_cursor_execute(self, _conn: Any, _cursor: Any, statement: str, params: Any, context: Any, *_: Any):
+        # Listened to with retval=True, which spares SQLAlchemy wrapping it to return these.
+        if context is not None:
+            context._rssa_storage_started = perf_counter()
+        return statement, params
+
+    def after_cursor_execute(self, _conn: Any, cursor: Any, statement: str, _params: Any, context: Any, *_: Any):
+        started = getattr(context, '_rssa_storage_started', None)
+        if started is None:
+            return
+        seconds = perf_counter() - started
+        rows = cursor.rowcount
+        if rows < 0:
+            rows = 0
+        self.sink.record_statement(statement, seconds, rows)
+        call = _current_call.get()
+        if call is not None:
+            call.rows += rows
+
+    def listen(self, engine: Engine) -> None:
+        event.listen(engine, 'before_cursor_execute', self.before_cursor_execute, retval=True)
+        event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+    def remove(self, engine: Engine) -> None:
+        event.remove(engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.remove(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+
+def instrument_engine(engine: AsyncEngine | Engine, sink: MetricsSink) -> None:
+    """Record every statement executed through `engine`, and the repository methods using it, into `sink`.
+
+    Calling it again for the same engine replaces the sink.
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    listener = getattr(sync_engine, _LISTENER_ATTRIBUTE, None)
+    if listener is None:
+        listener = _EngineListener(sink)
+        listener.listen(sync_engine)
+        setattr(sync_engine, _LISTENER_ATTRIBUTE, listener)
+    listener.sink = sink
+
+
+def uninstrument_engine(engine: AsyncEngine | Engine) -> None:
+    """Stop recording the statements executed through `engine` and the repository methods using it."""
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    listener = getattr(sync_engine, _LISTENER_ATTRIBUTE, None)
+    if listener is not None:
+        listener.remove(sync_engine)
+        delattr(sync_engine, _LISTENER_ATTRIBUTE)
+
+
+def _listener_for(repository: Any) -> _EngineListener | None:
+    # The bind is an AsyncEngine or AsyncConnection, or for sync sessions an Engine or Connection.
+    bind = getattr(getattr(repository, 'db', None), 'bind', None)
+    engine = getattr(getattr(bind, 'sync_engine', bind), 'engine', None)
+    return getattr(engine, _LISTENER_ATTRIBUTE, None)
+
+
+def current_method() -> str | None:
+    """The instrumented repository method running in this context, e.g. 'MovieRepository.get_by_similarity'."""
+    call = _current_call.get()
+    return call.name if call is not None else None
+
+
+def instrumented(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Time a repository coroutine method into the sink of the engine its session is bound to, if any.
+
+    Calls made from inside another instrumented method are attributed to the outer one, along with
+    the rows of every statement they execute.
+    """
+    if getattr(method, '__instrumented__', False):
+        return method
+    name = method.__name__
+    labels: dict[type, str] = {}
+
+    @functools.wraps(method)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        listener = _listener_for(self) if _current_call.get() is None else None
+        if listener is None:
+            return await method(self, *args, **kwargs)
+
+        sink = listener.sink
+        cls = type(self)
+        label = labels.get(cls)
+        if label is None:
+            label = labels[cls] = f'{cls.__name__}.{name}'
+        call = _MethodCall(label)
+        token = _current_call.set(call)
+        start = perf_counter()
+        try:
+            result = await method(self, *args, **kwargs)
+        except BaseException:
+            _current_call.reset(token)
+            sink.record_method(label, perf_counter() - start, call.rows, True)
+            raise
+        seconds = perf_counter() - start
+        _current_call.reset(token)
+        sink.record_method(label, seconds, call.rows, False)
+        return result
+
+    wrapper.__instrumented__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def instrument_methods(cls: type) -> None:
+    """Wrap the public coroutine methods defined on `cls` with `instrumented`."""
+    for name, value in list(vars(cls).items()):
+        if not name.startswith('_') and inspect.iscoroutinefunction(value):
+            setattr(cls, name, instrumented(value))
+
+
+def enable_instrumentation(engine: AsyncEngine | Engine, sink: MetricsSink | None = None) -> MetricsSink:
+    """Record the statements executed through `engine`, and the repository methods using it, into `sink`.
+
+    Repository methods report to the sink of the engine their session is bound to, so each engine can
+    have its own sink; methods of a session without a bind are not recorded.
+
+    Args:
+        engine: The engine whose statements and repository methods are recorded.
+        sink: Where to record; a new `MetricsRegistry` if None.
+
+    Returns:
+        The sink, e.g. a `MetricsRegistry` to dump with `to_json()` or `to_prometheus()`.
+    """
+    sink = sink if sink is not None else MetricsRegistry()
+    instrument_engine(engine, sink)
+    return sink
+
+
+def disable_instrumentation(engine: AsyncEngine | Engine) -> None:
+    """Stop recording the statements executed through `engine` and the repository methods using it."""
+    uninstrument_engine(engine)
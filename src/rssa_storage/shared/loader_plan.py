@@ -0,0 +1,184 @@
+"""Planning of relationship eager loads: merged paths, a strategy per relationship and the query count."""
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Literal
+
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.sql.base import ExecutableOption
+
+from rssa_storage.shared.model_registry import get_model_metadata
+
+LoaderStrategy = Literal['joined', 'selectin']
+
+
+@dataclass(frozen=True)
+class LoaderNode:
+    """One relationship to eager load, with the columns to restrict it to and the relationships below it.
+
+    Attributes:
+        name: The relationship attribute name.
+        columns: The columns to load (`load_only`); empty loads all of them.
+        children: The relationships to load from the related model.
+    """
+
+    name: str
+    columns: tuple[str, ...] = ()
+    children: tuple['LoaderNode', ...] = ()
+
+
+def _merge_nodes(*groups: Iterable[LoaderNode]) -> tuple[LoaderNode, ...]:
+    """Merge node lists so each relationship appears once per level, combining columns and children."""
+    merged: dict[str, LoaderNode] = {}
+    for nodes in groups:
+        for node in nodes:
+            existing = merged.get(node.name)
+            if existing is None:
+                merged[node.name] = node
+                continue
+            columns = existing.columns + tuple(c for c in node.columns if c not in existing.columns)
+            merged[node.name] = LoaderNode(node.name, columns, _merge_nodes(existing.children, node.children))
+    return tuple(merged.values())
+
+
+def _path_nodes(path: str) -> tuple[LoaderNode, ...]:
+    node = None
+    for name in reversed(path.split('.')):
+        node = LoaderNode(name, children=(node,) if node else ())
+    return (node,) if node else ()
+
+
+def _relationship_nodes(relationships: Mapping[str, Any]) -> tuple[LoaderNode, ...]:
+    return tuple(
+        LoaderNode(
+            name,
+            tuple(data.get('columns') or ()),
+            _relationship_nodes(data.get('relationships') or {}),
+        )
+        for name, data in relationships.items()
+    )
+
+
+class LoaderPlan(Sequence[ExecutableOption]):
+    """A deduplicated tree of relationship paths to eager load from one model.
+
+    Paths sharing a prefix are merged, so each relationship is loaded once, and each relationship gets
+    the strategy that costs the fewest round trips: `joinedload` for many-to-one (and other scalar)
+    relationships, which adds a JOIN to the query loading their parent, and `selectinload` for
+    collections, which issues one extra SELECT per level. The loader options are built once, on first
+    use, which also defers mapper inspection until the models are configured.
+
+    A plan is a sequence of loader options, so it can be passed wherever `load_options` are expected;
+    unlike an arbitrary options tuple it is hashable, so statements using it stay cacheable.
+
+    Attributes:
+        model: The mapped class the paths start from.
+        nodes: The merged relationship tree.
+        strict: Whether unknown relationship names raise instead of being skipped.
+    """
+
+    def __init__(self, model: type, nodes: Iterable[LoaderNode] = (), strict: bool = True):
+        self.model = model
+        self.nodes = _merge_nodes(nodes)
+        self.strict = strict
+        self._built: tuple[tuple[ExecutableOption, ...], Mapping[str, LoaderStrategy]] | None = None
+
+    @classmethod
+    def from_paths(cls, model: type, *paths: str) -> 'LoaderPlan':
+        """Plan dotted relationship paths, e.g. `'study_step_page_contents.survey_scale.survey_scale_levels'`.
+
+        Unknown relationship names raise `AttributeError` when the plan is first used.
+        """
+        return cls(model, _merge_nodes(*(_path_nodes(path) for path in paths)))
+
+    @classmethod
+    def from_relationships(cls, model: type, relationships: Mapping[str, Any]) -> 'LoaderPlan':
+        """Plan a `RepoQueryOptions.load_relationships` tree, memoized per model and tree shape.
+
+        Unknown relationship and column names are skipped, as they come from the caller's request.
+        """
+        return _planned(model, _relationship_nodes(relationships))
+
+    def merge(self, other: 'LoaderPlan') -> 'LoaderPlan':
+        """Return a plan loading the paths of both plans, which must start from the same model."""
+        if other.model is not self.model:
+            raise ValueError(f'Cannot merge loader plans for {self.model.__name__} and {other.model.__name__}.')
+        return LoaderPlan(self.model, _merge_nodes(self.nodes, other.nodes), self.strict and other.strict)
+
+    @property
+    def options(self) -> tuple[ExecutableOption, ...]:
+        """The loader options, one per top-level relationship with the rest nested below it."""
+        return self._build_once()[0]
+
+    @property
+    def strategies(self) -> Mapping[str, LoaderStrategy]:
+        """The strategy chosen for each planned relationship, by dotted path."""
+        return self._build_once()[1]
+
+    @property
+    def query_count(self) -> int:
+        """The number of SELECTs loading a result with this plan issues: one, plus one per `selectinload`.
+
+        This assumes each `selectinload` level loads at most 500 parents; SQLAlchemy splits larger
+        batches into one SELECT per 500 parent keys.
+        """
+        return 1 + sum(1 for strategy in self.strategies.values() if strategy == 'selectin')
+
+    def _build_once(self) -> tuple[tuple[ExecutableOption, ...], Mapping[str, LoaderStrategy]]:
+        if self._built is None:
+            strategies: dict[str, LoaderStrategy] = {}
+            options = (self._build(self.model, node, '', strategies) for node in self.nodes)
+            self._built = tuple(option for option in options if option is not None), MappingProxyType(strategies)
+        return self._built
+
+    def _build(
+        self, model: type, node: LoaderNode, prefix: str, strategies: dict[str, LoaderStrategy]
+    ) -> ExecutableOption | None:
+        relationship = get_model_metadata(model).relationship(node.name)
+        if relationship is None:
+            if self.strict:
+                raise AttributeError(f'Model "{model.__name__}" has no relationship "{node.name}".')
+            return None
+
+        path = f'{prefix}{node.name}'
+        strategy: LoaderStrategy = 'selectin' if relationship.uselist else 'joined'
+        strategies[path] = strategy
+
+        related = relationship.mapper.class_
+        loader = (selectinload if strategy == 'selectin' else joinedload)(getattr(model, node.name))
+        related_meta = get_model_metadata(related)
+        columns = [attr for attr in (related_meta.column(name) for name in node.columns) if attr is not None]
+        if columns:
+            loader = loader.load_only(*columns)
+        children = (self._build(related, child, f'{path}.', strategies) for child in node.children)
+        children = tuple(child for child in children if child is not None)
+        if children:
+            loader = loader.options(*children)
+        return loader
+
+    def __iter__(self) -> Iterator[ExecutableOption]:
+        return iter(self.options)
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.options[index]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LoaderPlan):
+            return NotImplemented
+        return (self.model, self.nodes, self.strict) == (other.model, other.nodes, other.strict)
+
+    def __hash__(self) -> int:
+        return hash((self.model, self.nodes, self.strict))
+
+    def __repr__(self) -> str:
+        return f'LoaderPlan({self.model.__name__}, {[node.name for node in self.nodes]!r})'
+
+
+@lru_cache(maxsize=256)
+def _planned(model: type, nodes: tuple[LoaderNode, ...]) -> LoaderPlan:
+    return LoaderPlan(model, nodes, strict=False)
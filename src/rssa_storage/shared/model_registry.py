@@ -0,0 +1,138 @@
+"""Process-wide cache of mapper introspection results for repository models."""
+
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+from sqlalchemy import Index, String, UniqueConstraint, inspect
+from sqlalchemy.orm import InstrumentedAttribute, RelationshipProperty
+
+
+@dataclass(frozen=True)
+class ModelMetadata:
+    """Introspection results for a mapped model, built once per model.
+
+    Attributes:
+        model: The mapped model class.
+        columns: Column attributes keyed by attribute name.
+        relationships: Relationship properties keyed by attribute name.
+        unique_column_sets: Attribute names of every unique column and unique constraint, used to find
+            existing rows that would conflict with an instance.
+        conflict_targets: Attribute names of the column sets usable as an ON CONFLICT arbiter (non-deferrable
+            unique constraints and non-partial unique indexes), most specific first, ending with the primary key.
+        searchable_columns: Names of the string-typed columns, which are the ones text search can apply to.
+        nullable_columns: Names of the columns that accept NULL.
+        soft_delete_column: The `deleted_at` attribute, or None if the model is not soft-deletable.
+    """
+
+    model: type
+    columns: Mapping[str, InstrumentedAttribute]
+    relationships: Mapping[str, RelationshipProperty]
+    unique_column_sets: tuple[tuple[str, ...], ...]
+    conflict_targets: tuple[tuple[str, ...], ...]
+    searchable_columns: tuple[str, ...]
+    nullable_columns: frozenset[str]
+    soft_delete_column: InstrumentedAttribute | None
+
+    def column(self, name: str) -> InstrumentedAttribute | None:
+        """Return the column attribute with the given name, or None."""
+        return self.columns.get(name)
+
+    def relationship(self, name: str) -> RelationshipProperty | None:
+        """Return the relationship property with the given name, or None."""
+        return self.relationships.get(name)
+
+    def attribute(self, name: str) -> Any:
+        """Return the column or relationship attribute with the given name, or None."""
+        attr = self.columns.get(name)
+        if attr is None and name in self.relationships:
+            attr = getattr(self.model, name)
+        return attr
+
+
+_registry: dict[type, ModelMetadata] = {}
+_lock = threading.Lock()
+
+
+def get_model_metadata(model: type) -> ModelMetadata:
+    """Return the cached metadata for a model, building it on first use.
+
+    Args:
+        model: The mapped model class.
+
+    Returns:
+        The model's metadata.
+    """
+    metadata = _registry.get(model)
+    if metadata is None:
+        with _lock:
+            metadata = _registry.get(model)
+            if metadata is None:
+                metadata = _build_model_metadata(model)
+                _registry[model] = metadata
+    return metadata
+
+
+def clear_model_metadata() -> None:
+    """Drop all cached metadata, e.g. after mappers have been reconfigured in tests."""
+    with _lock:
+        _registry.clear()
+
+
+def _build_model_metadata(model: type) -> ModelMetadata:
+    mapper = inspect(model)
+    table = mapper.local_table
+
+    columns: dict[str, InstrumentedAttribute] = {}
+    attr_by_column_name: dict[str, str] = {}
+    for prop in mapper.column_attrs:
+        columns[prop.key] = getattr(model, prop.key)
+        for col in prop.columns:
+            if getattr(col, 'table', None) is table:
+                attr_by_column_name[col.name] = prop.key
+
+    unique_sets = [(prop.key,) for prop in mapper.column_attrs if prop.columns[0].unique]
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            unique_sets.append(tuple(attr_by_column_name.get(col.name, col.name) for col in constraint.columns))
+
+    searchable = tuple(key for key, attr in columns.items() if isinstance(attr.property.columns[0].type, String))
+    nullable = frozenset(
+        key for key, attr in columns.items() if any(getattr(col, 'nullable', True) for col in attr.property.columns)
+    )
+
+    return ModelMetadata(
+        model=model,
+        columns=MappingProxyType(columns),
+        relationships=MappingProxyType(dict(mapper.relationships.items())),
+        unique_column_sets=tuple(unique_sets),
+        conflict_targets=_conflict_targets(table, attr_by_column_name),
+        searchable_columns=searchable,
+        nullable_columns=nullable,
+        soft_delete_column=columns.get('deleted_at'),
+    )
+
+
+def _conflict_targets(table: Any, attr_by_column_name: Mapping[str, str]) -> tuple[tuple[str, ...], ...]:
+    def keys(columns: Any) -> tuple[str, ...]:
+        return tuple(attr_by_column_name.get(col.name, col.name) for col in columns)
+
+    targets: list[tuple[str, ...]] = []
+
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint) and not constraint.deferrable:
+            targets.append(keys(constraint.columns))
+
+    for index in table.indexes:
+        if isinstance(index, Index) and index.unique and not index.dialect_options['postgresql'].get('where'):
+            targets.append(keys(index.columns))
+
+    for column in table.columns:
+        if column.unique and keys([column]) not in targets:
+            targets.append(keys([column]))
+
+    targets.sort(key=len, reverse=True)
+    targets.append(keys(table.primary_key.columns))
+    return tuple(targets)
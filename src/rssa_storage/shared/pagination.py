@@ -0,0 +1,146 @@
+"""Pagination helpers for repositories (keyset cursors and counted pages)."""
+
+import base64
+import binascii
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Generic, TypeVar
+
+T = TypeVar('T')
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded or does not match the query."""
+
+
+@dataclass(frozen=True)
+class KeysetCursor:
+    """Position of the last row of a page, used to resume the next page.
+
+    Attributes:
+        sort_by: The column the page was sorted by, or None when sorted by id only.
+        sort_desc: Whether the page was sorted in descending order.
+        value: The sort column value of the last row on the page.
+        last_id: The id of the last row on the page, used as a tie-breaker.
+    """
+
+    sort_by: str | None
+    sort_desc: bool
+    value: Any
+    last_id: uuid.UUID
+
+
+class CursorPage(list[T]):
+    """A page of results that also carries the cursor for the next page.
+
+    Behaves like a plain list so existing callers of `find_many` keep working.
+
+    Attributes:
+        next_cursor: Opaque cursor for the next page, or None when this is the last page.
+    """
+
+    def __init__(self, items: Any = (), next_cursor: str | None = None):
+        super().__init__(items)
+        self.next_cursor = next_cursor
+
+
+@dataclass
+class Page(Generic[T]):
+    """A page of results together with the total number of matching rows.
+
+    Attributes:
+        items: The instances on this page.
+        total: The number of rows matching the query filters, ignoring limit and offset.
+        next_cursor: Cursor for the next page when keyset pagination was requested.
+    """
+
+    items: list[T] = field(default_factory=list)
+    total: int = 0
+    next_cursor: str | None = None
+
+
+@dataclass(frozen=True)
+class CountEstimate:
+    """A row count that may come from planner statistics rather than an exact scan.
+
+    Attributes:
+        value: The (estimated) number of rows.
+        is_estimate: False when the value comes from an exact `count(*)`.
+    """
+
+    value: int
+    is_estimate: bool
+
+
+def _tag_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {'t': 'dt', 'v': value.isoformat()}
+    if isinstance(value, date):
+        return {'t': 'd', 'v': value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {'t': 'u', 'v': str(value)}
+    if isinstance(value, Decimal):
+        return {'t': 'dec', 'v': str(value)}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise InvalidCursorError(f'Cannot build a cursor from a value of type {type(value).__name__}.')
+
+
+def _untag_value(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+
+    tag, raw = value.get('t'), value.get('v')
+    if tag == 'dt':
+        return datetime.fromisoformat(raw)
+    if tag == 'd':
+        return date.fromisoformat(raw)
+    if tag == 'u':
+        return uuid.UUID(raw)
+    if tag == 'dec':
+        return Decimal(raw)
+    raise InvalidCursorError(f'Unknown cursor value tag: {tag!r}.')
+
+
+def encode_cursor(cursor: KeysetCursor) -> str:
+    """Encode a keyset cursor into an opaque, URL-safe token.
+
+    Args:
+        cursor: The cursor to encode.
+
+    Returns:
+        The encoded cursor token.
+    """
+    payload = [cursor.sort_by, cursor.sort_desc, _tag_value(cursor.value), str(cursor.last_id)]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(token: str) -> KeysetCursor:
+    """Decode an opaque cursor token produced by `encode_cursor`.
+
+    Args:
+        token: The cursor token.
+
+    Returns:
+        The decoded keyset cursor.
+
+    Raises:
+        InvalidCursorError: If the token is malformed.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort_by, sort_desc, value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return KeysetCursor(
+            sort_by=sort_by,
+            sort_desc=bool(sort_desc),
+            value=_untag_value(value),
+            last_id=uuid.UUID(last_id),
+        )
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursorError('Malformed pagination cursor.') from e
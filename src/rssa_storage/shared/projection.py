@@ -0,0 +1,96 @@
+"""Lightweight read-only records for projection queries."""
+
+import threading
+from collections.abc import Iterable, Sequence
+from typing import Any, Literal
+
+ProjectionFormat = Literal['record', 'tuple', 'dict']
+
+PROJECTION_FORMATS: tuple[str, ...] = ('record', 'tuple', 'dict')
+
+
+class ProjectionRecord:
+    """Base class for the `__slots__` records returned by projection queries.
+
+    Subclasses are generated per model and column list by `record_type`. Records are not tracked by a
+    session, hold no lazy-loading state and cost a fraction of the memory of a mapped instance.
+    """
+
+    __slots__ = ()
+    _fields: tuple[str, ...] = ()
+
+    def __init__(self, *values: Any):
+        for name, value in zip(self._fields, values, strict=True):
+            setattr(self, name, value)
+
+    def _asdict(self) -> dict[str, Any]:
+        """Return the record as a plain dict."""
+        return {name: getattr(self, name) for name in self._fields}
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ProjectionRecord):
+            return NotImplemented
+        return self._fields == other._fields and tuple(self) == tuple(other)
+
+    def __hash__(self) -> int:
+        return hash((self._fields, tuple(self)))
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)
+        return f'{type(self).__name__}({values})'
+
+
+_record_types: dict[tuple[type, tuple[str, ...]], type[ProjectionRecord]] = {}
+_lock = threading.Lock()
+
+
+def record_type(model: type, fields: Sequence[str]) -> type[ProjectionRecord]:
+    """Return the record class for a model and column list, creating it on first use.
+
+    Args:
+        model: The mapped model the columns come from, used to name the class.
+        fields: The projected column names, in select order.
+
+    Returns:
+        A `ProjectionRecord` subclass with one slot per field.
+    """
+    key = (model, tuple(fields))
+    cls = _record_types.get(key)
+    if cls is None:
+        with _lock:
+            cls = _record_types.get(key)
+            if cls is None:
+                cls = type(
+                    f'{model.__name__}Record',
+                    (ProjectionRecord,),
+                    {'__slots__': key[1], '_fields': key[1]},
+                )
+                _record_types[key] = cls
+    return cls
+
+
+def project_rows(
+    rows: Iterable[Sequence[Any]], model: type, fields: Sequence[str], format: ProjectionFormat = 'record'
+) -> list[Any]:
+    """Convert result rows into records, tuples or dicts.
+
+    Args:
+        rows: The result rows, with values in the same order as `fields`.
+        model: The mapped model the columns come from.
+        fields: The projected column names.
+        format: 'record' for `__slots__` records, 'tuple' for plain tuples or 'dict' for dicts.
+
+    Returns:
+        The converted rows.
+    """
+    if format == 'record':
+        cls = record_type(model, fields)
+        return [cls(*row) for row in rows]
+    if format == 'tuple':
+        return [tuple(row) for row in rows]
+    if format == 'dict':
+        return [dict(zip(fields, row, strict=True)) for row in rows]
+    raise ValueError(f'Unknown projection format {format!r}; expected one of {", ".join(PROJECTION_FORMATS)}.')
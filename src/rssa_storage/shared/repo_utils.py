@@ -1,14 +1,30 @@
+from collections.abc import Sequence
+from typing import Any
+
 from .base_ordered_repo import OrderedRepoQueryOptions
 from .base_repo import RepoQueryOptions
+from .loader_plan import LoaderPlan
 
 QueryUnionType = RepoQueryOptions | OrderedRepoQueryOptions
 
 
+def _merge_load_options(load1: Sequence[Any] | None, load2: Sequence[Any] | None) -> Sequence[Any]:
+    """Merge loader plans for the same model into one plan; concatenate anything else."""
+    if isinstance(load1, LoaderPlan) and isinstance(load2, LoaderPlan) and load1.model is load2.model:
+        return load1.merge(load2)
+    if isinstance(load1, LoaderPlan) and not load2:
+        return load1
+    if isinstance(load2, LoaderPlan) and not load1:
+        return load2
+    return tuple(list(load1 or []) + list(load2 or []))
+
+
 def merge_repo_query_options(options1: RepoQueryOptions, options2: RepoQueryOptions) -> QueryUnionType:
     """Merge two RepoQueryOptions objects.
 
     Merge strategy:
-    - Lists/Sequences: Concatenated (ids, filter_ranges, filter_not_null, search_columns, load_options)
+    - Lists/Sequences: Concatenated (ids, filter_ranges, filter_not_null, search_columns, load_options);
+      two `LoaderPlan`s for the same model are merged into one plan instead
     - Dictionaries: Merged, with options2 overriding options1 (filters, filter_ilike)
     - Scalars: options2 overrides options1 if explicit value provided (not None/default), else options1
     """
@@ -36,9 +52,7 @@ def merge_repo_query_options(options1: RepoQueryOptions, options2: RepoQueryOpti
     merged.filter_not_null = list(set(options1.filter_not_null + options2.filter_not_null))
     merged.search_columns = list(set(options1.search_columns + options2.search_columns))
 
-    opt1_load = list(options1.load_options) if options1.load_options else []
-    opt2_load = list(options2.load_options) if options2.load_options else []
-    merged.load_options = tuple(opt1_load + opt2_load)
+    merged.load_options = _merge_load_options(options1.load_options, options2.load_options)
 
     merged.search_text = options2.search_text if options2.search_text is not None else options1.search_text
     merged.limit = options2.limit if options2.limit is not None else options1.limit
@@ -52,6 +66,15 @@ def merge_repo_query_options(options1: RepoQueryOptions, options2: RepoQueryOpti
         merged.sort_desc = options1.sort_desc
 
     merged.include_deleted = options1.include_deleted or options2.include_deleted
+    merged.keyset = options1.keyset or options2.keyset
+    merged.after_cursor = options2.after_cursor if options2.after_cursor is not None else options1.after_cursor
+
+    if options2.projection is not None:
+        merged.projection = list(options2.projection)
+        merged.projection_format = options2.projection_format
+    elif options1.projection is not None:
+        merged.projection = list(options1.projection)
+        merged.projection_format = options1.projection_format
 
     opt1_load_cols = list(options1.load_columns) if options1.load_columns else []
     opt2_load_cols = list(options2.load_columns) if options2.load_columns else []
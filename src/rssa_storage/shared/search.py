@@ -0,0 +1,121 @@
+"""Pluggable text search backends for `RepoQueryOptions.search_text`."""
+
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Index, String, bindparam, func, literal_column, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+class SearchBackend(ABC):
+    """Builds the search condition, and optionally a relevance expression, over a repository's columns.
+
+    Backends bind the search text through named parameters so repository statements stay cacheable:
+    `bind_params` must return a value for every parameter used by `condition` and `rank`.
+    """
+
+    @abstractmethod
+    def bind_params(self, text: str) -> dict[str, Any]:
+        """Return the bound parameter values for a search text."""
+
+    @abstractmethod
+    def condition(self, columns: Sequence[Any], text: str) -> ColumnElement[bool]:
+        """Return the WHERE clause matching `text` against any of the columns."""
+
+    def rank(self, columns: Sequence[Any], text: str) -> ColumnElement[Any] | None:
+        """Return an expression to order matches by (higher is more relevant), or None if unranked."""
+        return None
+
+
+@dataclass(frozen=True)
+class IlikeSearch(SearchBackend):
+    """Case-insensitive substring match (`ILIKE '%text%'`) on each column.
+
+    Without a trigram index this always scans the table; it is the default for repositories that do not
+    declare an indexed backend.
+    """
+
+    def bind_params(self, text: str) -> dict[str, Any]:
+        return {'search_text': f'%{text}%'}
+
+    def condition(self, columns: Sequence[Any], text: str) -> ColumnElement[bool]:
+        pattern = bindparam('search_text', f'%{text}%', type_=String)
+        return or_(*(column.ilike(pattern) for column in columns))
+
+
+@dataclass(frozen=True)
+class TrigramSearch(IlikeSearch):
+    """Substring match served by `gin_trgm_ops` indexes, ranked by trigram word similarity.
+
+    Matching keeps the `ILIKE '%text%'` semantics, which Postgres answers from a GIN trigram index on
+    each column (see `trigram_indexes`) instead of a sequential scan. Results are ordered by the best
+    `word_similarity` across the columns when no explicit sort is requested. Requires `pg_trgm`.
+    """
+
+    def bind_params(self, text: str) -> dict[str, Any]:
+        return {'search_text': f'%{text}%', 'search_query': text}
+
+    def rank(self, columns: Sequence[Any], text: str) -> ColumnElement[Any] | None:
+        query = bindparam('search_query', text, type_=String)
+        return func.greatest(*(func.word_similarity(query, column) for column in columns))
+
+
+@dataclass(frozen=True)
+class FullTextSearch(SearchBackend):
+    """Full-text match of the columns' combined `tsvector` against `websearch_to_tsquery`, ranked by `ts_rank`.
+
+    Matches whole words (with stemming for language configurations) rather than substrings. To be served
+    by an index, create a GIN index on exactly `FullTextSearch(config).document(columns)`.
+
+    Attributes:
+        config: The text search configuration, e.g. 'simple' or 'english'.
+    """
+
+    config: str = 'simple'
+
+    def __post_init__(self) -> None:
+        if not self.config.isidentifier():
+            raise ValueError(f'Invalid text search configuration name: {self.config!r}.')
+
+    def document(self, columns: Sequence[Any]) -> ColumnElement[Any]:
+        """Return the `tsvector` expression searched over, usable as a GIN index expression."""
+        # Literals rather than bind parameters, so the expression can match an index definition.
+        empty, space = literal_column("''"), literal_column("' '")
+        text = None
+        for column in columns:
+            value = func.coalesce(column, empty)
+            text = value if text is None else text.op('||')(space).op('||')(value)
+        return func.to_tsvector(self._regconfig(), text)
+
+    def bind_params(self, text: str) -> dict[str, Any]:
+        return {'search_query': text}
+
+    def condition(self, columns: Sequence[Any], text: str) -> ColumnElement[bool]:
+        return self.document(columns).op('@@')(self._query(text))
+
+    def rank(self, columns: Sequence[Any], text: str) -> ColumnElement[Any] | None:
+        return func.ts_rank(self.document(columns), self._query(text))
+
+    def _query(self, text: str) -> ColumnElement[Any]:
+        return func.websearch_to_tsquery(self._regconfig(), bindparam('search_query', text, type_=String))
+
+    def _regconfig(self) -> ColumnElement[Any]:
+        return literal_column(f"'{self.config}'::regconfig")
+
+
+def trigram_indexes(table_name: str, *columns: str) -> tuple[Index, ...]:
+    """Declare one GIN trigram index per column, for use in a model's `__table_args__`.
+
+    Args:
+        table_name: The table the columns belong to, used to name the indexes.
+        columns: The searchable column names.
+
+    Returns:
+        The index declarations, named `ix_<table>_<column>_trgm`.
+    """
+    return tuple(
+        Index(f'ix_{table_name}_{column}_trgm', column, postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+        for column in columns
+    )
@@ -0,0 +1,91 @@
+"""Request-scoped memoization of repository lookups, bound to an AsyncSession."""
+
+from collections.abc import Hashable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+_MEMO_KEY = 'rssa_storage.session_memo'
+MISSING = object()
+
+
+class SessionMemo:
+    """Results of `find_one` calls made through one session, keyed by statement shape and parameters.
+
+    The memo lives in `session.info`, so it shares the lifetime of the session (typically one request).
+    It is cleared whenever the session flushes, commits or rolls back, and whenever an INSERT, UPDATE,
+    DELETE or textual statement is executed through the session, so a memoized result never hides a
+    write made in the same unit of work.
+
+    Attributes:
+        hits: The number of lookups served from the memo.
+        misses: The number of lookups that went to the database.
+    """
+
+    def __init__(self) -> None:
+        self._results: dict[Hashable, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the memoized result for `key`, or `MISSING` when nothing is memoized."""
+        result = self._results.get(key, MISSING)
+        if result is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def set(self, key: Hashable, result: Any) -> None:
+        """Remember the result (an instance or None) for `key`."""
+        self._results[key] = result
+
+    def clear(self) -> None:
+        """Forget all memoized results."""
+        self._results.clear()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+def enable_session_memo(session: AsyncSession) -> SessionMemo:
+    """Turn on `find_one` memoization for every repository that uses this session.
+
+    Calling it again for the same session returns the existing memo.
+
+    Args:
+        session: The request's session.
+
+    Returns:
+        The session's memo.
+    """
+    memo = get_session_memo(session)
+    if memo is not None:
+        return memo
+
+    memo = SessionMemo()
+    sync_session = session.sync_session
+    sync_session.info[_MEMO_KEY] = memo
+
+    def _clear(*_: Any) -> None:
+        memo.clear()
+
+    def _clear_on_write(orm_execute_state: ORMExecuteState) -> None:
+        if not orm_execute_state.is_select:
+            memo.clear()
+
+    for event_name in ('after_flush', 'after_commit', 'after_rollback', 'after_soft_rollback'):
+        event.listen(sync_session, event_name, _clear)
+    event.listen(sync_session, 'do_orm_execute', _clear_on_write)
+    return memo
+
+
+def get_session_memo(session: AsyncSession | Session) -> SessionMemo | None:
+    """Return the memo enabled on the session, or None if memoization is off."""
+    sync_session = getattr(session, 'sync_session', session)
+    info = getattr(sync_session, 'info', None)
+    if not isinstance(info, dict):
+        return None
+    return info.get(_MEMO_KEY)
@@ -0,0 +1,344 @@
+"""Slow-query capture: the statement, its redacted parameters and its plan, kept in a ring buffer or a file."""
+
+import asyncio
+import json
+import logging
+import threading
+import uuid
+import weakref
+from collections import deque
+from collections.abc import Callable, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from rssa_storage.shared.explain import parse_json_plan
+from rssa_storage.shared.instrumentation import current_method, fingerprint_statement
+from rssa_storage.shared.ttl_cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
+
+# The number of fingerprints whose last plan is remembered to enforce `explain_interval`.
+_EXPLAINED_MAXSIZE = 1024
+
+# Execution option set on the connections running EXPLAIN, so their statements are not captured in turn.
+_EXPLAIN_OPTION = 'rssa_storage.slow_query_explain'
+
+_ANALYZABLE = ('SELECT', 'WITH', 'VALUES', 'TABLE')
+_EXPLAINABLE = (*_ANALYZABLE, 'INSERT', 'UPDATE', 'DELETE', 'MERGE')
+
+_KEPT_TYPES = (bool, int, float, Decimal, uuid.UUID, date, datetime)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replace string and binary parameters with a placeholder giving their type and length.
+
+    Numbers, booleans, dates, UUIDs and None are kept, as they rarely identify anyone and are what
+    a plan usually depends on; lists and mappings are redacted element by element.
+    """
+    if parameters is None or isinstance(parameters, _KEPT_TYPES):
+        return parameters
+    if isinstance(parameters, Mapping):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) for value in parameters]
+    if isinstance(parameters, (str, bytes, bytearray, memoryview)):
+        return f'<{type(parameters).__name__}:{len(parameters)}>'
+    return f'<{type(parameters).__name__}>'
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    """One statement that took longer than the capture threshold.
+
+    Attributes:
+        statement: The SQL as sent to the driver.
+        parameters: The bound parameters, redacted.
+        seconds: How long the statement took.
+        captured_at: When it finished.
+        fingerprint: The fingerprint of its normalized SQL, as reported by instrumentation.
+        method: The instrumented repository method that ran it, if any.
+        plan: The root of the `EXPLAIN (FORMAT JSON)` output, or None if it was not explained.
+        analyzed: Whether the plan comes from `EXPLAIN (ANALYZE, BUFFERS)`, with actual timings.
+        note: Why there is no plan, or why it is not analyzed.
+    """
+
+    statement: str
+    parameters: Any
+    seconds: float
+    captured_at: datetime
+    fingerprint: str
+    method: str | None = None
+    plan: dict[str, Any] | None = None
+    analyzed: bool = False
+    note: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data['captured_at'] = self.captured_at.isoformat()
+        return data
+
+
+class SlowQueryLog:
+    """Keeps the most recent slow queries in memory and, optionally, appends them to a JSON Lines file.
+
+    Queries are appended to the file by a worker thread, in the order they were added, so adding one
+    from the event loop never waits on the disk; call `flush` before reading the file.
+
+    Attributes:
+        maxlen: The number of queries kept in memory.
+        path: The file every captured query is appended to, one JSON object per line, or None.
+    """
+
+    def __init__(self, maxlen: int = 100, path: str | Path | None = None):
+        self.maxlen = maxlen
+        self.path = Path(path) if path is not None else None
+        self._queries: deque[SlowQuery] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._writer: ThreadPoolExecutor | None = None
+        self._last_write: Future | None = None
+
+    def add(self, query: SlowQuery) -> None:
+        """Keep a captured query, dropping the oldest one when the buffer is full."""
+        with self._lock:
+            self._queries.append(query)
+            if self.path is not None:
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rssa-slow-query-log')
+                self._last_write = self._writer.submit(self._write, query)
+
+    def _write(self, query: SlowQuery) -> None:
+        try:
+            with self.path.open('a', encoding='utf-8') as file:
+                file.write(json.dumps(query.to_dict(), default=str) + '\n')
+        except OSError:
+            logger.exception('Could not append a slow query to %s', self.path)
+
+    def queries(self) -> list[SlowQuery]:
+        """The queries in memory, oldest first."""
+        with self._lock:
+            return list(self._queries)
+
+    def clear(self) -> None:
+        """Forget the queries in memory; the file is left as it is."""
+        with self._lock:
+            self._queries.clear()
+
+    def flush(self) -> None:
+        """Block until every query added so far has been appended to the file."""
+        last_write = self._last_write
+        if last_write is not None:
+            last_write.result()
+
+    def close(self) -> None:
+        """Append the queries still pending to the file and stop the worker thread."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+
+
+class SlowQueryCapture:
+    """Captures statements executed through an engine that take at least `threshold` seconds.
+
+    Each captured statement is explained on a separate connection, inside a read-only transaction that
+    is rolled back: SELECTs with `EXPLAIN (ANALYZE, BUFFERS)`, which runs them again, and writes with
+    plain `EXPLAIN`, which does not. Explaining runs in the background (a task on the event loop for
+    an `AsyncEngine`, a worker thread otherwise), so the slow request is not delayed further. A
+    fingerprint explained less than `explain_interval` seconds ago is captured without a plan, which
+    keeps a burst of identical slow queries from doubling the database's load; only the most recently
+    explained fingerprints are remembered, in a `TTLCache` that expires them after that interval.
+
+    Attributes:
+        engine: The engine whose statements are watched, and that EXPLAIN runs on.
+        threshold: The duration, in seconds, from which a statement is captured.
+        log: Where captured queries go.
+        explain: Whether to explain captured statements.
+        explain_interval: The minimum number of seconds between two plans for one fingerprint.
+        redact: Returns the parameters to keep for a statement's bound parameters.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine | Engine,
+        threshold: float = 0.5,
+        log: SlowQueryLog | None = None,
+        explain: bool = True,
+        explain_interval: float = 60.0,
+        redact: Callable[[Any], Any] = redact_parameters,
+    ):
+        self.engine = engine
+        self.threshold = threshold
+        self.log = log if log is not None else SlowQueryLog()
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.redact = redact
+        self._explained = TTLCache(maxsize=_EXPLAINED_MAXSIZE, ttl=explain_interval)
+        self._pending: set[asyncio.Task | Future] = set()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def sync_engine(self) -> Engine:
+        """The `Engine` whose events are listened to."""
+        return self.engine.sync_engine if isinstance(self.engine, AsyncEngine) else self.engine
+
+    def before_cursor_execute(self, _conn: Any, _cursor: Any, _statement: str, _params: Any, context: Any, *_: Any):
+        if context is not None:
+            context._rssa_storage_slow_query_started = perf_counter()
+
+    def after_cursor_execute(
+        self, _conn: Any, _cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ):
+        started = getattr(context, '_rssa_storage_slow_query_started', None)
+        if started is None:
+            return
+        seconds = perf_counter() - started
+        if seconds < self.threshold or context.execution_options.get(_EXPLAIN_OPTION):
+            return
+
+        fingerprint, _normalized = fingerprint_statement(statement)
+        query = SlowQuery(
+            statement=statement,
+            parameters=self.redact(parameters),
+            seconds=seconds,
+            captured_at=datetime.now(UTC),
+            fingerprint=fingerprint,
+            method=current_method(),
+        )
+        logger.warning('Slow query (%.3fs) in %s: %s', seconds, query.method or 'no repository method', fingerprint)
+        keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ''
+        if not self.explain:
+            self.log.add(query)
+        elif executemany or keyword not in _EXPLAINABLE:
+            self.log.add(_with_note(query, 'not explainable'))
+        elif self._explained.get(fingerprint) is not MISSING:
+            self.log.add(_with_note(query, 'explained recently'))
+        else:
+            self._explained.set(fingerprint, True)
+            self._schedule(query, statement, parameters, keyword in _ANALYZABLE)
+
+    def _schedule(self, query: SlowQuery, statement: str, parameters: Any, analyze: bool) -> None:
+        if isinstance(self.engine, AsyncEngine):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                task = loop.create_task(self._explain_async(query, statement, parameters, analyze))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+                return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rssa-slow-query')
+        future = self._executor.submit(self._explain_sync, query, statement, parameters, analyze)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+    async def _explain_async(self, query: SlowQuery, statement: str, parameters: Any, analyze: bool) -> None:
+        note = None
+        for attempt_analyze in (True, False) if analyze else (False,):
+            try:
+                async with self.engine.connect() as conn:
+                    conn = await conn.execution_options(**{_EXPLAIN_OPTION: True})
+                    await conn.exec_driver_sql('SET TRANSACTION READ ONLY')
+                    result = await conn.exec_driver_sql(_explain_sql(statement, attempt_analyze), parameters)
+                    raw = result.scalar_one()
+            except Exception as exc:  # A failed EXPLAIN must not affect the application.
+                note = f'EXPLAIN failed: {str(exc).splitlines()[0]}'
+                continue
+            self.log.add(_with_plan(query, raw, attempt_analyze, note))
+            return
+        self.log.add(_with_note(query, note))
+
+    def _explain_sync(self, query: SlowQuery, statement: str, parameters: Any, analyze: bool) -> None:
+        note = None
+        for attempt_analyze in (True, False) if analyze else (False,):
+            try:
+                with self.sync_engine.connect() as conn:
+                    conn = conn.execution_options(**{_EXPLAIN_OPTION: True})
+                    conn.exec_driver_sql('SET TRANSACTION READ ONLY')
+                    raw = conn.exec_driver_sql(_explain_sql(statement, attempt_analyze), parameters).scalar_one()
+            except Exception as exc:  # A failed EXPLAIN must not affect the application.
+                note = f'EXPLAIN failed: {str(exc).splitlines()[0]}'
+                continue
+            self.log.add(_with_plan(query, raw, attempt_analyze, note))
+            return
+        self.log.add(_with_note(query, note))
+
+    async def wait(self) -> None:
+        """Wait for the plans being captured in the background."""
+        while self._pending:
+            pending = list(self._pending)
+            await asyncio.gather(*(asyncio.wrap_future(p) if isinstance(p, Future) else p for p in pending))
+
+    def start(self) -> None:
+        """Start watching the engine."""
+        event.listen(self.sync_engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.listen(self.sync_engine, 'after_cursor_execute', self.after_cursor_execute)
+
+    def stop(self) -> None:
+        """Stop watching the engine; plans already being captured still reach the log."""
+        event.remove(self.sync_engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.remove(self.sync_engine, 'after_cursor_execute', self.after_cursor_execute)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def _explain_sql(statement: str, analyze: bool) -> str:
+    options = 'ANALYZE, BUFFERS, FORMAT JSON' if analyze else 'FORMAT JSON'
+    return f'EXPLAIN ({options}) {statement}'
+
+
+def _with_note(query: SlowQuery, note: str | None) -> SlowQuery:
+    return replace(query, note=note)
+
+
+def _with_plan(query: SlowQuery, raw: Any, analyzed: bool, note: str | None) -> SlowQuery:
+    if note is not None:
+        note = f'{note}; fell back to EXPLAIN without ANALYZE'
+    return replace(query, plan=parse_json_plan(raw), analyzed=analyzed, note=note)
+
+
+_captures: 'weakref.WeakKeyDictionary[Engine, SlowQueryCapture]' = weakref.WeakKeyDictionary()
+
+
+def capture_slow_queries(
+    engine: AsyncEngine | Engine,
+    threshold: float = 0.5,
+    log: SlowQueryLog | None = None,
+    **kwargs: Any,
+) -> SlowQueryCapture:
+    """Capture the statements executed through `engine` that take at least `threshold` seconds.
+
+    Calling it again for the same engine replaces the previous capture.
+
+    Args:
+        engine: The engine to watch; EXPLAIN runs on connections from the same engine.
+        threshold: The duration, in seconds, from which a statement is captured.
+        log: Where captured queries go; a new in-memory `SlowQueryLog` if None.
+        **kwargs: `explain`, `explain_interval` and `redact`, see `SlowQueryCapture`.
+
+    Returns:
+        The capture, whose `log` holds the captured queries.
+    """
+    stop_capturing_slow_queries(engine)
+    capture = SlowQueryCapture(engine, threshold, log, **kwargs)
+    capture.start()
+    _captures[capture.sync_engine] = capture
+    return capture
+
+
+def stop_capturing_slow_queries(engine: AsyncEngine | Engine) -> None:
+    """Stop capturing the slow statements of `engine`."""
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    capture = _captures.pop(sync_engine, None)
+    if capture is not None:
+        capture.stop()
@@ -0,0 +1,90 @@
+"""Process-wide cache of prebuilt repository statements."""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+S = TypeVar('S')
+
+
+@dataclass(frozen=True)
+class StatementCacheStats:
+    """Snapshot of the statement cache counters.
+
+    Attributes:
+        hits: The number of lookups served by a prebuilt statement.
+        misses: The number of lookups that had to build a statement.
+        size: The number of statements currently cached.
+    """
+
+    hits: int
+    misses: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """The fraction of lookups served from the cache, 0.0 before the first lookup."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class StatementCache:
+    """A bounded LRU cache of statements keyed by the structure of the query that produced them.
+
+    Cached statements carry bound parameters instead of literal values, so one entry serves every call
+    with the same query shape and the per-call values are passed at execution time.
+
+    Attributes:
+        maxsize: The maximum number of statements kept; the least recently used entry is evicted first.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], S]) -> S:
+        """Return the statement cached under `key`, building and caching it on a miss.
+
+        Args:
+            key: The structural cache key.
+            build: Called without arguments to build the statement on a miss.
+
+        Returns:
+            The cached or newly built statement.
+        """
+        with self._lock:
+            statement = self._entries.get(key)
+            if statement is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return statement
+            self._misses += 1
+
+        statement = build()
+
+        with self._lock:
+            self._entries[key] = statement
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return statement
+
+    def stats(self) -> StatementCacheStats:
+        """Return the current hit/miss counters and size."""
+        with self._lock:
+            return StatementCacheStats(hits=self._hits, misses=self._misses, size=len(self._entries))
+
+    def clear(self) -> None:
+        """Drop all cached statements and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+statement_cache = StatementCache()
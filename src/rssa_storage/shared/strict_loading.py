@@ -0,0 +1,179 @@
+"""Strict loading: detect relationship lazy loads (N+1 queries) per engine or per session."""
+
+import logging
+import threading
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from sqlalchemy import Connection, Engine, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+logger = logging.getLogger(__name__)
+
+StrictLoadingMode = Literal['raise', 'log']
+
+_GUARD_KEY = 'rssa_storage.strict_loading'
+_STATS_KEY = 'rssa_storage.lazy_load_stats'
+
+
+class LazyLoadError(InvalidRequestError):
+    """Raised in strict mode when a relationship would be lazy loaded.
+
+    Attributes:
+        path: The relationship being loaded, e.g. 'StudyParticipant.study_condition'.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(
+            f'Lazy load of {path} blocked by strict loading; eager load it (see LoaderPlan) or load it explicitly.'
+        )
+        self.path = path
+
+
+@dataclass
+class LazyLoadStats:
+    """Counts of lazy loads, by relationship path.
+
+    Attributes:
+        by_path: The number of lazy loads per relationship, e.g. {'Movie.reviews': 20}.
+    """
+
+    by_path: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def total(self) -> int:
+        """The number of lazy loads recorded."""
+        return sum(self.by_path.values())
+
+    def record(self, path: str) -> None:
+        """Count one lazy load of `path`."""
+        self.by_path[path] += 1
+
+    def reset(self) -> None:
+        """Forget all counts."""
+        self.by_path.clear()
+
+
+class LazyLoadGuard:
+    """Intercepts relationship lazy loads before they reach the database.
+
+    Relationship lazy loads are the statements SQLAlchemy emits when an unloaded relationship attribute is
+    accessed. Under asyncio they fail with `MissingGreenlet` outside `run_sync`, and elsewhere they add a
+    round trip per instance. In 'raise' mode each one raises `LazyLoadError`, the equivalent of
+    `raiseload('*')` applied at every depth of every query; in 'log' mode it is logged with the attribute
+    path and the stack that triggered it, and allowed to proceed. Either way it is counted in `stats`
+    and in the session's own `get_lazy_load_stats`, which covers a single request.
+
+    Attributes:
+        mode: 'raise' or 'log'.
+        stats: Lazy loads seen across every session the guard watches.
+    """
+
+    def __init__(self, mode: StrictLoadingMode = 'raise'):
+        if mode not in ('raise', 'log'):
+            raise ValueError(f"Unknown strict loading mode {mode!r}; expected 'raise' or 'log'.")
+        self.mode = mode
+        self.stats = LazyLoadStats()
+        self._lock = threading.Lock()
+
+    def _on_execute(self, orm_execute_state: ORMExecuteState) -> None:
+        if orm_execute_state.lazy_loaded_from is None:
+            return
+        strategy_path = orm_execute_state.loader_strategy_path
+        path = str(getattr(strategy_path, 'prop', None) or strategy_path)
+        with self._lock:
+            self.stats.record(path)
+        _session_stats(orm_execute_state.session).record(path)
+
+        if self.mode == 'raise':
+            raise LazyLoadError(path)
+        logger.warning('Lazy load of %s; consider eager loading it.', path, stack_info=True)
+
+
+_engine_guards: 'weakref.WeakKeyDictionary[Engine, LazyLoadGuard]' = weakref.WeakKeyDictionary()
+_engine_listener_lock = threading.Lock()
+_engine_listener_installed = False
+
+
+def _dispatch_engine_guard(orm_execute_state: ORMExecuteState) -> None:
+    if not _engine_guards or orm_execute_state.lazy_loaded_from is None:
+        return
+    session = orm_execute_state.session
+    if _GUARD_KEY in session.info:
+        return  # The session's own guard handles it.
+    bind = session.get_bind(mapper=orm_execute_state.bind_mapper)
+    guard = _engine_guards.get(bind.engine if isinstance(bind, Connection) else bind)
+    if guard is not None:
+        guard._on_execute(orm_execute_state)
+
+
+def enable_strict_loading(
+    target: AsyncSession | Session | AsyncEngine | Engine, mode: StrictLoadingMode = 'raise'
+) -> LazyLoadGuard:
+    """Turn on lazy-load detection for one session, or for every session bound to an engine.
+
+    Calling it again for the same target returns the existing guard.
+
+    Args:
+        target: A session (typically a request's) or an engine.
+        mode: 'raise' to raise `LazyLoadError` on every lazy load, 'log' to log and count them.
+
+    Returns:
+        The guard, whose `stats` count the lazy loads seen through `target`.
+    """
+    global _engine_listener_installed
+
+    if isinstance(target, AsyncEngine | Engine):
+        engine = target.sync_engine if isinstance(target, AsyncEngine) else target
+        guard = _engine_guards.get(engine)
+        if guard is None:
+            guard = _engine_guards.setdefault(engine, LazyLoadGuard(mode))
+        with _engine_listener_lock:
+            if not _engine_listener_installed:
+                event.listen(Session, 'do_orm_execute', _dispatch_engine_guard)
+                _engine_listener_installed = True
+        return guard
+
+    sync_session = target.sync_session if isinstance(target, AsyncSession) else target
+    guard = sync_session.info.get(_GUARD_KEY)
+    if guard is None:
+        guard = LazyLoadGuard(mode)
+        sync_session.info[_GUARD_KEY] = guard
+        event.listen(sync_session, 'do_orm_execute', guard._on_execute)
+    return guard
+
+
+def disable_strict_loading(target: AsyncSession | Session | AsyncEngine | Engine) -> None:
+    """Turn lazy-load detection off again for a session or an engine."""
+    if isinstance(target, AsyncEngine | Engine):
+        _engine_guards.pop(target.sync_engine if isinstance(target, AsyncEngine) else target, None)
+        return
+
+    sync_session = target.sync_session if isinstance(target, AsyncSession) else target
+    guard = sync_session.info.pop(_GUARD_KEY, None)
+    if guard is not None:
+        event.remove(sync_session, 'do_orm_execute', guard._on_execute)
+
+
+def _session_stats(session: Session) -> LazyLoadStats:
+    """Return the lazy-load counts of a session, creating them on first use."""
+    stats = session.info.get(_STATS_KEY)
+    if stats is None:
+        stats = session.info[_STATS_KEY] = LazyLoadStats()
+    return stats
+
+
+def get_lazy_load_stats(session: AsyncSession | Session) -> LazyLoadStats | None:
+    """Return the lazy loads counted for a session by strict loading, or None if none were seen.
+
+    Sessions usually span one request, so this is the per-request N+1 report.
+    """
+    sync_session: Any = getattr(session, 'sync_session', session)
+    info = getattr(sync_session, 'info', None)
+    if not isinstance(info, dict):
+        return None
+    return info.get(_STATS_KEY)
@@ -0,0 +1,109 @@
+"""Process-wide, time-bounded caches for hot lookups such as access control lists."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+MISSING = object()
+
+
+@dataclass(frozen=True)
+class TTLCacheStats:
+    """Snapshot of a TTL cache's counters.
+
+    Attributes:
+        hits: The number of lookups served by a live entry.
+        misses: The number of lookups that found no entry or an expired one.
+        size: The number of entries currently held, including expired ones not yet evicted.
+    """
+
+    hits: int
+    misses: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """The fraction of lookups served from the cache, 0.0 before the first lookup."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TTLCache:
+    """A bounded LRU cache whose entries expire a fixed time after they were stored.
+
+    The cache is shared by every session in the process, so it only ever holds committed, per-key
+    values; owners are expected to `invalidate` a key whenever the data behind it is written. A value
+    loaded while an invalidation happened is discarded: read `generation` before loading and pass it to
+    `set`, which then stores nothing if the cache was invalidated in between.
+
+    Attributes:
+        maxsize: The maximum number of entries kept; the least recently used entry is evicted first.
+        ttl: The number of seconds an entry stays valid.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the live value cached under `key`, or `MISSING`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return MISSING
+
+    @property
+    def generation(self) -> int:
+        """A counter advanced by every `invalidate` and `clear`."""
+        return self._generation
+
+    def set(self, key: Hashable, value: Any, generation: int | None = None) -> None:
+        """Cache `value` under `key` for `ttl` seconds.
+
+        Args:
+            key: The cache key.
+            value: The value to cache.
+            generation: The `generation` read before `value` was loaded; if the cache has been
+                invalidated since, the value may be stale and is not stored.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the entry cached under `key`, if any."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+
+    def stats(self) -> TTLCacheStats:
+        """Return the current hit/miss counters and size."""
+        with self._lock:
+            return TTLCacheStats(hits=self._hits, misses=self._misses, size=len(self._entries))
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._hits = 0
+            self._misses = 0
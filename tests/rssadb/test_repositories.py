@@ -1,15 +1,34 @@
+import asyncio
 import unittest
 import uuid
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from sqlalchemy import Integer, String, Uuid
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
 
+from rssa_storage.rssadb.models.study_components import Study, StudyAuthorization, StudyStepPage
 from rssa_storage.rssadb.repositories.participant_responses import ParticipantSurveyResponseRepository
-from rssa_storage.rssadb.repositories.study_admin import ApiKeyRepository
-from rssa_storage.rssadb.repositories.study_components import StudyStepRepository
+from rssa_storage.rssadb.repositories.study_admin import (
+    ApiKeyRepository,
+    ApiKeyUsageBuffer,
+    UserRepository,
+    start_key_usage_flusher,
+)
+from rssa_storage.rssadb.repositories.study_components import (
+    StudyAuthorizationRepository,
+    StudyRepository,
+    StudyStepPageContentRepository,
+    StudyStepPageRepository,
+    StudyStepRepository,
+    study_acl_cache,
+)
 from rssa_storage.rssadb.repositories.study_participants import StudyParticipantMovieSessionRepository
+from rssa_storage.rssadb.repositories.survey_components import SurveyConstructRepository, SurveyScaleRepository
+from rssa_storage.shared import LoaderPlan, RepoQueryOptions, merge_repo_query_options
+from rssa_storage.shared.search import TrigramSearch
+from rssa_storage.shared.ttl_cache import TTLCache
 
 
 # We need a Mixin to satisfy VersionedRepositoryMixin protocol if we mock models
@@ -97,6 +116,72 @@ class TestRSSADBRepositories(unittest.IsolatedAsyncioTestCase):
 
         result = await repo.get_active_api_key_with_study('some-hash', study_id)
         self.assertEqual(result, mock_key)
+        query = self.mock_db.execute.call_args.args[0]
+        self.assertIn('api_keys.key_hash = %(key_hash_1)s', str(query.compile(dialect=postgresql.dialect())))
+
+    async def test_verify_api_key_caches_and_buffers_usage(self):
+        repo = ApiKeyRepository(db=self.mock_db)
+        repo.key_cache = TTLCache()
+        repo.usage_buffer = ApiKeyUsageBuffer()
+        key_id, study_id = uuid.uuid4(), uuid.uuid4()
+        self.mock_result.first.return_value = (key_id, study_id, None)
+
+        first = await repo.verify_api_key('hash', study_id)
+        second = await repo.verify_api_key('hash', study_id)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first.id, key_id)
+        self.mock_db.execute.assert_called_once()
+        self.assertEqual(list(repo.usage_buffer.drain()), [key_id])
+
+        repo.key_cache.invalidate(('hash', study_id))
+        self.mock_result.first.return_value = None
+        self.assertIsNone(await repo.verify_api_key('hash', study_id))
+        self.assertEqual(len(repo.usage_buffer), 0)
+
+    async def test_flush_key_usage_writes_one_batched_update(self):
+        now = [0.0]
+        repo = ApiKeyRepository(db=self.mock_db)
+        repo.usage_buffer = ApiKeyUsageBuffer(flush_interval=30, clock=lambda: now[0])
+        first, second = uuid.uuid4(), uuid.uuid4()
+        for key_id in (first, second, first):
+            repo.usage_buffer.record(key_id)
+        self.mock_result.rowcount = 2
+
+        self.assertEqual(await repo.flush_key_usage(), 0)
+        self.mock_db.execute.assert_not_called()
+
+        now[0] = 30.0
+        self.assertEqual(await repo.flush_key_usage(), 2)
+        stmt, params = self.mock_db.execute.call_args.args
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.assertIn('FROM unnest(%(api_key_ids)s::UUID[], %(used_at)s::TIMESTAMP WITH TIME ZONE[])', sql)
+        self.assertEqual(params['api_key_ids'], [first, second])
+        self.assertEqual(len(repo.usage_buffer), 0)
+
+    async def test_key_usage_flusher_commits_in_its_own_session_and_keeps_failed_uses(self):
+        buffer = ApiKeyUsageBuffer()
+        with patch.object(ApiKeyRepository, 'usage_buffer', buffer):
+            key_id = uuid.uuid4()
+            buffer.record(key_id)
+            session_factory = MagicMock()
+            session_factory.return_value.__aenter__.return_value = self.mock_db
+            self.mock_db.commit.side_effect = [RuntimeError('connection lost'), None]
+
+            flusher = start_key_usage_flusher(session_factory, interval=0)
+            with self.assertLogs('rssa_storage.rssadb.repositories.study_admin', 'ERROR'):
+                while not self.mock_db.commit.called:
+                    await asyncio.sleep(0)
+            self.assertEqual(list(buffer.drain()), [key_id])
+
+            buffer.record(key_id)
+            flusher.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await flusher
+
+        self.assertEqual(self.mock_db.commit.call_count, 2)
+        self.assertEqual(self.mock_db.execute.call_args.args[1]['api_key_ids'], [key_id])
+        self.assertEqual(len(buffer), 0)
 
     async def test_get_movie_session(self):
         class MockSessionModel(Base):
@@ -108,3 +193,210 @@ class TestRSSADBRepositories(unittest.IsolatedAsyncioTestCase):
 
         await repo.get_movie_session_by_participant_id(uuid.uuid4())
         self.mock_db.execute.assert_called_once()
+
+    async def test_searchable_columns_have_trigram_indexes(self):
+        for repo_class in (
+            StudyRepository,
+            StudyStepPageRepository,
+            SurveyConstructRepository,
+            SurveyScaleRepository,
+            UserRepository,
+        ):
+            repo = repo_class(db=self.mock_db)
+            self.assertIsInstance(repo.search_backend, TrigramSearch)
+
+            trigram_columns = {
+                column.name
+                for index in repo.model.__table__.indexes
+                if index.dialect_options['postgresql']['using'] == 'gin'
+                for column in index.columns
+                if index.dialect_options['postgresql']['ops'].get(column.name) == 'gin_trgm_ops'
+            }
+            self.assertLessEqual(set(repo_class.SEARCHABLE_COLUMNS), trigram_columns, repo_class.__name__)
+
+    async def test_get_authorized_for_user_is_one_exists_query(self):
+        repo = StudyRepository(db=self.mock_db)
+        user_id, study_id = uuid.uuid4(), uuid.uuid4()
+
+        await repo.get_authorized_for_user(user_id, RepoQueryOptions(ids=[study_id]))
+
+        self.mock_db.execute.assert_called_once()
+        query, params = self.mock_db.execute.call_args.args
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        self.assertIn('EXISTS (SELECT study_authorizations.id', sql)
+        self.assertIn('study_authorizations.user_id = %(authorized_user_id)s', sql)
+        self.assertEqual(params['authorized_user_id'], user_id)
+        self.assertEqual(params['ids'], [study_id])
+
+    async def test_load_blueprint_is_one_query_returning_frozen_tree(self):
+        repo = StudyRepository(db=self.mock_db)
+        study_id, step_id, page_id, content_id, item_id = (uuid.uuid4() for _ in range(5))
+        text = {'description': None, 'title': None, 'instructions': None}
+        self.mock_result.scalar_one_or_none.return_value = {
+            'id': str(study_id),
+            'enabled': True,
+            'name': 'Study',
+            'completion_code': None,
+            'redirect_url': None,
+            'dataset_subset': None,
+            'description': None,
+            'study_steps': [
+                {
+                    'id': str(step_id),
+                    'order_position': 1,
+                    'enabled': True,
+                    'step_type': 'survey',
+                    'name': 'Step',
+                    'path': '/survey',
+                    'survey_api_root': None,
+                    **text,
+                    'study_step_pages': [
+                        {
+                            'id': str(page_id),
+                            'order_position': 1,
+                            'enabled': True,
+                            'page_type': None,
+                            'name': 'Page',
+                            **text,
+                            'study_step_page_contents': [
+                                {
+                                    'id': str(content_id),
+                                    'order_position': 1,
+                                    'enabled': True,
+                                    'preamble': None,
+                                    'survey_construct': {
+                                        'id': str(uuid.uuid4()),
+                                        'name': 'Construct',
+                                        'description': '',
+                                        'survey_items': [
+                                            {
+                                                'id': str(item_id),
+                                                'order_position': 1,
+                                                'enabled': True,
+                                                'text': 'Item',
+                                                'notes': None,
+                                            }
+                                        ],
+                                    },
+                                    'survey_scale': None,
+                                    'study_attention_check': None,
+                                }
+                            ],
+                        }
+                    ],
+                }
+            ],
+        }
+
+        blueprint = await repo.load_blueprint(study_id)
+
+        self.mock_db.execute.assert_called_once()
+        query, params = self.mock_db.execute.call_args.args
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        self.assertIn('jsonb_agg(jsonb_build_object', sql)
+        self.assertIn('study_step_pages.study_step_id = study_steps.id', sql)
+        self.assertIn('survey_scale_levels.deleted_at IS NULL', sql)
+        self.assertEqual(params, {'study_id': study_id})
+
+        content = blueprint.study_steps[0].study_step_pages[0].study_step_page_contents[0]
+        self.assertEqual(blueprint.id, study_id)
+        self.assertEqual(content.id, content_id)
+        self.assertEqual(content.survey_construct.survey_items[0].id, item_id)
+        self.assertIsNone(content.survey_scale)
+        with self.assertRaises(AttributeError):
+            blueprint.name = 'Changed'
+
+        self.mock_result.scalar_one_or_none.return_value = None
+        self.assertIsNone(await repo.load_blueprint(uuid.uuid4()))
+
+    async def test_page_payload_is_cached_by_page_version(self):
+        repo = StudyStepPageContentRepository(db=self.mock_db)
+        for cache in (repo.version_cache, repo.payload_cache):
+            cache.clear()
+            self.addCleanup(cache.clear)
+        page_id = uuid.uuid4()
+        self.mock_result.one.return_value = ('2026-10-18T12:00:00+00:00', 4)
+        self.mock_result.scalar_one.return_value = []
+
+        payload = await repo.get_page_payload(page_id)
+        self.assertEqual(payload, ())
+        self.assertIs(await repo.get_page_payload(page_id), payload)
+        self.assertEqual(self.mock_db.execute.call_count, 2)
+
+        version_query = self.mock_db.execute.call_args_list[0].args[0]
+        sql = str(version_query.compile(dialect=postgresql.dialect()))
+        self.assertIn('SELECT max(stamps.updated_at) AS max_1, count(*) AS count_1', sql)
+        self.assertIn('JOIN page_contents ON page_contents.survey_construct_id = survey_items.survey_construct_id', sql)
+
+        # A new version misses the payload cache; the same version served again is not reassembled.
+        repo.version_cache.invalidate(page_id)
+        self.mock_result.one.return_value = ('2026-10-18T12:05:00+00:00', 4)
+        await repo.get_page_payload(page_id)
+        self.assertEqual(self.mock_db.execute.call_count, 4)
+
+    async def test_loader_plan_merges_paths_and_picks_strategies(self):
+        plan = StudyStepPageRepository.LOAD_FULL_DETAILS
+
+        self.assertEqual(len(plan), 1)
+        self.assertEqual(plan.strategies['study_step_page_contents'], 'selectin')
+        self.assertEqual(plan.strategies['study_step_page_contents.survey_construct'], 'joined')
+        self.assertEqual(plan.strategies['study_step_page_contents.survey_scale.survey_scale_levels'], 'selectin')
+        self.assertEqual(plan.query_count, 4)
+
+        merged = merge_repo_query_options(
+            RepoQueryOptions(load_options=LoaderPlan.from_paths(StudyStepPage, 'study_step_page_contents')),
+            RepoQueryOptions(load_options=plan),
+        )
+        self.assertEqual(merged.load_options, plan)
+
+        relationships = {'study_steps': {'columns': ['name'], 'relationships': {'unknown': {}}}, 'owner': {}}
+        self.assertIs(
+            LoaderPlan.from_relationships(Study, relationships), LoaderPlan.from_relationships(Study, relationships)
+        )
+        self.assertEqual(LoaderPlan.from_relationships(Study, relationships).query_count, 2)
+        with self.assertRaises(AttributeError):
+            list(LoaderPlan.from_paths(Study, 'study_steps.unknown'))
+
+    async def test_statements_with_loader_plans_are_cached(self):
+        repo = StudyStepPageRepository(db=self.mock_db)
+        options = RepoQueryOptions(load_options=repo.LOAD_FULL_DETAILS)
+
+        self.assertIsNotNone(repo._query_shape(options))
+        self.assertIsNone(repo._query_shape(RepoQueryOptions(load_options=tuple(repo.LOAD_FULL_DETAILS))))
+
+    async def test_is_authorized_caches_acl_until_authorization_write(self):
+        sync_session = Session()
+        self.mock_db.sync_session = sync_session
+        study_acl_cache.clear()
+        self.addCleanup(study_acl_cache.clear)
+        repo = StudyAuthorizationRepository(db=self.mock_db)
+        user_id, study_id = uuid.uuid4(), uuid.uuid4()
+        self.mock_result.tuples.return_value.all.return_value = [(study_id, 'editor')]
+
+        self.assertTrue(await repo.is_authorized(user_id, study_id))
+        self.assertTrue(await repo.is_authorized(user_id, study_id, role=('admin', 'editor')))
+        self.assertFalse(await repo.is_authorized(user_id, study_id, role='admin'))
+        self.assertFalse(await repo.is_authorized(user_id, uuid.uuid4()))
+        self.mock_db.execute.assert_called_once()
+
+        sync_session.add(StudyAuthorization(study_id=study_id, user_id=user_id, role='admin'))
+        sync_session.dispatch.after_flush(sync_session, None)
+        self.mock_result.tuples.return_value.all.return_value = [(study_id, 'admin')]
+
+        self.assertTrue(await repo.is_authorized(user_id, study_id, role='admin'))
+        self.assertEqual(self.mock_db.execute.call_count, 2)
+
+    async def test_reorder_relocates_ghosts_under_deferrable_constraint(self):
+        repo = StudyStepRepository(db=self.mock_db)
+
+        await repo.reorder_ordered_instances(uuid.uuid4(), {uuid.uuid4(): 1})
+
+        sql = str(self.mock_db.scalars.call_args.args[0].compile(dialect=postgresql.dialect()))
+        self.assertIn('study_steps.deleted_at IS NOT NULL', sql)
+        self.assertIn('row_number() OVER (ORDER BY study_steps.order_position)', sql)
+        constraints = [
+            constraint
+            for constraint in repo.model.__table__.constraints
+            if {column.name for column in getattr(constraint, 'columns', [])} == {'study_id', 'order_position'}
+        ]
+        self.assertEqual([constraint.deferrable for constraint in constraints], [True])
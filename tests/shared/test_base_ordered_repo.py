@@ -3,6 +3,7 @@ import uuid
 from unittest.mock import AsyncMock, MagicMock
 
 from sqlalchemy import Integer, Uuid
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
@@ -45,15 +46,14 @@ class TestBaseOrderedRepo(unittest.IsolatedAsyncioTestCase):
         mock_instance = MockOrderedModel(id=instance_id, parent_id=parent_id, order_position=5)
 
         # Mock finding the instance
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.first.return_value = mock_instance
-        self.mock_db.execute.return_value = mock_result
+        self.mock_db.get.return_value = mock_instance
 
         await self.repo.delete_ordered_instance(instance_id)
 
         self.assertTrue(self.mock_db.delete.called)
-        # execute called for find_one and update
-        self.assertGreaterEqual(self.mock_db.execute.call_count, 2)
+        self.mock_db.get.assert_called_with(MockOrderedModel, instance_id)
+        # execute called for the position update only
+        self.mock_db.execute.assert_called_once()
 
     async def test_reorder_ordered_instances(self):
         parent_id = uuid.uuid4()
@@ -61,5 +61,111 @@ class TestBaseOrderedRepo(unittest.IsolatedAsyncioTestCase):
 
         await self.repo.reorder_ordered_instances(parent_id, instances_map)
 
-        self.assertEqual(self.mock_db.execute.call_count, 2)
+        self.mock_db.scalars.assert_called_once()
         self.mock_db.flush.assert_called_once()
+        stmt, params = self.mock_db.scalars.call_args.args
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.assertIn('FROM unnest(%(reorder_ids)s::UUID[], %(reorder_positions)s::INTEGER[])', sql)
+        self.assertIn('UPDATE test_ordered_model SET order_position=moves.order_position FROM moves', sql)
+        self.assertNotIn('deleted_at', sql)
+        self.assertEqual(params['reorder_ids'], list(instances_map))
+        self.assertEqual(params['reorder_positions'], [1, 2])
+
+    async def test_allocate_position_takes_midpoint_in_gap_mode(self):
+        self.repo.ORDER_GAP = 1024
+        self.mock_result.one.return_value = (1024, 2048, 4096)
+
+        self.assertEqual(await self.repo.allocate_position(uuid.uuid4(), 1), 1536)
+        self.mock_db.scalars.assert_not_called()
+
+    async def test_allocate_position_rebalances_adjacent_neighbours(self):
+        self.repo.ORDER_GAP = 1024
+        self.mock_result.one.side_effect = [(5, 6, 9), (2048, 3072, 9216)]
+        self.mock_db.scalars.return_value = MagicMock()
+        parent_id = uuid.uuid4()
+
+        self.assertEqual(await self.repo.allocate_position(parent_id, 2), 2560)
+
+        stmt, params = self.mock_db.scalars.call_args.args
+        self.assertIn('row_number() OVER', str(stmt.compile(dialect=postgresql.dialect())))
+        self.assertEqual(params, {'parent_id': parent_id, 'order_gap': 1024})
+
+    async def test_allocate_position_dense_mode(self):
+        self.mock_result.scalar_one.return_value = 7
+        self.assertEqual(await self.repo.allocate_position(uuid.uuid4()), 8)
+
+        self.mock_result.one.return_value = (3, 4, 7)
+        with self.assertRaises(ValueError):
+            await self.repo.allocate_position(uuid.uuid4(), 3)
+
+    async def test_delete_in_gap_mode_does_not_shift_siblings(self):
+        self.repo.ORDER_GAP = 1024
+        self.mock_db.get.return_value = MockOrderedModel(id=uuid.uuid4(), parent_id=uuid.uuid4(), order_position=2048)
+
+        await self.repo.delete_ordered_instance(self.mock_db.get.return_value.id)
+
+        self.assertTrue(self.mock_db.delete.called)
+        self.mock_db.execute.assert_not_called()
+
+    async def test_move_to_renumbers_siblings_in_one_statement(self):
+        instance = MockOrderedModel(id=uuid.uuid4(), parent_id=uuid.uuid4(), order_position=5)
+        self.mock_db.get.return_value = instance
+
+        self.assertIs(await self.repo.move_to(instance.id, 2), instance)
+
+        self.mock_db.scalars.assert_called_once()
+        stmt, params = self.mock_db.scalars.call_args.args
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.assertIn('row_number() OVER (ORDER BY test_ordered_model.order_position, test_ordered_model.id)', sql)
+        self.assertIn('least(greatest(%(position)s, %(greatest_1)s)', sql)
+        self.assertEqual(params, {'moved_id': instance.id, 'position': 2})
+
+        self.mock_db.get.return_value = None
+        self.assertIsNone(await self.repo.move_to(uuid.uuid4(), 1))
+
+    async def test_delete_many_ordered_recompacts_affected_parents(self):
+        parent_id = uuid.uuid4()
+        self.mock_result.scalars.return_value.all.return_value = [parent_id, parent_id]
+        ids = [uuid.uuid4(), uuid.uuid4()]
+
+        self.assertEqual(await self.repo.delete_many_ordered(ids), 2)
+
+        delete_stmt = self.mock_db.execute.call_args.args[0]
+        self.assertIn(
+            'DELETE FROM test_ordered_model WHERE test_ordered_model.id = ANY',
+            str(delete_stmt.compile(dialect=postgresql.dialect())),
+        )
+        recompact, params = self.mock_db.scalars.call_args.args
+        self.assertIn('PARTITION BY test_ordered_model.parent_id', str(recompact.compile(dialect=postgresql.dialect())))
+        self.assertEqual(params, {'parent_ids': [parent_id]})
+        self.assertEqual(await self.repo.delete_many_ordered([]), 0)
+
+    async def test_get_ordered_window_is_one_limited_query(self):
+        parent_id = uuid.uuid4()
+
+        await self.repo.get_ordered_window(parent_id, after_position=3, k=5)
+
+        self.mock_db.execute.assert_called_once()
+        stmt, params = self.mock_db.execute.call_args.args
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.assertIn('test_ordered_model.order_position > %(min_order_position)s', sql)
+        self.assertIn('ORDER BY test_ordered_model.order_position', sql)
+        self.assertEqual(params['min_order_position'], 3)
+
+    async def test_navigation_map_is_loaded_once_per_parent(self):
+        self.repo.navigation_cache.clear()
+        self.addCleanup(self.repo.navigation_cache.clear)
+        parent_id = uuid.uuid4()
+        ids = [uuid.uuid4(), uuid.uuid4(), uuid.uuid4()]
+        self.mock_result.all.return_value = [(ids[0], 1), (ids[1], 2), (ids[2], 4)]
+
+        navigation = await self.repo.get_navigation_map(parent_id)
+        self.assertIs(await self.repo.get_navigation_map(parent_id), navigation)
+
+        self.mock_db.execute.assert_called_once()
+        self.assertEqual(navigation.positions, (1, 2, 4))
+        self.assertEqual((navigation.first_id, navigation.last_id), (ids[0], ids[2]))
+        self.assertEqual(navigation.next_id(ids[0]), ids[1])
+        self.assertEqual(navigation.previous_id(ids[1]), ids[0])
+        self.assertIsNone(navigation.next_id(ids[2]))
+        self.assertIsNone(navigation.previous_id(uuid.uuid4()))
@@ -3,11 +3,21 @@ import uuid
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
 
-from sqlalchemy import DateTime, String, Uuid
+from sqlalchemy import DateTime, String, UniqueConstraint, Uuid
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
 
-from rssa_storage.shared import BaseRepository, RepoQueryOptions
+from rssa_storage.shared import BaseRepository, CountEstimate, CursorPage, InvalidCursorError, RepoQueryOptions
+from rssa_storage.shared.explain import Explain
+from rssa_storage.shared.model_registry import get_model_metadata
+from rssa_storage.shared.pagination import KeysetCursor, decode_cursor, encode_cursor
+from rssa_storage.shared.projection import ProjectionRecord, record_type
+from rssa_storage.shared.search import FullTextSearch, SearchBackend, TrigramSearch
+from rssa_storage.shared.session_memo import enable_session_memo
+from rssa_storage.shared.statement_cache import StatementCache
+from rssa_storage.shared.strict_loading import LazyLoadError, enable_strict_loading, get_lazy_load_stats
+from rssa_storage.shared.ttl_cache import MISSING, TTLCache
 
 
 class Base(DeclarativeBase):
@@ -21,6 +31,32 @@ class SimpleModel(Base):
     deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
 
+class ContextModel(Base):
+    __tablename__ = 'test_context_model'
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    participant_id: Mapped[uuid.UUID] = mapped_column(Uuid)
+    context_tag: Mapped[str] = mapped_column(String)
+    payload: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    __table_args__ = (UniqueConstraint('participant_id', 'context_tag', name='uq_context'),)
+
+
+class RenamedModel(Base):
+    __tablename__ = 'test_renamed_model'
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    tag: Mapped[str] = mapped_column('tag_name', String, unique=True)
+    label: Mapped[str | None] = mapped_column('label_text', String, nullable=True)
+
+
+class Row(tuple):
+    """Minimal stand-in for a SQLAlchemy Row with a labelled extra column."""
+
+    def __new__(cls, entity, **labels):
+        row = super().__new__(cls, (entity, *labels.values()))
+        row.__dict__.update(labels)
+        return row
+
+
 class TestBaseRepo(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self):
         self.mock_db = AsyncMock(spec=AsyncSession)
@@ -53,9 +89,7 @@ class TestBaseRepo(unittest.IsolatedAsyncioTestCase):
         mock_instance = SimpleModel(id=instance_id, name='Old Name')
 
         # Mock finding the instance
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.first.return_value = mock_instance
-        self.mock_db.execute.return_value = mock_result
+        self.mock_db.get.return_value = mock_instance
 
         updated = await self.repo.update(instance_id, {'name': 'New Name'})
 
@@ -73,9 +107,7 @@ class TestBaseRepo(unittest.IsolatedAsyncioTestCase):
         instance_id = uuid.uuid4()
         mock_instance = HardDeleteModel(id=instance_id)
 
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.first.return_value = mock_instance
-        self.mock_db.execute.return_value = mock_result
+        self.mock_db.get.return_value = mock_instance
 
         success = await repo.delete(instance_id)
 
@@ -87,9 +119,7 @@ class TestBaseRepo(unittest.IsolatedAsyncioTestCase):
         instance_id = uuid.uuid4()
         mock_instance = SimpleModel(id=instance_id, deleted_at=None)
 
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.first.return_value = mock_instance
-        self.mock_db.execute.return_value = mock_result
+        self.mock_db.get.return_value = mock_instance
 
         success = await self.repo.delete(instance_id)
 
@@ -97,3 +127,429 @@ class TestBaseRepo(unittest.IsolatedAsyncioTestCase):
         self.assertIsNotNone(mock_instance.deleted_at)
         self.mock_db.delete.assert_not_called()
         self.mock_db.flush.assert_called()
+
+    async def test_find_many_keyset_returns_next_cursor(self):
+        rows = [SimpleModel(id=uuid.uuid4(), name=f'name-{i}') for i in range(3)]
+        self.mock_result.scalars.return_value.all.return_value = rows
+
+        page = await self.repo.find_many(RepoQueryOptions(sort_by='name', limit=2, keyset=True))
+
+        self.assertIsInstance(page, CursorPage)
+        self.assertEqual(list(page), rows[:2])
+        cursor = decode_cursor(page.next_cursor)
+        self.assertEqual(cursor, KeysetCursor(sort_by='name', sort_desc=False, value='name-1', last_id=rows[1].id))
+
+        params = self.mock_db.execute.call_args.args[1]
+        self.assertEqual(params['limit'], 3)
+
+    async def test_find_many_keyset_last_page_has_no_cursor(self):
+        rows = [SimpleModel(id=uuid.uuid4(), name='only')]
+        self.mock_result.scalars.return_value.all.return_value = rows
+
+        page = await self.repo.find_many(RepoQueryOptions(sort_by='name', limit=2, keyset=True))
+
+        self.assertEqual(list(page), rows)
+        self.assertIsNone(page.next_cursor)
+
+    async def test_find_many_rejects_cursor_for_other_sort(self):
+        token = encode_cursor(KeysetCursor(sort_by='name', sort_desc=False, value='a', last_id=uuid.uuid4()))
+
+        with self.assertRaises(InvalidCursorError):
+            await self.repo.find_many(RepoQueryOptions(sort_by='name', sort_desc=True, after_cursor=token))
+
+        with self.assertRaises(InvalidCursorError):
+            await self.repo.find_many(RepoQueryOptions(after_cursor='not-a-cursor'))
+
+    async def test_stream_many_yields_batches_and_expunges(self):
+        batches = [[SimpleModel(id=uuid.uuid4(), name='a'), SimpleModel(id=uuid.uuid4(), name='b')], [SimpleModel()]]
+
+        async def partitions():
+            for batch in batches:
+                yield batch
+
+        stream_result = MagicMock()
+        stream_result.scalars.return_value.partitions.return_value = partitions()
+        stream_result.close = AsyncMock()
+        self.mock_db.stream.return_value = stream_result
+        self.mock_db.__contains__ = MagicMock(return_value=True)
+
+        streamed = [item async for item in self.repo.stream_many(RepoQueryOptions(), batch_size=2, expunge=True)]
+
+        self.assertEqual(streamed, batches[0] + batches[1])
+        query = self.mock_db.stream.call_args.args[0]
+        self.assertEqual(query.get_execution_options()['yield_per'], 2)
+        self.assertEqual(self.mock_db.expunge.call_count, 3)
+        stream_result.close.assert_awaited_once()
+
+    async def test_find_page_returns_items_and_window_total(self):
+        rows = [SimpleModel(id=uuid.uuid4(), name='a'), SimpleModel(id=uuid.uuid4(), name='b')]
+        self.mock_result.all.return_value = [Row(row, total_count=7) for row in rows]
+
+        page = await self.repo.find_page(RepoQueryOptions(limit=2))
+
+        self.assertEqual(page.items, rows)
+        self.assertEqual(page.total, 7)
+        self.mock_db.execute.assert_called_once()
+        self.assertIn('count(*) OVER ()', str(self.mock_db.execute.call_args.args[0]))
+
+    async def test_find_page_past_the_end_falls_back_to_count(self):
+        self.mock_result.all.return_value = []
+        self.mock_result.scalar_one.return_value = 4
+
+        page = await self.repo.find_page(RepoQueryOptions(limit=2, offset=10))
+
+        self.assertEqual(page.items, [])
+        self.assertEqual(page.total, 4)
+        self.assertEqual(self.mock_db.execute.call_count, 2)
+
+    async def test_find_page_past_the_end_of_cursor_has_no_remaining_rows(self):
+        self.mock_result.all.return_value = []
+        self.mock_result.scalar_one.return_value = 4
+        token = encode_cursor(KeysetCursor(sort_by='name', sort_desc=False, value='z', last_id=uuid.uuid4()))
+
+        page = await self.repo.find_page(RepoQueryOptions(limit=2, sort_by='name', after_cursor=token))
+
+        self.assertEqual((page.items, page.total, page.next_cursor), ([], 0, None))
+        self.mock_db.execute.assert_called_once()
+
+    async def test_estimate_count_uses_explain_when_filtered(self):
+        self.mock_result.scalar_one.return_value = [{'Plan': {'Plan Rows': 250000}}]
+
+        estimate = await self.repo.estimate_count(RepoQueryOptions(filters={'name': 'x'}))
+
+        self.assertEqual(estimate, CountEstimate(value=250000, is_estimate=True))
+        self.assertIsInstance(self.mock_db.execute.call_args.args[0], Explain)
+
+    async def test_estimate_count_falls_back_to_exact_below_threshold(self):
+        class PlainModel(Base):
+            __tablename__ = 'plain_model'
+            id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True)
+
+        repo = BaseRepository(db=self.mock_db, model=PlainModel)
+        self.mock_result.scalar_one_or_none.return_value = 40
+        self.mock_result.scalar_one.return_value = 42
+
+        estimate = await repo.estimate_count(exact_threshold=100)
+
+        self.assertEqual(estimate, CountEstimate(value=42, is_estimate=False))
+        self.assertIn('pg_class', str(self.mock_db.execute.call_args_list[0].args[0]))
+
+    async def test_upsert_all_emits_single_on_conflict_statement(self):
+        repo = BaseRepository(db=self.mock_db, model=ContextModel)
+        upserted = [ContextModel(participant_id=uuid.uuid4(), context_tag='a', payload='x')]
+        self.mock_db.scalars.return_value = MagicMock(**{'all.return_value': upserted})
+        rows = [{'participant_id': uuid.uuid4(), 'context_tag': f'tag-{i}', 'payload': 'x'} for i in range(3)]
+
+        result = await repo.upsert_all(rows)
+
+        self.assertEqual(result, upserted)
+        self.mock_db.scalars.assert_called_once()
+        stmt, params = self.mock_db.scalars.call_args.args
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.assertIn('ON CONFLICT (participant_id, context_tag) DO UPDATE SET payload = excluded.payload', sql)
+        self.assertIn('RETURNING', sql)
+        self.assertEqual(params, rows)
+        self.mock_db.rollback.assert_not_called()
+
+    async def test_upsert_all_keeps_last_row_per_conflict_target(self):
+        repo = BaseRepository(db=self.mock_db, model=ContextModel)
+        self.mock_db.scalars.return_value = MagicMock(**{'all.return_value': []})
+        participant_id = uuid.uuid4()
+        rows = [{'participant_id': participant_id, 'context_tag': 'a', 'payload': str(i)} for i in range(3)]
+
+        await repo.upsert_all([*rows, {'participant_id': participant_id, 'context_tag': 'b', 'payload': 'y'}])
+
+        _stmt, params = self.mock_db.scalars.call_args.args
+        self.assertEqual([row['payload'] for row in params], ['2', 'y'])
+
+    async def test_upsert_maps_attribute_keys_to_column_names(self):
+        repo = BaseRepository(db=self.mock_db, model=RenamedModel)
+        self.mock_db.scalars.return_value = MagicMock(**{'all.return_value': []})
+        self.mock_result.scalars.return_value.first.return_value = None
+
+        await repo.upsert({'tag': 'a', 'label': 'x'})
+
+        self.assertEqual(get_model_metadata(RenamedModel).conflict_targets, (('tag',), ('id',)))
+        stmt, _params = self.mock_db.scalars.call_args.args
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.assertIn('ON CONFLICT (tag_name) DO UPDATE SET label_text = excluded.label_text', sql)
+        self.assertIn('test_renamed_model.tag_name = ', str(self.mock_db.execute.call_args.args[0]))
+
+    async def test_upsert_requires_a_populated_unique_constraint(self):
+        repo = BaseRepository(db=self.mock_db, model=ContextModel)
+
+        with self.assertRaises(ValueError):
+            await repo.upsert({'payload': 'x'})
+
+    async def test_bulk_create_inserts_in_chunks(self):
+        self.mock_db.scalars.return_value = MagicMock(**{'all.return_value': [SimpleModel()]})
+        rows = [{'name': f'name-{i}'} for i in range(5)]
+
+        created = await self.repo.bulk_create(rows, chunk_size=2)
+
+        self.assertEqual(len(created), 3)
+        self.assertEqual([len(call.args[1]) for call in self.mock_db.scalars.call_args_list], [2, 2, 1])
+        self.mock_db.add_all.assert_not_called()
+
+    async def test_bulk_create_returns_ids_in_input_order(self):
+        rows = [{'name': 'a'}, {'id': uuid.uuid4(), 'name': 'b'}]
+
+        ids = await self.repo.bulk_create(rows, return_ids=True)
+
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(ids[1], rows[1]['id'])
+        self.assertIsInstance(ids[0], uuid.UUID)
+        self.mock_db.execute.assert_called_once()
+        self.assertIs(self.mock_db.execute.call_args.args[0].entity_description['entity'], SimpleModel)
+        self.mock_db.connection.assert_not_called()
+
+    async def test_update_by_id_issues_single_update_returning(self):
+        instance = SimpleModel(id=uuid.uuid4(), name='New Name')
+        self.mock_db.scalars.return_value = MagicMock(**{'first.return_value': instance})
+
+        updated = await self.repo.update_by_id(instance.id, {'name': 'New Name'})
+
+        self.assertIs(updated, instance)
+        self.mock_db.execute.assert_not_called()
+        sql = str(self.mock_db.scalars.call_args.args[0])
+        self.assertTrue(sql.startswith('UPDATE test_model SET name=:name'))
+        self.assertIn('deleted_at IS NULL RETURNING', sql)
+
+    async def test_update_many_and_soft_delete_many_report_rowcount(self):
+        self.mock_result.rowcount = 3
+
+        updated = await self.repo.update_many({'name': 'a'}, {'name': 'b'})
+        deleted = await self.repo.soft_delete_many([uuid.uuid4(), uuid.uuid4(), uuid.uuid4()])
+
+        self.assertEqual(updated.rowcount, 3)
+        self.assertEqual(deleted.rowcount, 3)
+        self.assertEqual(self.mock_db.execute.call_count, 2)
+        self.assertIn('SET deleted_at=', str(self.mock_db.execute.call_args.args[0]))
+
+    async def test_model_metadata_is_cached_per_model(self):
+        meta = get_model_metadata(ContextModel)
+
+        self.assertIs(meta, get_model_metadata(ContextModel))
+        self.assertIs(self.repo.meta, get_model_metadata(SimpleModel))
+        self.assertEqual(meta.unique_column_sets, (('participant_id', 'context_tag'),))
+        self.assertEqual(meta.conflict_targets, (('participant_id', 'context_tag'), ('id',)))
+        self.assertEqual(meta.searchable_columns, ('context_tag', 'payload'))
+        self.assertIn('payload', meta.nullable_columns)
+        self.assertIsNone(meta.soft_delete_column)
+        self.assertIs(self.repo.meta.soft_delete_column, SimpleModel.deleted_at)
+
+    async def test_filter_unknown_column_raises(self):
+        with self.assertRaises(AttributeError):
+            self.repo._filter(self.repo.model.__table__.select(), {'missing': 1})
+
+    async def test_find_many_reuses_statement_for_same_shape(self):
+        self.repo.statement_cache = StatementCache()
+
+        await self.repo.find_many(RepoQueryOptions(filters={'name': 'a'}, sort_by='name', limit=10))
+        await self.repo.find_many(RepoQueryOptions(filters={'name': 'b'}, sort_by='name', limit=20))
+
+        (first_query, first_params), (second_query, second_params) = (
+            call.args for call in self.mock_db.execute.call_args_list
+        )
+        self.assertIs(first_query, second_query)
+        self.assertEqual(first_params, {'filter_name': 'a', 'limit': 10})
+        self.assertEqual(second_params, {'filter_name': 'b', 'limit': 20})
+        stats = self.repo.statement_cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (1, 1, 1))
+
+    async def test_find_many_builds_new_statement_for_new_shape(self):
+        self.repo.statement_cache = StatementCache()
+
+        await self.repo.find_many(RepoQueryOptions(filters={'name': 'a'}))
+        await self.repo.find_many(RepoQueryOptions(filters={'name': ['a', 'b']}))
+        await self.repo.find_many(RepoQueryOptions(filters={'name': 'a'}, include_deleted=True))
+
+        stats = self.repo.statement_cache.stats()
+        self.assertEqual((stats.hits, stats.misses), (0, 3))
+
+    def test_statement_cache_evicts_least_recently_used(self):
+        cache = StatementCache(maxsize=2)
+        cache.get_or_build('a', lambda: 1)
+        cache.get_or_build('b', lambda: 2)
+        cache.get_or_build('a', lambda: 3)
+        cache.get_or_build('c', lambda: 4)
+
+        self.assertEqual(cache.get_or_build('a', lambda: 5), 1)
+        self.assertEqual(cache.get_or_build('b', lambda: 6), 6)
+        self.assertEqual(cache.stats().size, 2)
+
+    async def test_get_by_id_uses_session_get(self):
+        instance = SimpleModel(id=uuid.uuid4(), name='Test')
+        self.mock_db.get.return_value = instance
+
+        self.assertIs(await self.repo.get_by_id(instance.id), instance)
+        self.mock_db.get.assert_called_once_with(SimpleModel, instance.id)
+        self.mock_db.execute.assert_not_called()
+
+    async def test_get_by_id_hides_soft_deleted(self):
+        instance = SimpleModel(id=uuid.uuid4(), name='Test', deleted_at=datetime.now())
+        self.mock_db.get.return_value = instance
+
+        self.assertIsNone(await self.repo.get_by_id(instance.id))
+        self.assertIs(await self.repo.get_by_id(instance.id, include_deleted=True), instance)
+
+    async def test_find_one_memoizes_until_flush(self):
+        instance = SimpleModel(id=uuid.uuid4(), name='Test')
+        self.mock_result.scalars.return_value.first.return_value = instance
+        sync_session = Session()
+        self.mock_db.sync_session = sync_session
+        self.mock_db.new, self.mock_db.dirty, self.mock_db.deleted = [], [], []
+        self.mock_db.__contains__.return_value = True
+        memo = enable_session_memo(self.mock_db)
+
+        options = RepoQueryOptions(filters={'name': 'Test'})
+        self.assertIs(await self.repo.find_one(options), instance)
+        self.assertIs(await self.repo.find_one(RepoQueryOptions(filters={'name': 'Test'})), instance)
+        self.assertEqual(self.mock_db.execute.call_count, 1)
+        self.assertEqual((memo.hits, memo.misses), (1, 1))
+
+        sync_session.dispatch.after_flush(sync_session, None)
+        await self.repo.find_one(options)
+        self.assertEqual(self.mock_db.execute.call_count, 2)
+
+    async def test_find_many_projection_returns_records(self):
+        self.mock_result.all.return_value = [('a', None), ('b', None)]
+
+        records = await self.repo.find_many(RepoQueryOptions(projection=['name', 'deleted_at']))
+
+        self.assertEqual([record.name for record in records], ['a', 'b'])
+        self.assertIsInstance(records[0], ProjectionRecord)
+        self.assertIs(type(records[0]), record_type(SimpleModel, ['name', 'deleted_at']))
+        self.assertEqual(records[0]._asdict(), {'name': 'a', 'deleted_at': None})
+        query = self.mock_db.execute.call_args.args[0]
+        self.assertEqual([column.name for column in query.selected_columns], ['name', 'deleted_at'])
+
+    async def test_find_many_projection_formats(self):
+        self.mock_result.all.return_value = [('a',)]
+
+        as_tuples = await self.repo.find_many(RepoQueryOptions(projection=['name'], projection_format='tuple'))
+        as_dicts = await self.repo.find_many(RepoQueryOptions(projection=['name'], projection_format='dict'))
+
+        self.assertEqual(as_tuples, [('a',)])
+        self.assertEqual(as_dicts, [{'name': 'a'}])
+
+    async def test_find_many_projection_rejects_unknown_column_and_format(self):
+        with self.assertRaises(AttributeError):
+            await self.repo.find_many(RepoQueryOptions(projection=['missing']))
+        with self.assertRaises(ValueError):
+            await self.repo.find_many(RepoQueryOptions(projection=['name'], projection_format='xml'))
+        self.mock_db.execute.assert_not_called()
+
+    async def test_search_backend_ranks_unsorted_results(self):
+        self.repo.search_backend = TrigramSearch()
+
+        await self.repo.find_many(RepoQueryOptions(search_text='abc', search_columns=['name']))
+        await self.repo.find_many(RepoQueryOptions(search_text='abc', search_columns=['name'], sort_by='name'))
+
+        (ranked, ranked_params), (sorted_query, _) = (call.args for call in self.mock_db.execute.call_args_list)
+        ranked_sql = str(ranked.compile(dialect=postgresql.dialect()))
+        self.assertIn('name ILIKE %(search_text)s', ranked_sql)
+        self.assertIn('ORDER BY greatest(word_similarity(%(search_query)s, test_model.name)) DESC', ranked_sql)
+        self.assertEqual(ranked_params, {'search_text': '%abc%', 'search_query': 'abc'})
+        self.assertNotIn('word_similarity', str(sorted_query.compile(dialect=postgresql.dialect())))
+
+    async def test_search_defaults_to_string_columns_and_rejects_others(self):
+        await self.repo.find_many(RepoQueryOptions(search_text='abc'))
+
+        query, params = self.mock_db.execute.call_args.args
+        self.assertIn('lower(test_model.name) LIKE', str(query))
+        self.assertEqual(params, {'search_text': '%abc%'})
+        with self.assertRaises(ValueError):
+            await self.repo.find_many(RepoQueryOptions(search_text='abc', search_columns=['deleted_at']))
+
+    def test_search_backend_requires_condition_and_bind_params(self):
+        class RankOnly(SearchBackend):
+            def rank(self, columns, text):
+                return None
+
+        with self.assertRaises(TypeError):
+            RankOnly()
+
+    def test_full_text_search_document_uses_literals(self):
+        document = FullTextSearch('english').document([SimpleModel.name, SimpleModel.deleted_at])
+        compiled = document.compile(dialect=postgresql.dialect())
+
+        self.assertEqual(compiled.params, {})
+        self.assertIn("to_tsvector('english'::regconfig", str(compiled))
+        with self.assertRaises(ValueError):
+            FullTextSearch("english'; drop table x; --")
+
+    async def test_ids_filter_binds_one_array_parameter(self):
+        ids = [uuid.uuid4() for _ in range(3)]
+
+        await self.repo.find_many(RepoQueryOptions(ids=ids, filters={'name': ['a', 'b']}))
+
+        query, params = self.mock_db.execute.call_args.args
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        self.assertIn('test_model.id = ANY (%(ids)s::UUID[])', sql)
+        self.assertIn('test_model.name = ANY (%(filter_name)s::VARCHAR[])', sql)
+        self.assertEqual(params['ids'], ids)
+        self.assertEqual(params['filter_name'], ['a', 'b'])
+
+    async def test_find_by_ids_keeps_request_order_and_reports_missing(self):
+        first, second, absent = (SimpleModel(id=uuid.uuid4(), name=name) for name in 'abc')
+        self.mock_result.scalars.return_value.all.side_effect = [[second], [first]]
+
+        result = await self.repo.find_by_ids(
+            [first.id, absent.id, second.id, first.id], RepoQueryOptions(limit=1, sort_by='name'), chunk_size=2
+        )
+
+        self.assertEqual(result.items, [first, second])
+        self.assertEqual(result.missing, [absent.id])
+        self.assertEqual(self.mock_db.execute.call_count, 2)
+        (_, first_params), (second_query, second_params) = (call.args for call in self.mock_db.execute.call_args_list)
+        self.assertEqual(first_params['ids'], [first.id, absent.id])
+        self.assertEqual(second_params['ids'], [second.id])
+        self.assertNotIn('limit', second_params)
+        self.assertNotIn('ORDER BY', str(second_query.compile(dialect=postgresql.dialect())))
+
+    async def test_find_by_ids_projection_requires_id(self):
+        instance_id = uuid.uuid4()
+        self.mock_result.all.return_value = [('a', instance_id)]
+
+        result = await self.repo.find_by_ids(
+            [instance_id], RepoQueryOptions(projection=['name', 'id'], projection_format='dict')
+        )
+
+        self.assertEqual(result.items, [{'name': 'a', 'id': instance_id}])
+        with self.assertRaises(ValueError):
+            await self.repo.find_by_ids([instance_id], RepoQueryOptions(projection=['name']))
+
+    def test_ttl_cache_expires_and_rejects_stale_loads(self):
+        now = [0.0]
+        cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        now[0] = 10.0
+        self.assertIs(cache.get('a'), MISSING)
+
+        generation = cache.generation
+        cache.invalidate('b')
+        cache.set('b', 'stale', generation=generation)
+        self.assertIs(cache.get('b'), MISSING)
+        self.assertEqual((cache.stats().hits, cache.stats().misses), (1, 2))
+
+    def test_strict_loading_raises_or_counts_lazy_loads(self):
+        session = Session()
+        guard = enable_strict_loading(session)
+        self.assertIs(enable_strict_loading(session, 'log'), guard)
+
+        state = MagicMock(session=session, lazy_loaded_from=MagicMock())
+        state.loader_strategy_path.prop = 'Study.study_steps'
+        with self.assertRaises(LazyLoadError) as raised:
+            guard._on_execute(state)
+        self.assertEqual(raised.exception.path, 'Study.study_steps')
+
+        guard.mode = 'log'
+        with self.assertLogs('rssa_storage.shared.strict_loading', 'WARNING'):
+            guard._on_execute(state)
+        guard._on_execute(MagicMock(session=session, lazy_loaded_from=None))
+
+        self.assertEqual(get_lazy_load_stats(session).by_path, {'Study.study_steps': 2})
+        self.assertEqual(guard.stats.total, 2)
@@ -0,0 +1,110 @@
+import json
+import unittest
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy import String, Uuid, create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from rssa_storage.shared import BaseRepository, RepoQueryOptions
+from rssa_storage.shared.instrumentation import (
+    MetricsRegistry,
+    current_method,
+    disable_instrumentation,
+    enable_instrumentation,
+    fingerprint_statement,
+)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class ProbeModel(Base):
+    __tablename__ = 'test_probe_model'
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    name: Mapped[str] = mapped_column(String)
+
+
+class ProbeRepository(BaseRepository[ProbeModel]):
+    async def run(self, conn, statement: str) -> str | None:
+        conn.execute(text(statement))
+        return current_method()
+
+
+class TestInstrumentation(unittest.IsolatedAsyncioTestCase):
+    def make_repo(self, engine) -> ProbeRepository:
+        db = AsyncMock(spec=AsyncSession)
+        db.bind = engine
+        db.execute.return_value = MagicMock()
+        db.execute.return_value.scalars.return_value.all.return_value = []
+        return ProbeRepository(db=db, model=ProbeModel)
+
+    def make_engine(self):
+        engine = create_engine('sqlite://')
+        self.addCleanup(engine.dispose)
+        return engine
+
+    async def test_records_methods_and_statements(self):
+        engine = self.make_engine()
+        registry = enable_instrumentation(engine, MetricsRegistry())
+        self.addCleanup(disable_instrumentation, engine)
+        repo = self.make_repo(engine)
+
+        with engine.connect() as conn:
+            for value in (1, 2):
+                conn.execute(text('SELECT :value'), {'value': value})
+        await repo.find_many(RepoQueryOptions(limit=10))
+        repo.db.execute.side_effect = RuntimeError('boom')
+        with self.assertRaises(RuntimeError):
+            await repo.find_many(RepoQueryOptions(limit=10))
+
+        (statement,) = registry.statements().values()
+        self.assertEqual((statement.calls, statement.statement), (2, 'SELECT ?'))
+        method = registry.methods()['ProbeRepository.find_many']
+        self.assertEqual((method.calls, method.errors, method.latency.count), (2, 1, 2))
+
+        exposition = registry.to_prometheus()
+        self.assertIn('rssa_storage_repository_method_seconds_count{method="ProbeRepository.find_many"} 2', exposition)
+        self.assertIn('rssa_storage_repository_method_errors_total{method="ProbeRepository.find_many"} 1', exposition)
+        self.assertIn('le="+Inf"', exposition)
+        self.assertEqual(json.loads(registry.to_json())['methods']['ProbeRepository.find_many']['calls'], 2)
+
+    async def test_attributes_statement_rows_to_the_running_method(self):
+        engine = self.make_engine()
+        registry = enable_instrumentation(engine, MetricsRegistry(fold_every=2))
+        self.addCleanup(disable_instrumentation, engine)
+        repo = self.make_repo(engine)
+
+        with engine.connect() as conn:
+            conn.execute(text('CREATE TABLE t (x INTEGER)'))
+            method = await repo.run(conn, 'INSERT INTO t VALUES (1), (2), (3)')
+
+        self.assertEqual(method, 'ProbeRepository.run')
+        self.assertEqual(registry.methods()['ProbeRepository.run'].rows, 3)
+        (insert,) = (stats for stats in registry.statements().values() if stats.statement.startswith('INSERT'))
+        self.assertEqual((insert.calls, insert.rows), (1, 3))
+
+    async def test_each_engine_reports_to_its_own_sink(self):
+        first_engine, second_engine = self.make_engine(), self.make_engine()
+        first = enable_instrumentation(first_engine, MetricsRegistry())
+        self.addCleanup(disable_instrumentation, first_engine)
+        second = enable_instrumentation(second_engine, MetricsRegistry())
+        self.addCleanup(disable_instrumentation, second_engine)
+
+        await self.make_repo(first_engine).find_many(RepoQueryOptions(limit=10))
+        for _ in range(2):
+            await self.make_repo(second_engine).find_many(RepoQueryOptions(limit=10))
+        disable_instrumentation(second_engine)
+        await self.make_repo(second_engine).find_many(RepoQueryOptions(limit=10))
+
+        self.assertEqual(first.methods()['ProbeRepository.find_many'].calls, 1)
+        self.assertEqual(second.methods()['ProbeRepository.find_many'].calls, 2)
+
+    def test_fingerprint_collapses_parameter_lists(self):
+        first = fingerprint_statement('SELECT id FROM t\n WHERE id IN ($1, $2) AND name = $3')
+        second = fingerprint_statement('SELECT id FROM t WHERE id IN ($1, $2, $3, $4) AND name = $5')
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[1], 'SELECT id FROM t WHERE id IN (?, ...) AND name = ?')
@@ -0,0 +1,76 @@
+import json
+import tempfile
+import threading
+import unittest
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine, text
+
+from rssa_storage.shared.slow_query import (
+    SlowQuery,
+    SlowQueryLog,
+    capture_slow_queries,
+    redact_parameters,
+    stop_capturing_slow_queries,
+)
+
+
+class TestSlowQuery(unittest.TestCase):
+    def test_capture_keeps_redacted_recent_queries(self):
+        engine = create_engine('sqlite://')
+        capture = capture_slow_queries(engine, threshold=0.0, log=SlowQueryLog(maxlen=2), explain=False)
+        self.addCleanup(stop_capturing_slow_queries, engine)
+
+        with self.assertLogs('rssa_storage.shared.slow_query', 'WARNING'), engine.connect() as conn:
+            for value in ('alice@example.com', 'bob', 'carol'):
+                conn.execute(text('SELECT :email, :limit'), {'email': value, 'limit': 5})
+
+        queries = capture.log.queries()
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(queries[-1].parameters, ['<str:5>', 5])
+        self.assertEqual(queries[-1].statement, 'SELECT ?, ?')
+        self.assertIsNone(queries[-1].plan)
+
+    def test_capture_explains_a_fingerprint_once_per_interval(self):
+        engine = create_engine('sqlite://')
+        capture = capture_slow_queries(engine, threshold=0.0, explain_interval=60.0)
+        self.addCleanup(stop_capturing_slow_queries, engine)
+        capture._schedule = MagicMock()
+
+        with self.assertLogs('rssa_storage.shared.slow_query', 'WARNING'), engine.connect() as conn:
+            for value in (1, 2, 3):
+                conn.execute(text('SELECT :value'), {'value': value})
+
+        capture._schedule.assert_called_once()
+        self.assertEqual([query.note for query in capture.log.queries()], ['explained recently'] * 2)
+        self.assertEqual((capture._explained.maxsize, capture._explained.ttl), (1024, 60.0))
+
+    def test_log_appends_to_its_file_off_the_calling_thread(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'slow.jsonl'
+        log = SlowQueryLog(maxlen=1, path=path)
+        self.addCleanup(log.close)
+        writers = []
+        write = log._write
+        log._write = lambda query: (writers.append(threading.current_thread()), write(query))
+
+        for fingerprint in ('a', 'b', 'c'):
+            log.add(SlowQuery('SELECT 1', [], 1.0, datetime.now(UTC), fingerprint))
+        log.flush()
+
+        lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        self.assertEqual([line['fingerprint'] for line in lines], ['a', 'b', 'c'])
+        self.assertEqual([query.fingerprint for query in log.queries()], ['c'])
+        self.assertNotIn(threading.current_thread(), writers)
+
+    def test_redact_parameters_keeps_only_non_identifying_values(self):
+        instance_id = uuid.uuid4()
+        redacted = redact_parameters({'name': 'Ada', 'ids': [instance_id], 'limit': 10, 'data': b'xy', 'flag': None})
+
+        self.assertEqual(
+            redacted, {'name': '<str:3>', 'ids': [instance_id], 'limit': 10, 'data': '<bytes:2>', 'flag': None}
+        )